@@ -10,6 +10,8 @@ from . import context
 from .commands.analyze_manifest import AnalyzeManifestCommand
 from .commands.bake_manifest import BakeManifestCommand
 from .commands.create_manifest import CreateManifestCommand
+from .commands.diff_manifest import DiffManifestCommand
+from .commands.ingest_manifest import IngestManifestCommand
 from .commands.upload_manifest import UploadManifestCommand
 
 
@@ -59,6 +61,8 @@ class Application:
         self.analyze_manifest = AnalyzeManifestCommand(subparsers)
         self.upload_manifest = UploadManifestCommand(subparsers)
         self.bake_manifest = BakeManifestCommand(subparsers)
+        self.diff_manifest = DiffManifestCommand(subparsers)
+        self.ingest_manifest = IngestManifestCommand(subparsers)
 
     def execute(self, command_line_args: list[str] | None = None) -> int:
         """Execute the application.
@@ -83,6 +87,12 @@ class Application:
         elif command == "bake-manifest":
             opts = self.bake_manifest.parse_opts(args, global_opts)
             return self.bake_manifest.run(opts)
+        elif command == "diff-manifest":
+            opts = self.diff_manifest.parse_opts(args, global_opts)
+            return self.diff_manifest.run(opts)
+        elif command == "ingest-manifest":
+            opts = self.ingest_manifest.parse_opts(args, global_opts)
+            return self.ingest_manifest.run(opts)
         elif command:
             print(f"Unknown command: {args.command}", file=sys.stderr)
             return 1
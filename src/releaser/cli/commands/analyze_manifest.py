@@ -5,19 +5,26 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Iterable
 
 from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import AbortedManifestError, InvalidQueryError
 from releaser.hexagon.services.manifest_analyzer import (
     ImageQuery,
     ManifestAnalyzer,
     PlatformQuery,
     RepositoryQuery,
+    RevisionQuery,
     TagQuery,
+    parse_query,
 )
 from releaser.hexagon.services.manifest_generator import ManifestGenerator
-from releaser.infra.git_reader.subprocess import GitSubprocessReader
+from releaser.hexagon.services.query_expression import parse_expression
+from releaser.infra._manifest_index.history import ManifestHistoryStore
+from releaser.infra._manifest_index.mapped import MappedManifestIndex
+from releaser.infra.git_reader.auto import create_git_reader
 from releaser.infra.json_writer.json_file import JsonFileWriter
 from releaser.infra.json_writer.memory import InMemoryJsonWriter
 from releaser.infra.strategy_reader.auto import AutoStrategyReader
@@ -32,7 +39,12 @@ class AnalyzeManifestCommandOptions:
 
     manifest: Path | None
     global_opts: GlobalOpts
-    query: TagQuery | ImageQuery | PlatformQuery | RepositoryQuery | None = None
+    query: (
+        TagQuery | ImageQuery | PlatformQuery | RepositoryQuery | RevisionQuery | None
+    ) = None
+    batch: str | None = None
+    stream: bool = False
+    history: Path | None = None
 
 
 class AnalyzeManifestCommand:
@@ -41,9 +53,13 @@ class AnalyzeManifestCommand:
 
     def run(self, opts: AnalyzeManifestCommandOptions) -> int:
         """Run the analyze-manifest command."""
+        if opts.stream:
+            return self.run_stream(opts)
         service = self.create_service(opts)
+        if opts.batch is not None:
+            return self.run_batch(service, opts.batch)
         if opts.query is None:
-            print(json.dumps(asdict(service.get_manifest()), separators=(",", ":")))
+            print(json.dumps(service.get_manifest().to_dict(), separators=(",", ":")))
             return 0
         try:
             result = service.execute(opts.query)
@@ -53,6 +69,50 @@ class AnalyzeManifestCommand:
         print(json.dumps(result, separators=(",", ":")))
         return 0
 
+    def run_stream(self, opts: AnalyzeManifestCommandOptions) -> int:
+        """Answer a single query in one pass over the manifest file, with bounded memory."""
+        assert opts.manifest is not None and opts.query is not None
+        reader = opts.global_opts.get_writer(JsonFileWriter(opts.manifest))
+        applications = reader.read_applications()
+        if applications is None:
+            print("ERROR: No manifest found.", file=sys.stderr)
+            return 1
+        try:
+            result = ManifestAnalyzer.execute_streaming(opts.query, applications)
+        except AbortedManifestError as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            return 1
+        print(json.dumps(result, separators=(",", ":")))
+        return 0
+
+    def run_batch(self, service: ManifestAnalyzer, source: str) -> int:
+        """Answer JSON-lines queries read from a file or from standard input ("-").
+
+        One JSON line is written per query, holding either the `result` of
+        the query or an `error`, and the `id` of the query when given.
+        """
+        if source == "-":
+            return self._answer_queries(service, sys.stdin)
+        with open(source) as queries:
+            return self._answer_queries(service, queries)
+
+    def _answer_queries(self, service: ManifestAnalyzer, lines: Iterable[str]) -> int:
+        status = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            output: dict[str, Any] = {}
+            try:
+                data = json.loads(line)
+                if isinstance(data, dict) and "id" in data:
+                    output["id"] = data.pop("id")
+                output["result"] = service.execute(parse_query(data))
+            except (json.JSONDecodeError, InvalidQueryError) as exc:
+                output["error"] = str(exc)
+                status = 1
+            print(json.dumps(output, separators=(",", ":")), flush=True)
+        return status
+
     def configure_parser(self, subparser: argparse._SubParsersAction):  # type: ignore
         """Configure the parser for the create-manifest command."""
         self._parser = subparser.add_parser(  # type: ignore[reportUnknownMemberType]
@@ -107,6 +167,32 @@ class AnalyzeManifestCommand:
             action="append",
             help="Filter by manifest tag.",
         )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--where",
+            metavar="EXPRESSION",
+            default=None,
+            help="Filter by images matching an expression (e.g. 'repo~\"registry/*\" and platform=linux/arm64 and not app=docs').",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--batch",
+            metavar="FILE",
+            nargs="?",
+            const="-",
+            default=None,
+            help="Answer JSON-lines queries read from FILE (or standard input), writing one JSON line per query.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--stream",
+            action="store_true",
+            default=False,
+            help="Read the input file in a single pass with bounded memory to answer a --list-* query.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--history",
+            metavar="FILE",
+            default=None,
+            help="Answer queries across all manifests of a history written by ingest-manifest.",
+        )
         self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
             "--list-tags", action="store_true", default=False, help="List tags."
         )
@@ -125,6 +211,12 @@ class AnalyzeManifestCommand:
             default=False,
             help="List repositories.",
         )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--list-revisions",
+            action="store_true",
+            default=False,
+            help="List revisions (commits) of manifests holding matching images.",
+        )
 
     def parse_opts(
         self, args: argparse.Namespace, opts: GlobalOpts
@@ -134,44 +226,108 @@ class AnalyzeManifestCommand:
             manifest=Path(args.input) if args.input else None,
             global_opts=opts,
         )
+        where = self._parse_where(args)
+        if args.batch is not None:
+            if (
+                args.list_tags
+                or args.list_images
+                or args.list_platforms
+                or args.list_repositories
+                or args.list_revisions
+            ):
+                print(
+                    "ERROR: Cannot combine --batch with --list-tags, --list-images, --list-repositories, --list-platforms or --list-revisions."
+                )
+                sys.exit(1)
+            options.batch = args.batch
+        else:
+            options.query = self._parse_query(args, where)
+        if where is not None and options.query is None:
+            print(
+                "ERROR: --where requires one of --list-tags, --list-images, --list-repositories, --list-platforms or --list-revisions."
+            )
+            sys.exit(1)
+        if args.stream:
+            if options.manifest is None or options.query is None:
+                print(
+                    "ERROR: --stream requires --input and one of --list-tags, --list-images, --list-repositories or --list-platforms."
+                )
+                sys.exit(1)
+            if isinstance(options.query, RevisionQuery):
+                print("ERROR: Cannot combine --stream with --list-revisions.")
+                sys.exit(1)
+            options.stream = True
+        self._parse_history(args, options)
+        return options
+
+    def _parse_query(
+        self, args: argparse.Namespace, where: str | None
+    ) -> TagQuery | ImageQuery | PlatformQuery | RepositoryQuery | RevisionQuery | None:
+        """Parse the query selected by the --list-* options, if any."""
+        if args.list_revisions:
+            if (
+                args.list_tags
+                or args.list_images
+                or args.list_repositories
+                or args.list_platforms
+            ):
+                print(
+                    "ERROR: Cannot combine --list-revisions with --list-tags, --list-images, --list-repositories or --list-platforms."
+                )
+                sys.exit(1)
+            if args.no_platform:
+                print(
+                    "ERROR: Cannot combine --list-revisions with --no-platform.",
+                )
+                sys.exit(1)
+            return RevisionQuery(
+                application=_flatten(args.app),
+                repository=_flatten(args.repository),
+                platform=_flatten(args.platform),
+                manifest_tag=_flatten(args.manifest_tag),
+                where=where,
+            )
         if args.list_tags:
             if args.list_images or args.list_platforms:
                 print(
                     "ERROR: Cannot combine --list-tags with --list-images or --list-platforms."
                 )
                 sys.exit(1)
-            options.query = TagQuery(
+            return TagQuery(
                 application=_flatten(args.app),
                 platform=_flatten(args.platform),
                 repository=_flatten(args.repository),
                 no_platform=args.no_platform,
                 manifest_tag=_flatten(args.manifest_tag),
+                where=where,
             )
-        elif args.list_images:
+        if args.list_images:
             if args.list_tags or args.list_platforms or args.list_repositories:
                 print(
                     "ERROR: Cannot combine --list-images with --list-tags, --list-repositories or --list-platforms."
                 )
                 sys.exit(1)
-            options.query = ImageQuery(
+            return ImageQuery(
                 application=_flatten(args.app),
                 platform=_flatten(args.platform),
                 repository=_flatten(args.repository),
                 no_platform=args.no_platform,
                 manifest_tag=_flatten(args.manifest_tag),
+                where=where,
             )
-        elif args.list_repositories:
+        if args.list_repositories:
             if args.list_tags or args.list_images or args.list_platforms:
                 print(
                     "ERROR: Cannot combine --list-repositories with --list-tags, --list-images or --list-platforms."
                 )
                 sys.exit(1)
-            options.query = RepositoryQuery(
+            return RepositoryQuery(
                 application=_flatten(args.app),
                 manifest_tag=_flatten(args.manifest_tag),
                 platform=_flatten(args.platform),
+                where=where,
             )
-        elif args.list_platforms:
+        if args.list_platforms:
             if args.list_tags or args.list_images or args.list_repositories:
                 print(
                     "ERROR: Cannot combine --list-platforms with --list-tags, --list-repositories or --list-images."
@@ -187,21 +343,77 @@ class AnalyzeManifestCommand:
                     "ERROR: Cannot combine --list-platforms with --no-platform.",
                 )
                 sys.exit(1)
-            options.query = PlatformQuery(
+            return PlatformQuery(
                 application=_flatten(args.app),
-                repository=args.repository,
+                repository=_flatten(args.repository),
                 manifest_tag=_flatten(args.manifest_tag),
+                where=where,
             )
-        return options
+        return None
+
+    def _parse_history(
+        self, args: argparse.Namespace, options: AnalyzeManifestCommandOptions
+    ) -> None:
+        """Parse the options reading images from a manifest history."""
+        if args.history is None:
+            return
+        if options.manifest is not None or args.stream:
+            print("ERROR: Cannot combine --history with --input or --stream.")
+            sys.exit(1)
+        if options.query is None and options.batch is None:
+            print(
+                "ERROR: --history requires --batch or one of --list-tags, --list-images, --list-repositories, --list-platforms or --list-revisions."
+            )
+            sys.exit(1)
+        options.history = Path(args.history)
+
+    def _parse_where(self, args: argparse.Namespace) -> str | None:
+        """Parse the --where expression, which filters the images of a query."""
+        if args.where is None:
+            return None
+        try:
+            parse_expression(args.where)
+        except InvalidQueryError as exc:
+            print(f"ERROR: {exc}")
+            sys.exit(1)
+        return args.where
 
     def create_service(
         self, options: AnalyzeManifestCommandOptions
     ) -> ManifestAnalyzer:
         """Create the service used to generate the manifest."""
-        manifest = self._create_manifest(options)
+        if options.history is not None:
+            if not options.history.exists():
+                print(
+                    f"ERROR: No manifest history found: {options.history.as_posix()}",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+            return ManifestAnalyzer.from_index(
+                ManifestHistoryStore.load(options.history)
+            )
+        if options.manifest and (options.query or options.batch is not None):
+            index = MappedManifestIndex.open_for(options.manifest)
+            if index is not None:
+                if options.global_opts.debug:
+                    print(
+                        f"💡 Reading manifest index for {options.manifest.as_posix()} 💡"
+                    )
+                return ManifestAnalyzer.from_index(index)
+        try:
+            manifest = self._create_manifest(options)
+        except AbortedManifestError as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            sys.exit(1)
         if not manifest:
             print("ERROR: No manifest found.", file=sys.stderr)
             sys.exit(1)
+        if options.query is not None and options.query.application:
+            # Other applications are not decoded when reading a manifest file
+            manifest = artefact.Manifest(
+                applications=manifest.get_apps(list(options.query.application)),
+                revision=manifest.revision,
+            )
         service = ManifestAnalyzer(manifest)
         return service
 
@@ -217,7 +429,7 @@ class AnalyzeManifestCommand:
         else:
             writer = InMemoryJsonWriter()
             git_reader = global_opts.get_reader(
-                GitSubprocessReader(),
+                create_git_reader(Path.cwd()),
             )
             strategy_reader = global_opts.get_strategy_reader(
                 AutoStrategyReader(Path.cwd()),
@@ -8,13 +8,14 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import AbortedManifestError, UnknownRevisionError
 from releaser.hexagon.ports import StrategyReader
 from releaser.hexagon.services.manifest_analyzer import ManifestAnalyzer
 from releaser.hexagon.services.manifest_baker import ManifestBaker
 from releaser.hexagon.services.manifest_generator import ManifestGenerator
 
 # Adapters
-from releaser.infra.git_reader.subprocess import GitSubprocessReader
+from releaser.infra.git_reader.auto import create_git_reader
 from releaser.infra.image_baker.buildx import BuildxImageBaker
 from releaser.infra.json_writer.json_file import JsonFileWriter
 from releaser.infra.json_writer.memory import InMemoryJsonWriter
@@ -33,6 +34,7 @@ class BakeManifestCommandOptions:
     metadata_file: Path
     bake_file: Path
     push: bool
+    changed_since: str | None
     global_opts: GlobalOpts
 
 
@@ -80,6 +82,12 @@ class BakeManifestCommand:
             default="bake.spec.json",
             help="Write bake file to file (default to bake.spec.json).",
         )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--changed-since",
+            metavar="REF",
+            default=None,
+            help="Only bake applications with files changed between REF and HEAD (ignored when manifest is read from --input).",
+        )
         self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
             nargs="?",
             action="store",
@@ -97,6 +105,7 @@ class BakeManifestCommand:
             application=args.app,
             manifest=Path(args.input) if args.input else None,
             push=args.push,
+            changed_since=args.changed_since,
             metadata_file=Path(args.metadata_file),
             bake_file=Path(args.bake_file),
             global_opts=opts,
@@ -112,7 +121,11 @@ class BakeManifestCommand:
         if not release_strategy:
             print("ERROR: No release strategy found.", file=sys.stderr)
             sys.exit(1)
-        manifest = self._create_manifest(options, strategy_reader)
+        try:
+            manifest = self._create_manifest(options, strategy_reader)
+        except (UnknownRevisionError, AbortedManifestError) as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            sys.exit(1)
         if not manifest:
             print("ERROR: No manifest found.", file=sys.stderr)
             sys.exit(1)
@@ -140,7 +153,7 @@ class BakeManifestCommand:
         else:
             writer = InMemoryJsonWriter()
             git_reader = global_opts.get_reader(
-                GitSubprocessReader(),
+                create_git_reader(Path.cwd()),
             )
             version_reader = global_opts.get_version_reader(
                 AutoVersionReader(Path.cwd()),
@@ -150,6 +163,7 @@ class BakeManifestCommand:
                 manifest_writer=writer,
                 strategy_reader=strategy_reader,
                 version_reader=version_reader,
+                changed_since=options.changed_since,
             )
             internal_service.execute()
             return writer.read_manifest()
@@ -3,14 +3,23 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import sys
+import warnings
 from dataclasses import dataclass
 from pathlib import Path
 
-from releaser.hexagon.errors import ReleaseStrategyNotFoundError
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import (
+    DirtyWorkingTreeError,
+    InvalidPatternError,
+    ReleaseStrategyNotFoundError,
+    UnknownRevisionError,
+)
 from releaser.hexagon.ports.json_writer import JsonWriter
 from releaser.hexagon.services.manifest_generator import ManifestGenerator
-from releaser.infra.git_reader.subprocess import GitSubprocessReader
+from releaser.infra.git_reader.auto import create_async_git_reader, create_git_reader
+from releaser.infra.git_reader.dirty_check import MODES, DirtyCheck
 from releaser.infra.json_writer.json_file import JsonFileWriter
 from releaser.infra.json_writer.stdout import JsonStdoutWriter
 from releaser.infra.strategy_reader.auto import AutoStrategyReader
@@ -24,6 +33,15 @@ class CreateManifestCommandOptions:
     """Options for the create-manifest command."""
 
     output: Path | None
+    changed_since: str | None
+    concurrent: bool
+    jobs: int
+    previous: Path | None
+    index: bool
+    content_hashes: bool
+    require_clean: bool
+    dirty_check: str
+    deepen_history: bool
     global_opts: GlobalOpts
 
 
@@ -35,19 +53,49 @@ class CreateManifestCommand:
         """Run the create-manifest command."""
         service = self._create_service(opts)
         try:
-            service.execute()
-        except ReleaseStrategyNotFoundError as exc:
+            self._execute(service, opts.concurrent)
+        except (
+            ReleaseStrategyNotFoundError,
+            InvalidPatternError,
+            DirtyWorkingTreeError,
+            UnknownRevisionError,
+        ) as exc:
             print(f"🚨 ERROR: {str(exc)} 🚨", file=sys.stderr)
             return 1
         return 0
 
+    def _execute(self, service: ManifestGenerator, concurrent: bool) -> None:
+        """Generate the manifest, printing warnings to the standard error."""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            try:
+                if concurrent:
+                    asyncio.run(service.execute_async())
+                else:
+                    service.execute()
+            finally:
+                for warning in caught:
+                    print(f"⚠️ WARNING: {warning.message} ⚠️", file=sys.stderr)
+
     def parse_opts(
         self, args: argparse.Namespace, opts: GlobalOpts
     ) -> CreateManifestCommandOptions:
         """Parse options for the create-manifest command."""
         output = Path(args.output).resolve() if args.output else None
+        if args.index and output is None:
+            print("ERROR: Cannot use --index without --output.")
+            sys.exit(1)
         return CreateManifestCommandOptions(
             output=output,
+            changed_since=args.changed_since,
+            concurrent=args.concurrent,
+            jobs=args.jobs,
+            previous=Path(args.previous).resolve() if args.previous else None,
+            index=args.index,
+            content_hashes=args.content_hashes,
+            require_clean=args.require_clean,
+            dirty_check=args.dirty_check,
+            deepen_history=args.deepen_history,
             global_opts=opts,
         )
 
@@ -64,6 +112,63 @@ class CreateManifestCommand:
             default=None,
             help="Output file where release manifest will be written.",
         )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--changed-since",
+            metavar="REF",
+            default=None,
+            help="Only release applications with files changed between REF and HEAD (build contexts, Dockerfiles and application paths are considered).",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--concurrent",
+            action="store_true",
+            default=False,
+            help="Run git commands concurrently to evaluate applications in parallel.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--jobs",
+            "-j",
+            metavar="N",
+            type=int,
+            default=1,
+            help="Evaluate applications in parallel using N threads sharing the git reader (default: 1).",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--previous",
+            metavar="FILE",
+            default=None,
+            help="Previous manifest from which applications with unchanged inputs are reused (fingerprints are recorded in the generated manifest).",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--index",
+            action="store_true",
+            default=False,
+            help="Also write a binary index of the manifest next to the output file (FILE.idx), used by analyze-manifest to answer queries.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--content-hashes",
+            action="store_true",
+            default=False,
+            help="Record the content hash of each application in the manifest, so that manifests can be compared without reading applications.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--deepen-history",
+            action="store_true",
+            default=False,
+            help="Fetch history of shallow clones from the origin remote, as deep as commit message policies require (without prompting, for at most 60 seconds per fetch).",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--require-clean",
+            action="store_true",
+            default=False,
+            help="Fail when build contexts, Dockerfiles or paths of the released applications have uncommitted changes.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--dirty-check",
+            metavar="MODE",
+            choices=MODES,
+            default="diff-index",
+            help="How uncommitted changes are detected: diff-index (default), status, or fast (status with the filesystem monitor, which may start a background daemon).",
+        )
 
     def _create_service(
         self, options: CreateManifestCommandOptions
@@ -74,8 +179,9 @@ class CreateManifestCommand:
         writer = global_opts.get_writer(
             self._create_writer(options),
         )
+        dirty_check = DirtyCheck.from_mode(options.dirty_check)
         git_reader = global_opts.get_reader(
-            GitSubprocessReader(),
+            create_git_reader(Path.cwd(), dirty_check, options.deepen_history),
         )
         strategy_reader = global_opts.get_strategy_reader(
             AutoStrategyReader(Path.cwd()),
@@ -89,15 +195,44 @@ class CreateManifestCommand:
             manifest_writer=writer,
             strategy_reader=strategy_reader,
             version_reader=version_reader,
+            changed_since=options.changed_since,
+            jobs=options.jobs,
+            previous=self._read_previous_manifest(options),
+            require_clean=options.require_clean,
         )
+        if options.concurrent:
+            service.async_git_reader = global_opts.get_async_reader(
+                create_async_git_reader(
+                    Path.cwd(), dirty_check, options.deepen_history
+                ),
+            )
         return service
 
+    def _read_previous_manifest(
+        self, options: CreateManifestCommandOptions
+    ) -> artefact.Manifest | None:
+        if options.previous is None:
+            return None
+        previous = JsonFileWriter(options.previous).read_manifest()
+        if previous is None:
+            if options.global_opts.debug:
+                print(
+                    f"💡 Previous manifest not found: {options.previous.as_posix()} 💡"
+                )
+            # Generate all applications, recording fingerprints for next runs
+            return artefact.Manifest(applications={})
+        return previous
+
     def _create_writer(self, options: CreateManifestCommandOptions) -> JsonWriter:
         if options.output is None:
             if options.global_opts.debug:
                 print("💡 Writing output to stdout 💡")
-            return JsonStdoutWriter()
+            return JsonStdoutWriter(content_hashes=options.content_hashes)
         else:
             if options.global_opts.debug:
                 print(f"💡 Writing output to {options.output.as_posix()} 💡")
-            return JsonFileWriter(options.output)
+            return JsonFileWriter(
+                options.output,
+                index=options.index,
+                content_hashes=options.content_hashes,
+            )
@@ -0,0 +1,94 @@
+"""Compare two release manifests."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import AbortedManifestError
+from releaser.hexagon.services.manifest_differ import ManifestDiffer
+from releaser.infra.json_writer.json_file import JsonFileWriter
+
+from ..context import GlobalOpts
+
+
+@dataclass
+class DiffManifestCommandOptions:
+    """Options for the diff-manifest command."""
+
+    previous: Path
+    current: Path
+    exit_code: bool
+    global_opts: GlobalOpts
+
+
+class DiffManifestCommand:
+    def __init__(self, subparser: argparse._SubParsersAction):  # type: ignore
+        self.configure_parser(subparser)  # type: ignore[no-untyped-call]
+
+    def run(self, opts: DiffManifestCommandOptions) -> int:
+        """Run the diff-manifest command."""
+        service = self.create_service(opts)
+        diff = service.execute()
+        if opts.global_opts.debug:
+            print(f"💡 Skipped {diff.skipped_applications} unchanged applications 💡")
+        print(json.dumps(diff.to_dict(), separators=(",", ":")))
+        if opts.exit_code and not diff.is_empty():
+            return 1
+        return 0
+
+    def configure_parser(self, subparser: argparse._SubParsersAction):  # type: ignore
+        """Configure the parser for the diff-manifest command."""
+        self._parser = subparser.add_parser(  # type: ignore[reportUnknownMemberType]
+            "diff-manifest",
+            help="Compare two release manifests.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "previous",
+            metavar="PREVIOUS",
+            help="File where the previous release manifest will be read.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "current",
+            metavar="CURRENT",
+            help="File where the current release manifest will be read.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--exit-code",
+            action="store_true",
+            default=False,
+            help="Exit with status 1 when images changed between manifests.",
+        )
+
+    def parse_opts(
+        self, args: argparse.Namespace, opts: GlobalOpts
+    ) -> DiffManifestCommandOptions:
+        """Parse options for the diff-manifest command."""
+        return DiffManifestCommandOptions(
+            previous=Path(args.previous),
+            current=Path(args.current),
+            exit_code=args.exit_code,
+            global_opts=opts,
+        )
+
+    def create_service(self, options: DiffManifestCommandOptions) -> ManifestDiffer:
+        """Create the service used to compare the manifests."""
+        return ManifestDiffer(
+            previous=self._read_manifest(options.previous),
+            current=self._read_manifest(options.current),
+        )
+
+    def _read_manifest(self, path: Path) -> artefact.Manifest:
+        try:
+            manifest = JsonFileWriter(path).read_manifest()
+        except AbortedManifestError as exc:
+            print(f"ERROR: {exc}: {path.as_posix()}", file=sys.stderr)
+            sys.exit(1)
+        if manifest is None:
+            print(f"ERROR: No manifest found: {path.as_posix()}", file=sys.stderr)
+            sys.exit(1)
+        return manifest
@@ -0,0 +1,87 @@
+"""Add release manifests to a manifest history."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from releaser.hexagon.errors import AbortedManifestError
+from releaser.infra._manifest_index.history import ManifestHistoryStore
+
+from ..context import GlobalOpts
+
+
+@dataclass
+class IngestManifestCommandOptions:
+    """Options for the ingest-manifest command."""
+
+    store: Path
+    manifests: list[Path]
+    global_opts: GlobalOpts
+
+
+class IngestManifestCommand:
+    def __init__(self, subparser: argparse._SubParsersAction):  # type: ignore
+        self.configure_parser(subparser)  # type: ignore[no-untyped-call]
+
+    def run(self, opts: IngestManifestCommandOptions) -> int:
+        """Run the ingest-manifest command."""
+        if opts.store.exists():
+            try:
+                store = ManifestHistoryStore.load(opts.store)
+            except ValueError as exc:
+                print(f"ERROR: {exc}", file=sys.stderr)
+                return 1
+        else:
+            store = ManifestHistoryStore()
+        try:
+            added = store.add_manifest_files(opts.manifests)
+        except (FileNotFoundError, AbortedManifestError) as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            return 1
+        store.save(opts.store)
+        skipped = len(opts.manifests) - added
+        if skipped:
+            print(
+                f"⚠️ WARNING: Skipped {skipped} manifests already stored in "
+                f"{opts.store.as_posix()} ⚠️",
+                file=sys.stderr,
+            )
+        if opts.global_opts.debug:
+            print(
+                f"💡 Added {added} manifests to {opts.store.as_posix()}, "
+                f"skipped {skipped} ({len(store)} manifests, "
+                f"{store.image_count} images) 💡"
+            )
+        return 0
+
+    def configure_parser(self, subparser: argparse._SubParsersAction):  # type: ignore
+        """Configure the parser for the ingest-manifest command."""
+        self._parser = subparser.add_parser(  # type: ignore[reportUnknownMemberType]
+            "ingest-manifest",
+            help="Add release manifests to a manifest history.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "manifests",
+            metavar="MANIFEST",
+            nargs="+",
+            help="Files where release manifests will be read, oldest first.",
+        )
+        self._parser.add_argument(  # type: ignore[reportUnknownMemberType]
+            "--store",
+            metavar="FILE",
+            required=True,
+            help="File where the manifest history is stored (created when missing).",
+        )
+
+    def parse_opts(
+        self, args: argparse.Namespace, opts: GlobalOpts
+    ) -> IngestManifestCommandOptions:
+        """Parse options for the ingest-manifest command."""
+        return IngestManifestCommandOptions(
+            store=Path(args.store),
+            manifests=[Path(manifest) for manifest in args.manifests],
+            global_opts=opts,
+        )
@@ -8,9 +8,10 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import AbortedManifestError
 from releaser.hexagon.services.manifest_generator import ManifestGenerator
 from releaser.hexagon.services.manifest_notifier import ManifestNotifier
-from releaser.infra.git_reader.subprocess import GitSubprocessReader
+from releaser.infra.git_reader.auto import create_git_reader
 from releaser.infra.json_writer.json_file import JsonFileWriter
 from releaser.infra.json_writer.memory import InMemoryJsonWriter
 from releaser.infra.strategy_reader.auto import AutoStrategyReader
@@ -71,7 +72,11 @@ class UploadManifestCommand:
 
     def create_service(self, options: UploadManifestCommandOptions) -> ManifestNotifier:
         """Create the service used to upload the manifest."""
-        manifest = self._create_manifest(options)
+        try:
+            manifest = self._create_manifest(options)
+        except AbortedManifestError as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            sys.exit(1)
         if not manifest:
             print("ERROR: No manifest found.", file=sys.stderr)
             sys.exit(1)
@@ -94,7 +99,7 @@ class UploadManifestCommand:
         else:
             writer = InMemoryJsonWriter()
             git_reader = global_opts.get_reader(
-                GitSubprocessReader(),
+                create_git_reader(Path.cwd()),
             )
             strategy_reader = global_opts.get_strategy_reader(
                 AutoStrategyReader(Path.cwd()),
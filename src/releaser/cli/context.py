@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from releaser.hexagon.ports import (
+    AsyncGitReader,
     GitReader,
     ImageBaker,
     JsonWriter,
@@ -22,6 +23,7 @@ class Dependencies:
     strategy_reader: StrategyReader
     version_reader: VersionReader
     webhook_client: WebhookClient
+    async_git_reader: AsyncGitReader | None = None
 
 
 @dataclass
@@ -42,6 +44,15 @@ class GlobalOpts:
             else default
         )
 
+    def get_async_reader(self, default: AsyncGitReader) -> AsyncGitReader:
+        """Get the async reader."""
+        return (
+            self._testing_dependencies.async_git_reader
+            if self._testing_dependencies
+            and self._testing_dependencies.async_git_reader
+            else default
+        )
+
     def get_writer(self, default: JsonWriter) -> JsonWriter:
         """Get the writer."""
         return (
@@ -2,6 +2,14 @@ from __future__ import annotations
 
 from .application import Application
 from .image import Image, PlatformImage
+from .index import BaseManifestIndex, ManifestIndex
 from .manifest import Manifest
 
-__all__ = ["Application", "Image", "PlatformImage", "Manifest"]
+__all__ = [
+    "Application",
+    "BaseManifestIndex",
+    "Image",
+    "PlatformImage",
+    "Manifest",
+    "ManifestIndex",
+]
@@ -1,17 +1,39 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any
 
+from .content_hash import digest
 from .image import Image, PlatformImage
 
 
 @dataclass(frozen=True)
 class Application:
-    """An application in the repository."""
+    """An application in the repository.
+
+    Applications are compared by their images, and are not hashable as
+    images may be modified. Their content hash is computed on first access
+    and stored, so images must not be modified once it was read.
+    """
+
+    __slots__ = ("images", "_content_hash")
+    __hash__ = None  # type: ignore[assignment]
 
     images: list[Image]
     """The images produced by the application."""
 
+    @property
+    def content_hash(self) -> str:
+        """The hash of the images of the application, in order."""
+        try:
+            return self._content_hash
+        except AttributeError:
+            content_hash = digest(
+                "application", *(image.content_hash for image in self.images)
+            )
+            object.__setattr__(self, "_content_hash", content_hash)
+            return content_hash
+
     @classmethod
     def parse_dict(cls, data: dict[str, list[dict[str, str]]]) -> "Application":
         """Parse an application from a dictionary."""
@@ -19,6 +41,10 @@ class Application:
             images=[Image.parse_dict(image) for image in data["images"]],
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the application to a dictionary."""
+        return {"images": [image.to_dict() for image in self.images]}
+
     def contains_image_for_any_repository(self, *repositories: str) -> bool:
         """Check if the application contains any of the repositories."""
         return any(
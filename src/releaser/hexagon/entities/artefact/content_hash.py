@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+
+def digest(kind: str, *parts: str) -> str:
+    """Compute the hexadecimal SHA-256 digest of the parts of an entity.
+
+    The kind of entity is hashed first, so that different entities with
+    the same parts have different hashes.
+    """
+    sha = hashlib.sha256(kind.encode())
+    for part in parts:
+        sha.update(b"\0")
+        sha.update(part.encode())
+    return sha.hexdigest()
+
+
+def canonical_json(data: Any) -> str:
+    """Serialize data to JSON, with sorted keys and without whitespace."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
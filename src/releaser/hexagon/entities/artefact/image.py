@@ -1,39 +1,134 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any
+import sys
+from typing import Any, Collection
+
+from .content_hash import canonical_json, digest
 
 
-@dataclass
 class PlatformImage:
-    """An image for a specific platform."""
+    """An image for a specific platform.
+
+    Strings are interned, and the full image name is derived from the
+    repository and the tag when it has the usual `repository:tag` form,
+    so that images share their repository and tag strings.
+    """
+
+    __slots__ = ("tag", "_repository", "_image")
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __init__(self, image: str, tag: str) -> None:
+        self.tag: str = sys.intern(tag)
+        """The tag of the image."""
+        self._repository: str | None = None
+        self._image: str | None = None
+        self.image = image
+
+    @property
+    def image(self) -> str:
+        """The full image name."""
+        if self._repository is not None:
+            return f"{self._repository}:{self.tag}"
+        assert self._image is not None
+        return self._image
+
+    @image.setter
+    def image(self, image: str) -> None:
+        repository, separator, tag = image.rpartition(":")
+        if separator and tag == self.tag:
+            self._repository, self._image = sys.intern(repository), None
+        else:
+            self._repository, self._image = None, image
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlatformImage):
+            return NotImplemented
+        return (self.image, self.tag) == (other.image, other.tag)
 
-    image: str
-    """The full image name."""
+    def __repr__(self) -> str:
+        return f"PlatformImage(image={self.image!r}, tag={self.tag!r})"
 
-    tag: str
-    """The tag of the image."""
+    def to_dict(self) -> dict[str, str]:
+        """Convert the platform image to a dictionary."""
+        return {"image": self.image, "tag": self.tag}
 
 
-@dataclass
 class Image:
     """An image produced by a development repository release.
 
     When no platform is specified, manifest_tag and platform_tag are the same,
     and manifest_image and platform_image are the same.
+
+    Like platform images, images intern their strings and derive their full
+    image name from the repository and the tag when possible.
     """
 
-    repository: str
-    """The image repository."""
+    __slots__ = ("repository", "tag", "platforms", "_image")
+
+    __hash__ = None  # type: ignore[assignment]
 
-    image: str
-    """The full image name."""
+    def __init__(
+        self,
+        repository: str,
+        image: str,
+        tag: str,
+        platforms: dict[str, PlatformImage] | None = None,
+    ) -> None:
+        self.repository: str = sys.intern(repository)
+        """The image repository."""
+        self.tag: str = sys.intern(tag)
+        """The tag of the image."""
+        self.platforms: dict[str, PlatformImage] = (
+            platforms if platforms is not None else {}
+        )
+        """The platform specific images used by this image manifest (if any)."""
+        self._image: str | None = None
+        self.image = image
+
+    @property
+    def image(self) -> str:
+        """The full image name."""
+        if self._image is None:
+            return f"{self.repository}:{self.tag}"
+        return self._image
+
+    @image.setter
+    def image(self, image: str) -> None:
+        self._image = None if image == f"{self.repository}:{self.tag}" else image
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Image):
+            return NotImplemented
+        return (self.repository, self.image, self.tag, self.platforms) == (
+            other.repository,
+            other.image,
+            other.tag,
+            other.platforms,
+        )
 
-    tag: str
-    """The tag of the image."""
+    def __repr__(self) -> str:
+        return (
+            f"Image(repository={self.repository!r}, image={self.image!r}, "
+            f"tag={self.tag!r}, platforms={self.platforms!r})"
+        )
 
-    platforms: dict[str, PlatformImage] = field(default_factory=dict)
-    """The platform specific images used by this image manifest (if any)."""
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the image to a dictionary."""
+        return {
+            "repository": self.repository,
+            "image": self.image,
+            "tag": self.tag,
+            "platforms": {
+                platform: platform_image.to_dict()
+                for platform, platform_image in self.platforms.items()
+            },
+        }
+
+    @property
+    def content_hash(self) -> str:
+        """The hash of the canonical JSON form of the image, platform images included."""
+        return digest("image", canonical_json(self.to_dict()))
 
     @classmethod
     def parse_dict(cls, data: dict[str, Any]) -> "Image":
@@ -45,7 +140,7 @@ class Image:
         )
         if platforms := data.get("platforms"):
             for platform, platform_image in platforms.items():
-                image.platforms[platform] = PlatformImage(
+                image.platforms[sys.intern(platform)] = PlatformImage(
                     image=platform_image["image"],
                     tag=platform_image["tag"],
                 )
@@ -64,7 +159,7 @@ class Image:
 
     def get_platform_images(
         self,
-        platforms: list[str] | None = None,
+        platforms: Collection[str] | None = None,
     ) -> list[PlatformImage]:
         """Get platform images.
 
@@ -80,7 +175,7 @@ class Image:
 
     def get_platform_tags(
         self,
-        platforms: list[str] | None = None,
+        platforms: Collection[str] | None = None,
     ) -> list[str]:
         """Get platform tags.
 
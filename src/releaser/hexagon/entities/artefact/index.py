@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import abc
+from typing import Callable, Collection, Iterable
+
+from .image import Image
+from .manifest import Manifest
+
+
+class BaseManifestIndex(abc.ABC):
+    """Abstract base class for indexes over the images of a manifest.
+
+    Images are identified by integers, in manifest order.
+    """
+
+    @abc.abstractmethod
+    def find_images(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+    ) -> set[int]:
+        """Find the images matching all given filters, as in `Manifest.get_images`.
+
+        If `platforms` is specified, only images with any of those platforms are found.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def find_applications(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+    ) -> list[str]:
+        """Find the applications matching all given filters, in manifest order.
+
+        Each filter may be satisfied by a different image of an application.
+        Repositories match when any of the given repositories is a substring
+        of the image repository, as in `Application.contains_image_for_any_repository`.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_keys(self, kind: str) -> Iterable[str]:
+        """Get the distinct keys of an index.
+
+        `kind` is the name of a filter of `find_images`: "applications",
+        "repositories", "manifest_tags" or "platforms".
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_image(self, image_id: int) -> Image:
+        """Get an image from its identifier."""
+        raise NotImplementedError
+
+    def get_images(self, image_ids: Iterable[int]) -> list[Image]:
+        """Get images from their identifiers, in manifest order."""
+        return [self.get_image(image_id) for image_id in sorted(image_ids)]
+
+    def filter_images(
+        self, field: str, match: Callable[[str], bool], image_ids: Iterable[int]
+    ) -> set[int]:
+        """Filter images whose `field` ("tag" or "image") matches.
+
+        Images are read one by one by default. Indexes able to match each
+        distinct value once override this method.
+        """
+        return {
+            image_id
+            for image_id in image_ids
+            if match(getattr(self.get_image(image_id), field))
+        }
+
+    def get_revisions(self, image_ids: Collection[int]) -> list[str]:
+        """Get the revisions of the manifests holding any of the images.
+
+        Indexes which do not record revisions return an empty list.
+        """
+        return []
+
+
+class ManifestIndex(BaseManifestIndex):
+    """Inverted indexes over the images of a manifest.
+
+    Images are identified by their position within `images`, in manifest
+    order, and indexed by application, repository, manifest tag and
+    platform, so that queries are answered with set intersections rather
+    than by scanning all images. The index is not updated when the
+    manifest changes.
+    """
+
+    def __init__(self, manifest: Manifest) -> None:
+        self.images: list[Image] = []
+        """All images of the manifest."""
+
+        self.applications: list[str] = list(manifest.applications)
+        """All application names of the manifest."""
+
+        self.revision: str | None = manifest.revision
+        """The revision of the manifest."""
+
+        self.image_applications: list[str] = []
+        """The application name of each image."""
+
+        self.by_application: dict[str, set[int]] = {}
+        self.by_repository: dict[str, set[int]] = {}
+        self.by_manifest_tag: dict[str, set[int]] = {}
+        self.by_platform: dict[str, set[int]] = {}
+        for app_name, app in manifest.applications.items():
+            image_ids = self.by_application.setdefault(app_name, set())
+            for image in app.images:
+                image_id = len(self.images)
+                self.images.append(image)
+                self.image_applications.append(app_name)
+                image_ids.add(image_id)
+                self.by_repository.setdefault(image.repository, set()).add(image_id)
+                if image.platforms:
+                    # Only images with platforms have a manifest tag
+                    self.by_manifest_tag.setdefault(image.tag, set()).add(image_id)
+                for platform in image.platforms:
+                    self.by_platform.setdefault(platform, set()).add(image_id)
+
+    def find_images(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+    ) -> set[int]:
+        candidates: list[set[int]] = []
+        if applications:
+            candidates.append(_union(self.by_application, applications))
+        if repositories:
+            candidates.append(_union(self.by_repository, repositories))
+        if manifest_tags:
+            candidates.append(_union(self.by_manifest_tag, manifest_tags))
+        if platforms:
+            candidates.append(_union(self.by_platform, platforms))
+        if not candidates:
+            return set(range(len(self.images)))
+        return _intersection(candidates)
+
+    def find_applications(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+    ) -> list[str]:
+        names = self.applications
+        if applications:
+            names = [name for name in names if name in applications]
+        candidates: list[set[int]] = []
+        if repositories:
+            candidates.append(
+                _union(
+                    self.by_repository,
+                    (
+                        indexed
+                        for indexed in self.by_repository
+                        if any(repository in indexed for repository in repositories)
+                    ),
+                )
+            )
+        if platforms:
+            candidates.append(_union(self.by_platform, platforms))
+        if manifest_tags:
+            # Images with an empty tag never match a manifest tag
+            candidates.append(
+                _union(self.by_manifest_tag, [tag for tag in manifest_tags if tag])
+            )
+        for image_ids in candidates:
+            matching = {self.image_applications[image_id] for image_id in image_ids}
+            names = [name for name in names if name in matching]
+        return names
+
+    def get_keys(self, kind: str) -> Iterable[str]:
+        indexes = {
+            "applications": self.by_application,
+            "repositories": self.by_repository,
+            "manifest_tags": self.by_manifest_tag,
+            "platforms": self.by_platform,
+        }
+        return indexes[kind].keys()
+
+    def get_image(self, image_id: int) -> Image:
+        return self.images[image_id]
+
+    def get_revisions(self, image_ids: Collection[int]) -> list[str]:
+        if self.revision is None or not image_ids:
+            return []
+        return [self.revision]
+
+
+def _union(index: dict[str, set[int]], keys: Iterable[str]) -> set[int]:
+    result: set[int] = set()
+    for key in keys:
+        result.update(index.get(key, ()))
+    return result
+
+
+def _intersection(sets: list[set[int]]) -> set[int]:
+    sets = sorted(sets, key=len)
+    result = set(sets[0])
+    for other in sets[1:]:
+        result.intersection_update(other)
+    return result
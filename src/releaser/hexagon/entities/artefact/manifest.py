@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, MutableMapping, Optional
 
+from ...errors import AbortedManifestError
 from .application import Application
+from .content_hash import digest
 from .image import Image
 
 
@@ -11,23 +13,84 @@ from .image import Image
 class Manifest:
     """A manifest file."""
 
-    applications: Dict[str, Application]
-    """The applications artefacts."""
+    applications: MutableMapping[str, Application]
+    """The applications artefacts (readers may decode them lazily, when accessed)."""
+
+    revision: Optional[str] = None
+    """The SHA of the commit the manifest was generated from, recorded along with fingerprints."""
+
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+    """The fingerprints of the inputs of each application, used to regenerate the manifest incrementally."""
+
+    content_hashes: Dict[str, str] = field(default_factory=dict)
+    """The content hashes of applications recorded in the manifest, used instead of hashing applications."""
 
     @classmethod
     def parse_dict(cls, data: dict[str, Any]) -> "Manifest":
-        """Parse a manifest from a dictionary."""
+        """Parse a manifest from a dictionary.
+
+        Raises `AbortedManifestError` for the partial output of an aborted generation.
+        """
+        if data.get("aborted"):
+            raise AbortedManifestError()
         return cls(
             applications={
                 app: Application.parse_dict(artefacts)
                 for app, artefacts in data["applications"].items()
+            },
+            revision=data.get("revision"),
+            fingerprints=dict(data.get("fingerprints", {})),
+            content_hashes=dict(data.get("content_hashes", {})),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the manifest to a dictionary.
+
+        Revision, fingerprints and content hashes are omitted when not recorded.
+        """
+        data: dict[str, Any] = {
+            "applications": {
+                app: artefacts.to_dict() for app, artefacts in self.applications.items()
             }
+        }
+        if self.revision is not None:
+            data["revision"] = self.revision
+        if self.fingerprints:
+            data["fingerprints"] = dict(self.fingerprints)
+        if self.content_hashes:
+            data["content_hashes"] = dict(self.content_hashes)
+        return data
+
+    @property
+    def content_hash(self) -> str:
+        """The root hash of the manifest, computed from the content hashes of applications.
+
+        Applications are hashed by name, so that the order of applications
+        does not change the hash.
+        """
+        return digest(
+            "manifest",
+            *(
+                f"{name}\0{self.get_content_hash(name)}"
+                for name in sorted(self.applications)
+            ),
         )
 
+    def get_content_hash(self, app: str) -> str:
+        """Get the content hash of an application.
+
+        Recorded content hashes are used when available, so that applications
+        read lazily are not decoded.
+        """
+        recorded = self.content_hashes.get(app)
+        if recorded is not None:
+            return recorded
+        return self.applications[app].content_hash
+
     def get_apps(
         self,
         applications: list[str] | None = None,
-    ) -> dict[str, Application]:
+    ) -> MutableMapping[str, Application]:
         """Get applications.
 
         If `applications` is specified, only applications with any of given names are returned.
@@ -35,8 +98,8 @@ class Manifest:
         if not applications:
             return self.applications
         return {
-            app_name: app
-            for app_name, app in self.applications.items()
+            app_name: self.applications[app_name]
+            for app_name in self.applications
             if app_name in applications
         }
 
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from .image import Image
+from .matcher import CommitMsgMatcher
+from .path_index import PathIndex
 from .policy import CommitMsgMatchPolicy, GitCommitShaTag, LiteralTag, VersionTag
 from .release_strategy import (
     Application,
@@ -14,9 +16,11 @@ __all__ = [
     "ApplicationReleaseStrategy",
     "ReleaseStrategy",
     "CommitMsgMatchPolicy",
+    "CommitMsgMatcher",
     "GitCommitShaTag",
     "VersionTag",
     "LiteralTag",
     "Image",
+    "PathIndex",
     "Rule",
 ]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import re
+from typing import Sequence
+
+from ...errors import InvalidPatternError
+
+_SPECIAL_CHARS = set(".^$*+?{}[]\\|()")
+_OPTIONAL_QUANTIFIERS = set("*?{")
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def compile_pattern(pattern: str, patterns: list[str] | None = None) -> re.Pattern[str]:
+    """Compile a regular expression, raising InvalidPatternError when invalid."""
+    try:
+        return re.compile(pattern)
+    except re.error as exc:
+        raise InvalidPatternError(pattern, patterns) from exc
+
+
+def literal_prefix(pattern: str) -> tuple[str, bool]:
+    """Extract the literal prefix of a regular expression.
+
+    Returns the prefix, and whether the whole pattern is a literal. Any
+    string matched by the pattern (using `re.match`) starts with the prefix.
+    """
+    if "|" in pattern:
+        # Alternatives may not share a prefix
+        return "", False
+    chars: list[str] = []
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "\\":
+            escaped = pattern[pos + 1 : pos + 2]
+            if not escaped or escaped.isalnum() or not escaped.isascii():
+                break
+            char_size = 2
+            char = escaped
+        elif char in _SPECIAL_CHARS:
+            break
+        else:
+            char_size = 1
+        following = pattern[pos + char_size : pos + char_size + 1]
+        if following and following in _OPTIONAL_QUANTIFIERS:
+            # The character may not appear in matched strings
+            return "".join(chars), False
+        chars.append(char)
+        pos += char_size
+        if following == "+":
+            return "".join(chars), False
+    return "".join(chars), pos == len(pattern)
+
+
+class CommitMsgMatcher:
+    """Match commit messages against the `match` patterns of a policy.
+
+    Patterns are compiled once: `*` matches any message, literal patterns
+    are checked using `str.startswith`, and other patterns are merged into a
+    single alternation, skipped when the message does not start with the
+    literal prefix of any of them. Invalid patterns raise InvalidPatternError.
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns = tuple(patterns)
+        self.match_all = "*" in self.patterns
+        literals: list[str] = []
+        merged: list[str] = []
+        prefixes: list[str] = []
+        separate: list[re.Pattern[str]] = []
+        for pattern in self.patterns:
+            if pattern == "*":
+                continue
+            regexp = compile_pattern(pattern, list(self.patterns))
+            prefix, is_literal = literal_prefix(pattern)
+            if is_literal:
+                literals.append(prefix)
+            elif _BACKREFERENCE.search(pattern):
+                # Group numbers change once merged into an alternation
+                separate.append(regexp)
+            else:
+                merged.append(pattern)
+                prefixes.append(prefix)
+        self._literals = tuple(literals)
+        self._prefixes = tuple(prefixes) if all(prefixes) else None
+        self._regexp: re.Pattern[str] | None = None
+        if merged:
+            try:
+                self._regexp = re.compile("|".join(f"(?:{p})" for p in merged))
+            except re.error:
+                # e.g. global inline flags or duplicate group names
+                separate.extend(re.compile(pattern) for pattern in merged)
+                self._prefixes = None
+        self._separate = tuple(separate)
+
+    def __repr__(self) -> str:
+        return f"CommitMsgMatcher({list(self.patterns)!r})"
+
+    def matches(self, commit_msg: str) -> bool:
+        """Check if the commit message matches any pattern."""
+        if self.match_all:
+            return True
+        if self._literals and commit_msg.startswith(self._literals):
+            return True
+        if self._regexp is not None and (
+            self._prefixes is None or commit_msg.startswith(self._prefixes)
+        ):
+            if self._regexp.match(commit_msg):
+                return True
+        return any(regexp.match(commit_msg) for regexp in self._separate)
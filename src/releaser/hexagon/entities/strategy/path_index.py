@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import posixpath
+from typing import Iterable
+
+
+class _Node:
+    __slots__ = ("children", "names")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.names: set[str] = set()
+
+
+class PathIndex:
+    """A prefix tree mapping paths to the applications depending on them.
+
+    Paths are split into components, so that `app` matches `app/Dockerfile`
+    but not `application/Dockerfile`. Looking up a path costs one step per
+    path component, regardless of the number of indexed paths.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+
+    def add(self, path: str, name: str) -> None:
+        """Declare that the application `name` depends on `path`."""
+        node = self._root
+        for component in _split(path):
+            node = node.children.setdefault(component, _Node())
+        node.names.add(name)
+
+    def match(self, path: str) -> set[str]:
+        """Get the names of the applications depending on `path`."""
+        node = self._root
+        names = set(node.names)
+        for component in _split(path):
+            child = node.children.get(component)
+            if child is None:
+                break
+            node = child
+            names.update(node.names)
+        return names
+
+    def match_any(self, paths: Iterable[str]) -> set[str]:
+        """Get the names of the applications depending on any of `paths`."""
+        names: set[str] = set()
+        for path in paths:
+            names.update(self.match(path))
+        return names
+
+
+def _split(path: str) -> list[str]:
+    normalized = posixpath.normpath(path)
+    if normalized == ".":
+        return []
+    return normalized.split("/")
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
 from typing import Any, Literal
 
+from .matcher import CommitMsgMatcher, compile_pattern
+
 
 @dataclass
 class VersionTag:
@@ -87,6 +90,30 @@ class CommitMsgMatchPolicy:
     depth: int = 20
     """The number of commit messages to read."""
 
+    def __post_init__(self) -> None:
+        # Compile patterns once, so that invalid patterns are reported when
+        # the strategy is loaded rather than during a release.
+        self._matcher = CommitMsgMatcher(self.match)
+        self._filter = (self.filter, self._compile_filter(self.filter))
+
+    @property
+    def matcher(self) -> CommitMsgMatcher:
+        """The compiled `match` patterns."""
+        if self._matcher.patterns != tuple(self.match):
+            self._matcher = CommitMsgMatcher(self.match)
+        return self._matcher
+
+    @property
+    def filter_regexp(self) -> re.Pattern[str] | None:
+        """The compiled `filter` pattern."""
+        if self._filter[0] != self.filter:
+            self._filter = (self.filter, self._compile_filter(self.filter))
+        return self._filter[1]
+
+    @staticmethod
+    def _compile_filter(filter: str | None) -> re.Pattern[str] | None:
+        return compile_pattern(filter) if filter else None
+
     @classmethod
     def parse_dict(cls, data: dict[str, Any]) -> "CommitMsgMatchPolicy":
         """Parse a match policy from a dictionary."""
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import posixpath
 from dataclasses import dataclass, field
 from typing import Any
 
 from .image import Image
+from .path_index import PathIndex
 from .policy import Rule
 
 
@@ -20,6 +22,12 @@ class Application:
     Images must be a list of OCI-compliant image repositories.
     """
 
+    paths: list[str] | None = None
+    """Additional paths the application depends on.
+
+    Image build contexts and Dockerfiles do not need to be listed.
+    """
+
     @classmethod
     def parse_dict(cls, data: dict[str, Any]) -> "Application":
         """Parse an application from a dictionary."""
@@ -27,6 +35,7 @@ class Application:
         return cls(
             on=on,
             images=[_asimage(image) for image in data.get("images", [])],
+            paths=_aslist(data.get("paths")) or None,
         )
 
 
@@ -44,6 +53,22 @@ class ApplicationReleaseStrategy:
     Images must be a list of OCI-compliant image repositories.
     """
 
+    paths: list[str] = field(default_factory=list)
+    """Additional paths the application depends on."""
+
+    def get_dependency_paths(self) -> list[str]:
+        """Get the paths whose changes affect the application.
+
+        These are the build context and Dockerfile of each image (Dockerfiles
+        are relative to their build context), and the additional paths.
+        """
+        paths: list[str] = []
+        for image in self.images:
+            paths.append(image.get_context())
+            paths.append(posixpath.join(image.get_context(), image.get_dockerfile()))
+        paths.extend(self.paths)
+        return paths
+
 
 @dataclass(frozen=True)
 class ReleaseStrategy:
@@ -78,9 +103,19 @@ class ReleaseStrategy:
                     name=app_name,
                     on=_aslist(application.on) or self.on,
                     images=application.images or [],
+                    paths=application.paths or [],
                 )
         raise ValueError(f"Application {name} not found in release strategy")
 
+    def get_path_index(self) -> PathIndex:
+        """Index the paths each application depends on."""
+        index = PathIndex()
+        for name in self.applications:
+            application = self.get_release_strategy_for_application(name)
+            for path in application.get_dependency_paths():
+                index.add(path, name)
+        return index
+
 
 def _aslist(any: Any) -> list[Any]:
     """Convert a value to a list."""
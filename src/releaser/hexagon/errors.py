@@ -6,3 +6,38 @@ from __future__ import annotations
 class ReleaseStrategyNotFoundError(Exception):
     def __init__(self):
         super().__init__("Cannot find any release strategy in current directory")
+
+
+class DirtyWorkingTreeError(Exception):
+    def __init__(self, paths: list[str]):
+        self.paths = paths
+        super().__init__(
+            f"Uncommitted changes within files of released applications (paths={paths})"
+        )
+
+
+class UnknownRevisionError(ValueError):
+    def __init__(self, revision: str):
+        self.revision = revision
+        super().__init__(f"Unknown revision: {revision}")
+
+
+class AbortedManifestError(ValueError):
+    def __init__(self):
+        super().__init__(
+            "Invalid manifest: its generation was aborted, so it is incomplete"
+        )
+
+
+class InvalidPatternError(ValueError):
+    def __init__(self, pattern: str, patterns: list[str] | None = None):
+        self.pattern = pattern
+        message = f"Invalid regexp: {pattern}"
+        if patterns is not None:
+            message += f" (patterns={patterns})"
+        super().__init__(message)
+
+
+class InvalidQueryError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(f"Invalid query: {message}")
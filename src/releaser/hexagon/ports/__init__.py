@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from .async_git_reader import AsyncGitReader
 from .git_reader import GitReader
 from .image_baker import ImageBaker
 from .json_writer import JsonWriter
@@ -8,6 +9,7 @@ from .version_reader import VersionReader
 from .webhook_client import WebhookClient
 
 __all__ = [
+    "AsyncGitReader",
     "ImageBaker",
     "GitReader",
     "WebhookClient",
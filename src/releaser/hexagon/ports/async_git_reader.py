@@ -0,0 +1,87 @@
+"""This module defines the AsyncGitReader abstract base class."""
+
+from __future__ import annotations
+
+import abc
+import re
+from typing import AsyncGenerator
+
+
+class AsyncGitReader(abc.ABC):
+    """An asynchronous variant of the GitReader port.
+
+    Reads may run concurrently, so implementations must support
+    concurrent calls from tasks running within the same event loop.
+    """
+
+    @abc.abstractmethod
+    async def is_dirty(self, paths: list[str] | None = None) -> bool:
+        """Check if the repository has uncommitted changes.
+
+        When `paths` is given, only changes within those paths are considered.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def read_current_branch(self) -> str:
+        """Read the name of the current branch."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def read_most_recent_commit_sha(self) -> str:
+        """Read the SHA of the latest commit."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def read_commit_message_history(self, depth: int) -> list[str]:
+        """Read the messages of the latest commits, most recent first."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def read_changed_files(self, base: str) -> list[str]:
+        """Read the files changed between given revision and HEAD.
+
+        Paths are relative to the current working directory.
+        `UnknownRevisionError` is raised when the revision is not found in
+        the repository.
+        """
+        raise NotImplementedError
+
+    async def iter_commit_message_history(
+        self, depth: int
+    ) -> AsyncGenerator[str, None]:
+        """Iterate over the messages of the latest commits, most recent first.
+
+        Implementations may stream the history, so that closing the generator
+        early stops reading the history.
+        """
+        for commit_msg in await self.read_commit_message_history(depth):
+            yield commit_msg
+
+    async def read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        """Extract the last commit message from a commit history.
+
+        History is consumed lazily and reading stops as soon as a commit
+        message matches.
+        """
+        history = self.iter_commit_message_history(depth)
+        try:
+            if filter:
+                regexp = re.compile(filter)
+                async for commit_msg in history:
+                    if regexp.match(commit_msg):
+                        return commit_msg
+                return None
+            async for commit_msg in history:
+                return commit_msg
+            return None
+        finally:
+            await history.aclose()
+
+    async def current_reference_matches(self, ref: list[str]) -> bool:
+        """Check if the current reference matches the given ref."""
+        if not ref:
+            return True
+        return await self.read_current_branch() in ref
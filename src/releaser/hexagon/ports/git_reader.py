@@ -4,12 +4,17 @@ from __future__ import annotations
 
 import abc
 import re
+from typing import Generator
 
 
 class GitReader(abc.ABC):
     @abc.abstractmethod
-    def is_dirty(self) -> bool:
-        """Check if the repository has uncommitted changes."""
+    def is_dirty(self, paths: list[str] | None = None) -> bool:
+        """Check if the repository has uncommitted changes.
+
+        When `paths` is given (e.g. the build contexts of the applications
+        being released), only changes within those paths are considered.
+        """
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -27,18 +32,43 @@ class GitReader(abc.ABC):
         """Read the message of the latest commit."""
         raise NotImplementedError
 
-    def read_last_commit_message(self, depth: int, filter: str | None) -> str | None:
-        """Extract the last commit message from a commit history."""
-        history = self.read_commit_message_history(depth)
-        if not history:
-            return None
-        if filter:
-            regexp = re.compile(filter)
-            for commit_msg in history:
-                if regexp.match(commit_msg):
-                    return commit_msg
-            return None
-        return history[0]
+    @abc.abstractmethod
+    def read_changed_files(self, base: str) -> list[str]:
+        """Read the files changed between given revision and HEAD.
+
+        Paths are relative to the current working directory (files outside
+        the working directory start with `../`). `UnknownRevisionError` is
+        raised when the revision is not found in the repository.
+        """
+        raise NotImplementedError
+
+    def iter_commit_message_history(self, depth: int) -> Generator[str, None, None]:
+        """Iterate over the messages of the latest commits, most recent first.
+
+        Implementations may stream the history, so that closing the generator
+        early stops reading the history.
+        """
+        yield from self.read_commit_message_history(depth)
+
+    def read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        """Extract the last commit message from a commit history.
+
+        History is consumed lazily and reading stops as soon as a commit
+        message matches. The filter may be given as a compiled pattern.
+        """
+        history = self.iter_commit_message_history(depth)
+        try:
+            if filter:
+                regexp = re.compile(filter)
+                for commit_msg in history:
+                    if regexp.match(commit_msg):
+                        return commit_msg
+                return None
+            return next(history, None)
+        finally:
+            history.close()
 
     def current_reference_matches(self, ref: list[str]) -> bool:
         """Check if the current reference matches the given ref."""
@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import abc
+from typing import Iterator
 
 from ..entities import artefact
 
 
 class JsonWriter(abc.ABC):
-    """Abstract base class for writing manifest to a destination."""
+    """Abstract base class for writing manifest to a destination.
+
+    Manifests can also be written incrementally: `begin_manifest` is called
+    first, then `write_application` for each application, and finally
+    `end_manifest` (or `abort_manifest` when generation fails). By default,
+    applications are collected in memory and the manifest is written at once
+    by `end_manifest`. Writers able to stream a manifest override these methods.
+    """
+
+    _pending_manifest: artefact.Manifest | None = None
 
     @abc.abstractmethod
     def write_manifest(self, manifest: artefact.Manifest) -> None:
@@ -19,3 +29,44 @@ class JsonWriter(abc.ABC):
     def read_manifest(self) -> artefact.Manifest | None:
         """Read manifest from a destination."""
         raise NotImplementedError
+
+    def read_applications(
+        self,
+    ) -> Iterator[tuple[str, artefact.Application]] | None:
+        """Read the applications of a manifest one at a time, or `None` without manifest.
+
+        By default, the whole manifest is read first. Readers able to stream
+        a manifest override this method.
+        """
+        manifest = self.read_manifest()
+        if manifest is None:
+            return None
+        return iter(manifest.applications.items())
+
+    def begin_manifest(self, revision: str | None = None) -> None:
+        """Start writing a manifest incrementally."""
+        self._pending_manifest = artefact.Manifest(applications={}, revision=revision)
+
+    def write_application(
+        self,
+        name: str,
+        application: artefact.Application,
+        fingerprint: str | None = None,
+    ) -> None:
+        """Write an application of the manifest being written."""
+        if self._pending_manifest is None:
+            raise RuntimeError("begin_manifest must be called first")
+        self._pending_manifest.applications[name] = application
+        if fingerprint is not None:
+            self._pending_manifest.fingerprints[name] = fingerprint
+
+    def end_manifest(self) -> None:
+        """Finish writing the manifest."""
+        if self._pending_manifest is None:
+            raise RuntimeError("begin_manifest must be called first")
+        manifest, self._pending_manifest = self._pending_manifest, None
+        self.write_manifest(manifest)
+
+    def abort_manifest(self) -> None:
+        """Discard the manifest being written."""
+        self._pending_manifest = None
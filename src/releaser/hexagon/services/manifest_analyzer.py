@@ -2,109 +2,244 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Collection, Iterable, Iterator, TypeVar
 
 from ..entities import artefact
+from ..errors import InvalidQueryError
+from .query_expression import parse_expression
 
+Q = TypeVar("Q", bound="Query")
 
-@dataclass
+
+@dataclass(frozen=True)
 class Query:
-    """Base class for all queries."""
+    """Base class for all queries.
 
-    pass
+    Queries are immutable and hashable: filters given as lists are
+    normalized into frozensets, so that equivalent queries are equal.
 
+    Besides filters, the images considered by a query can be selected
+    with a boolean expression (see `query_expression`), given as `where`.
+    """
 
-@dataclass
+    def __post_init__(self) -> None:
+        for option in fields(self):
+            value = getattr(self, option.name)
+            if option.name == "no_platform" or value is None:
+                continue
+            if option.name == "where":
+                if not isinstance(value, str):
+                    raise TypeError("where must be a string")
+                # Raise InvalidQueryError early for invalid expressions
+                parse_expression(value)
+                continue
+            if isinstance(value, str):
+                raise TypeError(f"{option.name} must be a collection of strings")
+            if not isinstance(value, frozenset):
+                object.__setattr__(self, option.name, frozenset(value))
+
+    @classmethod
+    def parse_dict(cls, data: dict[str, Any]) -> "Query":
+        """Parse query options from a dictionary.
+
+        Filters are lists of strings, and missing options use their
+        default value (no filter, platforms included).
+        """
+        names = [option.name for option in fields(cls)]
+        unknown = [key for key in data if key not in names]
+        if unknown:
+            raise InvalidQueryError(f"unknown options: {', '.join(unknown)}")
+        values: dict[str, Any] = {}
+        for name in names:
+            value = data.get(name)
+            if name == "no_platform":
+                if not isinstance(value, (bool, type(None))):
+                    raise InvalidQueryError(f"{name} must be a boolean")
+                values[name] = bool(value)
+            elif name == "where":
+                if not isinstance(value, (str, type(None))):
+                    raise InvalidQueryError(f"{name} must be a string")
+                values[name] = value
+            elif value is None or (
+                isinstance(value, list) and all(isinstance(v, str) for v in value)
+            ):
+                values[name] = value
+            else:
+                raise InvalidQueryError(f"{name} must be a list of strings")
+        return cls(**values)
+
+
+@dataclass(frozen=True)
 class ApplicationQuery(Query):
     """Options allowed when querying applications."""
 
-    application: list[str] | None
+    application: Collection[str] | None
     """Query applications with any of the given names."""
 
-    repository: list[str] | None
+    repository: Collection[str] | None
     """Query applications with images for any of the given repositories."""
 
-    platform: list[str] | None
+    platform: Collection[str] | None
     """Query applications with images for any of the given platforms."""
 
-    manifest_tag: list[str] | None
+    manifest_tag: Collection[str] | None
     """Query applications with images for any of the given manifest tags."""
 
+    where: str | None = None
+    """Query applications with images matching an expression."""
 
-@dataclass
+
+@dataclass(frozen=True)
 class RepositoryQuery(Query):
     """Options allowed when querying repositories."""
 
-    application: list[str] | None
+    application: Collection[str] | None
     """Query repositories for applications with any of the given names."""
 
-    platform: list[str] | None
+    platform: Collection[str] | None
     """Query repositories for images with any of the given platforms."""
 
-    manifest_tag: list[str] | None
+    manifest_tag: Collection[str] | None
     """Query repositories for images with any of the given manifest tags."""
 
+    where: str | None = None
+    """Query repositories for images matching an expression."""
 
-@dataclass
+
+@dataclass(frozen=True)
 class TagQuery(Query):
     """Options allowed when querying tags."""
 
-    application: list[str] | None
+    application: Collection[str] | None
     """Query tags for applications with any of the given names."""
 
-    repository: list[str] | None
+    repository: Collection[str] | None
     """Query tags for images with any of the given repositories."""
 
-    platform: list[str] | None
+    platform: Collection[str] | None
     """Query tags for platform images with any of the given platforms."""
 
-    manifest_tag: list[str] | None
+    manifest_tag: Collection[str] | None
     """Query tags for platform images with any of the given manifest tags."""
 
     no_platform: bool
     """Do not include platform tags in the result."""
 
+    where: str | None = None
+    """Query tags for images matching an expression."""
 
-@dataclass
+
+@dataclass(frozen=True)
 class ImageQuery(Query):
     """Options allowed when querying images."""
 
-    application: list[str] | None
+    application: Collection[str] | None
     """Query images for applications with any of the given names."""
 
-    repository: list[str] | None
+    repository: Collection[str] | None
     """Query images for any of the given repositories."""
 
-    platform: list[str] | None
+    platform: Collection[str] | None
     """Query platform images for any of the given platforms."""
 
-    manifest_tag: list[str] | None
+    manifest_tag: Collection[str] | None
     """Query platform images for any of the given manifest tags."""
 
     no_platform: bool
     """Do not include platform images in the result."""
 
+    where: str | None = None
+    """Query images for images matching an expression."""
 
-@dataclass
+
+@dataclass(frozen=True)
 class PlatformQuery(Query):
     """Options allowed when querying platforms."""
 
-    application: list[str] | None
+    application: Collection[str] | None
     """Query platforms for applications with any of the given names."""
 
-    repository: list[str] | None
+    repository: Collection[str] | None
     """Query platforms for images with any of the given repositories."""
 
-    manifest_tag: list[str] | None
+    manifest_tag: Collection[str] | None
     """Query platforms for images with any of the given manifest tags."""
 
+    where: str | None = None
+    """Query platforms for images matching an expression."""
+
+
+@dataclass(frozen=True)
+class RevisionQuery(Query):
+    """Options allowed when querying revisions (commits) manifests were generated from."""
+
+    application: Collection[str] | None
+    """Query revisions for applications with any of the given names."""
+
+    repository: Collection[str] | None
+    """Query revisions for images with any of the given repositories."""
+
+    platform: Collection[str] | None
+    """Query revisions for images with any of the given platforms."""
+
+    manifest_tag: Collection[str] | None
+    """Query revisions for images with any of the given manifest tags."""
+
+    where: str | None = None
+    """Query revisions for images matching an expression."""
+
 
 @dataclass
 class ManifestAnalyzer:
-    """Service used to analyze manifest."""
-
-    manifest: artefact.Manifest
-    """The manifest to analyze."""
+    """Service used to analyze manifest.
+
+    Queries are answered using a ManifestIndex, built on first query, and
+    the results of the most recent queries are cached. Both are dropped
+    when another manifest is assigned, or when `invalidate` is called after
+    modifying the manifest in place.
+
+    An analyzer can also be created from a prebuilt index using `from_index`,
+    in which case queries are answered without a manifest.
+    """
+
+    manifest: artefact.Manifest | None
+    """The manifest to analyze (`None` when created from a prebuilt index)."""
+
+    max_cached_results: int = 256
+    """The maximum number of query results kept in cache."""
+
+    _index: tuple[artefact.Manifest | None, artefact.BaseManifestIndex] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _results: OrderedDict[Query, tuple[str, ...]] = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_index(
+        cls, index: artefact.BaseManifestIndex, max_cached_results: int = 256
+    ) -> "ManifestAnalyzer":
+        """Create an analyzer answering queries using a prebuilt index."""
+        analyzer = cls(manifest=None, max_cached_results=max_cached_results)
+        analyzer._index = (None, index)
+        return analyzer
+
+    @property
+    def index(self) -> artefact.BaseManifestIndex:
+        """The index of the analyzed manifest."""
+        if self._index is None or self._index[0] is not self.manifest:
+            self.invalidate()
+            if self.manifest is None:
+                raise ValueError("No manifest to index")
+            self._index = (self.manifest, artefact.ManifestIndex(self.manifest))
+        return self._index[1]
+
+    def invalidate(self) -> None:
+        """Drop the index and the cached results, e.g. after modifying the manifest."""
+        self._index = None
+        self._results.clear()
 
     def execute(self, query: Query) -> list[str]:
         """Execute query."""
@@ -118,75 +253,217 @@ class ManifestAnalyzer:
             return self._get_tags(query)
         if isinstance(query, PlatformQuery):
             return self._get_platforms(query)
+        if isinstance(query, RevisionQuery):
+            return self.get_revisions(query)
         raise ValueError(f"Invalid query type: {type(query)}")
 
+    def execute_batch(self, queries: Iterable[Query]) -> Iterator[list[str]]:
+        """Execute queries, yielding the result of each query in turn.
+
+        All queries are answered using the same index.
+        """
+        for query in queries:
+            yield self.execute(query)
+
+    @classmethod
+    def execute_streaming(
+        cls,
+        query: Query,
+        applications: Iterable[tuple[str, artefact.Application]],
+    ) -> list[str]:
+        """Execute query in a single pass over applications, e.g. read from a stream.
+
+        Filters apply to each image on its own, so the result is the union of
+        the results for each application, and only one application is held
+        at a time. Results are returned in the order they are first found.
+        """
+        names: Collection[str] | None = getattr(query, "application", None)
+        results: dict[str, None] = {}
+        for name, application in applications:
+            if names and name not in names:
+                continue
+            analyzer = cls(
+                artefact.Manifest(applications={name: application}),
+                max_cached_results=0,
+            )
+            results.update(dict.fromkeys(analyzer.execute(query)))
+        return list(results)
+
     def get_manifest(self) -> artefact.Manifest:
         """Get manifest."""
+        if self.manifest is None:
+            raise ValueError("Analyzer was created without a manifest")
         return self.manifest
 
     def get_applications(self, query: ApplicationQuery) -> list[str]:
         """Query applications."""
-        applications: list[str] = []
-        for app_name, app in self.manifest.get_apps(query.application).items():
-            if query.repository and not app.contains_image_for_any_repository(
-                *query.repository
-            ):
-                continue
-            if query.platform and not app.contains_image_for_any_platform(
-                *query.platform
-            ):
-                continue
-            if query.manifest_tag and not app.contains_image_for_any_manifest_tag(
-                *query.manifest_tag
-            ):
-                continue
-            applications.append(app_name)
-        return applications
+        return self._get_cached(query, self._find_applications)
 
     def get_repositories(self, query: RepositoryQuery) -> list[str]:
         """Query image repositories."""
-        repositories: list[str] = []
-        for image in self.manifest.get_images(
-            query.application, manifest_tags=query.manifest_tag
-        ):
-            if query.platform and not image.contains_image_for_any_platform(
-                *query.platform
-            ):
-                continue
-            repositories.append(image.repository)
-        return list(set(repositories))
+        return self._get_cached(query, self._find_repositories)
 
     def get_images(self, query: ImageQuery) -> list[str]:
         """Query full image names."""
-        images: list[str] = []
-        for image in self.manifest.get_images(
-            query.application, query.repository, query.manifest_tag
-        ):
-            if not (query.platform or query.manifest_tag) or query.no_platform:
-                images.append(image.image)
-            else:
-                images.extend(
-                    img.image for img in image.get_platform_images(query.platform)
-                )
-        return list(set(images))
+        return self._get_cached(query, self._find_images)
 
     def _get_tags(self, query: TagQuery) -> list[str]:
         """Query image tags."""
-        tags: list[str] = []
-        for image_artefact in self.manifest.get_images(
-            query.application, query.repository, query.manifest_tag
-        ):
-            if not (query.platform or query.manifest_tag) or query.no_platform:
-                tags.append(image_artefact.tag)
-            if not query.no_platform:
-                tags.extend(image_artefact.get_platform_tags(query.platform))
-        return list(set(tags))
+        return self._get_cached(query, self._find_tags)
 
     def _get_platforms(self, query: PlatformQuery) -> list[str]:
         """Query image platforms."""
-        platforms: list[str] = []
-        for image in self.manifest.get_images(
-            query.application, query.repository, query.manifest_tag
-        ):
-            platforms.extend(image.platforms.keys())
-        return list(set(platforms))
+        return self._get_cached(query, self._find_platforms)
+
+    def get_revisions(self, query: RevisionQuery) -> list[str]:
+        """Query revisions, in the order manifests were indexed."""
+        return self._get_cached(query, self._find_revisions)
+
+    def _get_cached(self, query: Q, find: Callable[[Q], list[str]]) -> list[str]:
+        """Get the result of a query from cache, or find it and cache it."""
+        if self._index is not None and self._index[0] is not self.manifest:
+            # Results were cached for another manifest
+            self.invalidate()
+        results = self._results
+        if query in results:
+            results.move_to_end(query)
+            return list(results[query])
+        result = find(query)
+        results[query] = tuple(result)
+        if len(results) > self.max_cached_results:
+            results.popitem(last=False)
+        return result
+
+    def _find_applications(self, query: ApplicationQuery) -> list[str]:
+        index = self.index
+        names = index.find_applications(
+            query.application, query.repository, query.platform, query.manifest_tag
+        )
+        if query.where is None:
+            return names
+        selected = self._select(query.where)
+        return [
+            name
+            for name in names
+            if not selected.isdisjoint(index.find_images(applications=[name]))
+        ]
+
+    def _find_repositories(self, query: RepositoryQuery) -> list[str]:
+        index = self.index
+        image_ids = self._find_image_ids(
+            query.where,
+            query.application,
+            manifest_tags=query.manifest_tag,
+            platforms=query.platform,
+        )
+        return list({index.get_image(image_id).repository for image_id in image_ids})
+
+    def _find_images(self, query: ImageQuery) -> list[str]:
+        index = self.index
+        if not (query.platform or query.manifest_tag) or query.no_platform:
+            image_ids = self._find_image_ids(
+                query.where, query.application, query.repository, query.manifest_tag
+            )
+            return list({index.get_image(image_id).image for image_id in image_ids})
+        image_ids = self._find_image_ids(
+            query.where,
+            query.application,
+            query.repository,
+            query.manifest_tag,
+            query.platform,
+        )
+        return list(
+            {
+                platform_image.image
+                for image_id in image_ids
+                for platform_image in index.get_image(image_id).get_platform_images(
+                    query.platform
+                )
+            }
+        )
+
+    def _find_tags(self, query: TagQuery) -> list[str]:
+        index = self.index
+        image_ids = self._find_image_ids(
+            query.where, query.application, query.repository, query.manifest_tag
+        )
+        tags: set[str] = set()
+        if not (query.platform or query.manifest_tag) or query.no_platform:
+            tags.update(index.get_image(image_id).tag for image_id in image_ids)
+        if not query.no_platform:
+            if query.platform:
+                # Only images with any of the platforms have platform tags
+                image_ids = image_ids & index.find_images(platforms=query.platform)
+            for image_id in image_ids:
+                tags.update(index.get_image(image_id).get_platform_tags(query.platform))
+        return list(tags)
+
+    def _find_platforms(self, query: PlatformQuery) -> list[str]:
+        index = self.index
+        image_ids = self._find_image_ids(
+            query.where, query.application, query.repository, query.manifest_tag
+        )
+        return list(
+            {
+                platform
+                for image_id in image_ids
+                for platform in index.get_image(image_id).platforms
+            }
+        )
+
+    def _find_revisions(self, query: RevisionQuery) -> list[str]:
+        image_ids = self._find_image_ids(
+            query.where,
+            query.application,
+            query.repository,
+            query.manifest_tag,
+            query.platform,
+        )
+        return self.index.get_revisions(image_ids)
+
+    def _find_image_ids(
+        self,
+        where: str | None,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+    ) -> set[int]:
+        """Find the images matching filters and the `where` expression of a query."""
+        image_ids = self.index.find_images(
+            applications, repositories, manifest_tags, platforms
+        )
+        if where is not None:
+            image_ids &= self._select(where)
+        return image_ids
+
+    def _select(self, where: str) -> set[int]:
+        """Select the images matching an expression."""
+        index = self.index
+        return parse_expression(where).select(index, index.find_images())
+
+
+QUERY_TYPES: dict[str, type[Query]] = {
+    "applications": ApplicationQuery,
+    "repositories": RepositoryQuery,
+    "images": ImageQuery,
+    "tags": TagQuery,
+    "platforms": PlatformQuery,
+    "revisions": RevisionQuery,
+}
+"""Query types by name."""
+
+
+def parse_query(data: Any) -> Query:
+    """Parse a query from a dictionary.
+
+    The `query` key holds the name of the query type (see `QUERY_TYPES`),
+    and other keys hold the query options.
+    """
+    if not isinstance(data, dict):
+        raise InvalidQueryError("query must be an object")
+    options = dict(data)  # type: ignore[arg-type]
+    query_type = QUERY_TYPES.get(options.pop("query", None))
+    if query_type is None:
+        raise InvalidQueryError(f"query must be one of: {', '.join(QUERY_TYPES)}")
+    return query_type.parse_dict(options)
@@ -0,0 +1,277 @@
+"""Service used to compare two manifests."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator
+
+from ..entities import artefact
+
+
+@dataclass(frozen=True)
+class ImageDiff:
+    """An image added, removed or retagged between two manifests."""
+
+    application: str
+    """The name of the application of the image."""
+
+    repository: str
+    """The image repository."""
+
+    tag: str
+    """The tag of the image."""
+
+    image: str
+    """The full image name (the previous one for removed images)."""
+
+    previous_image: str | None = None
+    """The previous full image name of a retagged image."""
+
+    previous_revision: str | None = None
+    """The revision of the previous manifest, for an image retagged across revisions."""
+
+    revision: str | None = None
+    """The revision of the current manifest, for an image retagged across revisions."""
+
+
+@dataclass(frozen=True)
+class PlatformImageDiff:
+    """A platform image added, removed or retagged between two manifests."""
+
+    application: str
+    """The name of the application of the image."""
+
+    repository: str
+    """The repository of the image."""
+
+    tag: str
+    """The tag of the image (the manifest tag)."""
+
+    platform: str
+    """The platform of the platform image."""
+
+    image: str
+    """The full platform image name (the previous one for removed images)."""
+
+    previous_image: str | None = None
+    """The previous full platform image name of a retagged platform image."""
+
+    previous_revision: str | None = None
+    """The revision of the previous manifest, for an image retagged across revisions."""
+
+    revision: str | None = None
+    """The revision of the current manifest, for an image retagged across revisions."""
+
+
+@dataclass
+class ManifestDiff:
+    """The differences between two manifests.
+
+    Images are identified by their application, repository and tag, and
+    platform images by their image and platform. An image (or platform
+    image) is retagged when its full image name changed, or when its tag
+    moved to another build: the tag is released in both manifests, which
+    were generated from different revisions, by an application which
+    changed in between (its images, or its recorded fingerprint).
+    """
+
+    added_images: list[ImageDiff] = field(default_factory=list)
+    removed_images: list[ImageDiff] = field(default_factory=list)
+    retagged_images: list[ImageDiff] = field(default_factory=list)
+    added_platform_images: list[PlatformImageDiff] = field(default_factory=list)
+    removed_platform_images: list[PlatformImageDiff] = field(default_factory=list)
+    retagged_platform_images: list[PlatformImageDiff] = field(default_factory=list)
+
+    skipped_applications: int = 0
+    """The number of applications skipped because their content hash did not change."""
+
+    def is_empty(self) -> bool:
+        """Check whether the manifests have the same images."""
+        return not (
+            self.added_images
+            or self.removed_images
+            or self.retagged_images
+            or self.added_platform_images
+            or self.removed_platform_images
+            or self.retagged_platform_images
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the differences to a dictionary, omitting unset previous images and revisions."""
+        return {
+            name: [
+                {key: value for key, value in asdict(item).items() if value is not None}
+                for item in items
+            ]
+            for name, items in (
+                ("added_images", self.added_images),
+                ("removed_images", self.removed_images),
+                ("retagged_images", self.retagged_images),
+                ("added_platform_images", self.added_platform_images),
+                ("removed_platform_images", self.removed_platform_images),
+                ("retagged_platform_images", self.retagged_platform_images),
+            )
+        }
+
+
+@dataclass
+class ManifestDiffer:
+    """Service used to find the images changed between two manifests.
+
+    Applications with the same content hash (and the same fingerprint, when
+    recorded) in both manifests are skipped without comparing their images, and recorded content hashes are used
+    when available, so that unchanged applications of manifests read
+    lazily are not decoded.
+    """
+
+    previous: artefact.Manifest
+    """The manifest to compare from."""
+
+    current: artefact.Manifest
+    """The manifest to compare to."""
+
+    def execute(self) -> ManifestDiff:
+        """Compare the manifests."""
+        diff = ManifestDiff()
+        for name in self._iter_application_names():
+            if name not in self.current.applications:
+                for image in self.previous.applications[name].images:
+                    self._add_image(diff, name, image, removed=True)
+                continue
+            if name not in self.previous.applications:
+                for image in self.current.applications[name].images:
+                    self._add_image(diff, name, image)
+                continue
+            if not self._has_changed(name):
+                diff.skipped_applications += 1
+                continue
+            self._compare_applications(
+                diff,
+                name,
+                self.previous.applications[name],
+                self.current.applications[name],
+            )
+        return diff
+
+    def _iter_application_names(self) -> Iterator[str]:
+        """Iterate over names of applications of both manifests, previous ones first."""
+        yield from self.previous.applications
+        for name in self.current.applications:
+            if name not in self.previous.applications:
+                yield name
+
+    def _has_changed(self, name: str) -> bool:
+        """Check whether an application changed, comparing content hashes and recorded fingerprints."""
+        previous_fingerprint = self.previous.fingerprints.get(name)
+        current_fingerprint = self.current.fingerprints.get(name)
+        if previous_fingerprint and current_fingerprint:
+            if previous_fingerprint != current_fingerprint:
+                return True
+        previous_hash = self.previous.get_content_hash(name)
+        return previous_hash != self.current.get_content_hash(name)
+
+    def _get_revisions(self) -> tuple[str, str] | None:
+        """Get the revisions of both manifests when they differ, so that tags released in both moved."""
+        previous, current = self.previous.revision, self.current.revision
+        if previous is None or current is None or previous == current:
+            return None
+        return previous, current
+
+    def _compare_applications(
+        self,
+        diff: ManifestDiff,
+        name: str,
+        previous: artefact.Application,
+        current: artefact.Application,
+    ) -> None:
+        previous_images = {
+            (image.repository, image.tag): image for image in previous.images
+        }
+        current_keys = {(image.repository, image.tag) for image in current.images}
+        for image in previous.images:
+            if (image.repository, image.tag) not in current_keys:
+                self._add_image(diff, name, image, removed=True)
+        for image in current.images:
+            previous_image = previous_images.get((image.repository, image.tag))
+            if previous_image is None:
+                self._add_image(diff, name, image)
+            elif previous_image != image or self._get_revisions() is not None:
+                self._compare_images(diff, name, previous_image, image)
+
+    def _compare_images(
+        self,
+        diff: ManifestDiff,
+        name: str,
+        previous: artefact.Image,
+        current: artefact.Image,
+    ) -> None:
+        previous_revision, revision = self._get_revisions() or (None, None)
+        moved = revision is not None
+        if moved or previous.image != current.image:
+            diff.retagged_images.append(
+                ImageDiff(
+                    name,
+                    current.repository,
+                    current.tag,
+                    current.image,
+                    previous.image,
+                    previous_revision,
+                    revision,
+                )
+            )
+        for platform, platform_image in previous.platforms.items():
+            if platform not in current.platforms:
+                diff.removed_platform_images.append(
+                    PlatformImageDiff(
+                        name,
+                        previous.repository,
+                        previous.tag,
+                        platform,
+                        platform_image.image,
+                    )
+                )
+        for platform, platform_image in current.platforms.items():
+            previous_platform_image = previous.platforms.get(platform)
+            if previous_platform_image is None:
+                diff.added_platform_images.append(
+                    PlatformImageDiff(
+                        name,
+                        current.repository,
+                        current.tag,
+                        platform,
+                        platform_image.image,
+                    )
+                )
+            elif moved or previous_platform_image.image != platform_image.image:
+                diff.retagged_platform_images.append(
+                    PlatformImageDiff(
+                        name,
+                        current.repository,
+                        current.tag,
+                        platform,
+                        platform_image.image,
+                        previous_platform_image.image,
+                        previous_revision,
+                        revision,
+                    )
+                )
+
+    def _add_image(
+        self,
+        diff: ManifestDiff,
+        name: str,
+        image: artefact.Image,
+        removed: bool = False,
+    ) -> None:
+        """Record an image added or removed, along with its platform images."""
+        images = diff.removed_images if removed else diff.added_images
+        platform_images = (
+            diff.removed_platform_images if removed else diff.added_platform_images
+        )
+        images.append(ImageDiff(name, image.repository, image.tag, image.image))
+        for platform, platform_image in image.platforms.items():
+            platform_images.append(
+                PlatformImageDiff(
+                    name, image.repository, image.tag, platform, platform_image.image
+                )
+            )
@@ -2,15 +2,49 @@
 
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-from typing import Iterator
+import asyncio
+import hashlib
+import posixpath
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
 
 from releaser.hexagon.entities.strategy.policy import CommitMsgMatchPolicy
 
 from ..entities import artefact, strategy
-from ..errors import ReleaseStrategyNotFoundError
-from ..ports import GitReader, JsonWriter, StrategyReader, VersionReader
+from ..errors import (
+    DirtyWorkingTreeError,
+    ReleaseStrategyNotFoundError,
+    UnknownRevisionError,
+)
+from ..ports import AsyncGitReader, GitReader, JsonWriter, StrategyReader, VersionReader
+
+RuleMessages = List[Optional[List[Optional[str]]]]
+"""The last commit messages read by the policies of each rule of an application.
+
+Rules not matching the current reference are not evaluated (`None`).
+"""
+
+
+@dataclass
+class ManifestPlan:
+    """The applications written in a manifest, planned before writing it."""
+
+    revision: str
+    """The SHA of HEAD, recorded as the revision of the manifest."""
+
+    applications: list[strategy.ApplicationReleaseStrategy]
+    """The strategies of the applications with images to release, in strategy order."""
+
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    """The fingerprints of the applications, when a previous manifest is given."""
+
+    reused: dict[str, artefact.Application] = field(default_factory=dict)
+    """The applications copied from the previous manifest."""
+
+    messages: dict[tuple[int, ...], RuleMessages] = field(default_factory=dict)
+    """The commit messages read to fingerprint applications, by rules key."""
 
 
 @dataclass
@@ -29,31 +63,455 @@ class ManifestGenerator:
     version_reader: VersionReader
     """A VersionReader implementation used to read the application versions."""
 
+    changed_since: str | None = None
+    """When set, only applications with files changed between this revision and HEAD are released."""
+
+    async_git_reader: AsyncGitReader | None = None
+    """An AsyncGitReader implementation, required to generate the manifest asynchronously."""
+
+    jobs: int = 1
+    """The number of threads used to evaluate application rules (1 disables the thread pool)."""
+
+    previous: artefact.Manifest | None = None
+    """A previously generated manifest, from which applications with unchanged inputs are reused.
+
+    When set, the fingerprints of the applications are recorded in the generated manifest.
+    """
+
+    require_clean: bool = False
+    """When set, generation fails if files the released applications depend on have uncommitted changes.
+
+    Only the build contexts, Dockerfiles and additional paths of the
+    released applications are checked.
+    """
+
     def execute(self) -> None:
-        """Generate the manifest."""
+        """Generate the manifest.
+
+        Applications are written as soon as their images are generated, in
+        strategy order. When `jobs` is greater than 1, rules of different
+        applications are evaluated in parallel by a pool of `jobs` threads.
+        The generated manifest is the same as the one generated sequentially.
+        The SHA of HEAD is recorded as the revision of the manifest.
+
+        When a `previous` manifest is given, applications whose fingerprint
+        did not change and whose files did not change since the revision of
+        the previous manifest are copied from the previous manifest.
+        """
+        release_strategy = self._read_release_strategy()
+        changed_files: list[str] | None = None
+        if self.changed_since is not None:
+            changed_files = self.git_reader.read_changed_files(self.changed_since)
+        applications = self._select_applications(release_strategy, changed_files)
+        paths = self._get_paths_to_check(applications)
+        if paths and self.git_reader.is_dirty(paths):
+            raise DirtyWorkingTreeError(paths)
+        plan = ManifestPlan(self.git_reader.read_most_recent_commit_sha(), applications)
+        if self.previous is not None:
+            previous_changed_files: list[str] | None = None
+            if self.previous.revision:
+                try:
+                    previous_changed_files = self.git_reader.read_changed_files(
+                        self.previous.revision
+                    )
+                except UnknownRevisionError as exc:
+                    self._warn_unknown_previous_revision(exc)
+            # Applications sharing rules share commit messages, which are read
+            # once, both to fingerprint applications and to evaluate their tags
+            plan.messages = {
+                key: self._read_rule_messages(application)
+                for key, application in self._get_rules_to_evaluate(plan).items()
+            }
+            self._reuse_previous_applications(
+                plan,
+                release_strategy,
+                self.git_reader.read_current_branch(),
+                previous_changed_files,
+            )
+        self.manifest_writer.begin_manifest(plan.revision)
+        try:
+            if self.jobs > 1:
+                self._write_applications_with_pool(plan)
+            else:
+                self._write_applications(plan)
+        except BaseException:
+            self.manifest_writer.abort_manifest()
+            raise
+        self.manifest_writer.end_manifest()
 
-        strategy = self.strategy_reader.read()
-        if not strategy:
+    async def execute_async(self) -> None:
+        """Generate the manifest, reading git information concurrently.
+
+        Tags of all applications are evaluated concurrently using
+        `async_git_reader`, and rules shared by several applications are
+        evaluated once. Applications are written in strategy order as soon
+        as their tags are evaluated. The generated manifest is the same as
+        the one generated by `execute`.
+        """
+        if self.async_git_reader is None:
+            raise ValueError("An async git reader is required to run asynchronously")
+        git_reader = self.async_git_reader
+        release_strategy = self._read_release_strategy()
+        changed_files: list[str] | None = None
+        if self.changed_since is not None:
+            changed_files = await git_reader.read_changed_files(self.changed_since)
+        applications = self._select_applications(release_strategy, changed_files)
+        paths = self._get_paths_to_check(applications)
+        if paths and await git_reader.is_dirty(paths):
+            raise DirtyWorkingTreeError(paths)
+        plan = ManifestPlan(
+            await git_reader.read_most_recent_commit_sha(), applications
+        )
+        if self.previous is not None:
+            previous_changed_files: list[str] | None = None
+            if self.previous.revision:
+                try:
+                    previous_changed_files = await git_reader.read_changed_files(
+                        self.previous.revision
+                    )
+                except UnknownRevisionError as exc:
+                    self._warn_unknown_previous_revision(exc)
+            rules = self._get_rules_to_evaluate(plan)
+            plan.messages = dict(
+                zip(
+                    rules,
+                    await asyncio.gather(
+                        *map(self._read_rule_messages_async, rules.values())
+                    ),
+                )
+            )
+            self._reuse_previous_applications(
+                plan,
+                release_strategy,
+                await git_reader.read_current_branch(),
+                previous_changed_files,
+            )
+        self.manifest_writer.begin_manifest(plan.revision)
+        rule_tags = {
+            key: asyncio.ensure_future(self._evaluate_tags_async(plan, application))
+            for key, application in self._get_rules_to_evaluate(plan).items()
+        }
+        try:
+            for application in plan.applications:
+                tags = None
+                if application.name not in plan.reused:
+                    tags = await rule_tags[self._get_rules_key(application)]
+                self._write_planned_application(plan, application, tags)
+        except BaseException:
+            for task in rule_tags.values():
+                task.cancel()
+            self.manifest_writer.abort_manifest()
+            raise
+        self.manifest_writer.end_manifest()
+
+    def _write_applications(self, plan: ManifestPlan) -> None:
+        """Evaluate and write applications one after the other."""
+        # Applications without their own rules share the global rules, which
+        # are evaluated once for all of them.
+        rule_tags: dict[tuple[int, ...], list[str]] = {}
+        for application in plan.applications:
+            tags = None
+            if application.name not in plan.reused:
+                key = self._get_rules_key(application)
+                if key not in rule_tags:
+                    rule_tags[key] = self._evaluate_tags(plan, application)
+                tags = rule_tags[key]
+            self._write_planned_application(plan, application, tags)
+
+    def _write_applications_with_pool(self, plan: ManifestPlan) -> None:
+        """Evaluate applications in a thread pool and write them in order."""
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            rule_tags: dict[tuple[int, ...], Future[list[str]]] = {
+                key: executor.submit(self._evaluate_tags, plan, application)
+                for key, application in self._get_rules_to_evaluate(plan).items()
+            }
+            try:
+                for application in plan.applications:
+                    tags = None
+                    if application.name not in plan.reused:
+                        tags = rule_tags[self._get_rules_key(application)].result()
+                    self._write_planned_application(plan, application, tags)
+            except BaseException:
+                for future in rule_tags.values():
+                    future.cancel()
+                raise
+
+    def _write_planned_application(
+        self,
+        plan: ManifestPlan,
+        application: strategy.ApplicationReleaseStrategy,
+        tags: list[str] | None,
+    ) -> None:
+        """Write an application, copied from the previous manifest when reused."""
+        name = application.name
+        if name in plan.reused:
+            self.manifest_writer.write_application(
+                name, plan.reused[name], plan.fingerprints[name]
+            )
+            return
+        assert tags is not None
+        self._write_application(application, tags, plan.fingerprints.get(name))
+
+    def _read_release_strategy(self) -> strategy.ReleaseStrategy:
+        release_strategy = self.strategy_reader.read()
+        if not release_strategy:
             raise ReleaseStrategyNotFoundError()
-        manifest = artefact.Manifest(applications={})
-        for app_name in strategy.applications:
-            application_strategy = strategy.get_release_strategy_for_application(
-                app_name
+        return release_strategy
+
+    @staticmethod
+    def _warn_unknown_previous_revision(exc: UnknownRevisionError) -> None:
+        """Warn that applications cannot be reused, as the previous revision is unknown."""
+        warnings.warn(
+            f"{exc} (revision of the previous manifest): all applications are evaluated",
+            stacklevel=3,
+        )
+
+    @staticmethod
+    def _match_changed_applications(
+        release_strategy: strategy.ReleaseStrategy, changed_files: list[str]
+    ) -> set[str]:
+        """Get the names of the applications affected by changed files."""
+        if not changed_files:
+            return set()
+        return release_strategy.get_path_index().match_any(changed_files)
+
+    @classmethod
+    def _select_applications(
+        cls,
+        release_strategy: strategy.ReleaseStrategy,
+        changed_files: list[str] | None,
+    ) -> list[strategy.ApplicationReleaseStrategy]:
+        """Get the strategies of the applications with images to release, in strategy order.
+
+        When `changed_files` is not `None`, only the applications affected by
+        these files are selected.
+        """
+        changed = (
+            None
+            if changed_files is None
+            else cls._match_changed_applications(release_strategy, changed_files)
+        )
+        return [
+            application_strategy
+            for application_strategy in (
+                release_strategy.get_release_strategy_for_application(app_name)
+                for app_name in release_strategy.applications
+                if changed is None or app_name in changed
             )
-            images = list(self._generate_application_images(application_strategy))
-            if not images:
-                continue
-            manifest.applications[app_name] = artefact.Application(images=images)
-        self.manifest_writer.write_manifest(manifest)
+            if application_strategy.images
+        ]
+
+    def _get_paths_to_check(
+        self, application_strategies: list[strategy.ApplicationReleaseStrategy]
+    ) -> list[str]:
+        """Get the paths which must not have uncommitted changes (none unless `require_clean`)."""
+        if not self.require_clean:
+            return []
+        return self._get_dependency_paths(application_strategies)
 
-    def _generate_application_images(
+    @staticmethod
+    def _get_dependency_paths(
+        application_strategies: list[strategy.ApplicationReleaseStrategy],
+    ) -> list[str]:
+        """Get the paths the applications depend on, sorted and without duplicates."""
+        return sorted(
+            {
+                posixpath.normpath(path)
+                for application_strategy in application_strategies
+                for path in application_strategy.get_dependency_paths()
+            }
+        )
+
+    def _reuse_previous_applications(
+        self,
+        plan: ManifestPlan,
+        release_strategy: strategy.ReleaseStrategy,
+        branch: str,
+        changed_files: list[str] | None,
+    ) -> None:
+        """Fingerprint applications and find those which can be copied from the previous manifest.
+
+        `changed_files` are the files changed since the revision of the
+        previous manifest, `None` when this revision is unknown (in which
+        case no application is reused). Commit messages are read from
+        `plan.messages`.
+        """
+        assert self.previous is not None
+        changed = (
+            None
+            if changed_files is None
+            else self._match_changed_applications(release_strategy, changed_files)
+        )
+        for application in plan.applications:
+            name = application.name
+            fingerprint = self._fingerprint_application(
+                application,
+                branch,
+                self._get_git_inputs(
+                    application,
+                    plan.messages[self._get_rules_key(application)],
+                    plan.revision,
+                ),
+            )
+            plan.fingerprints[name] = fingerprint
+            previous_application = self.previous.applications.get(name)
+            if (
+                changed is not None
+                and name not in changed
+                and previous_application is not None
+                and self.previous.fingerprints.get(name) == fingerprint
+            ):
+                plan.reused[name] = previous_application
+
+    def _fingerprint_application(
+        self,
+        application: strategy.ApplicationReleaseStrategy,
+        branch: str,
+        git_inputs: list[str | None],
+    ) -> str:
+        """Compute the fingerprint of the inputs of an application.
+
+        These are the release strategy of the application, the current branch,
+        the git inputs of its rules and the versions read by its version tags.
+        """
+        digest = hashlib.sha256(repr(application).encode())
+        digest.update(b"\0" + branch.encode())
+        digest.update(b"\0" + repr(git_inputs).encode())
+        version_files = sorted(
+            {
+                tag.file or ""
+                for rule in application.on
+                for policy in rule.commit_msg
+                for tag in policy.tags
+                if isinstance(tag, strategy.VersionTag)
+            }
+        )
+        for version_file in version_files:
+            version = self.version_reader.read(version_file or None)
+            digest.update(f"\0{version_file}={version}".encode())
+        return digest.hexdigest()
+
+    def _get_git_inputs(
+        self,
+        application: strategy.ApplicationReleaseStrategy,
+        messages: RuleMessages,
+        revision: str,
+    ) -> list[str | None]:
+        """Get the inputs of the rules of an application tracked by git.
+
+        These are the last commit message read by each policy of the rules
+        matching the current reference (`None` for rules not matching it),
+        followed by the SHA of HEAD when a policy tags images with it.
+        """
+        inputs: list[str | None] = []
+        for rule_messages in messages:
+            if rule_messages is None:
+                inputs.append(None)
+            else:
+                inputs.extend(rule_messages)
+        if self._has_commit_sha_tag(application):
+            inputs.append(revision)
+        return inputs
+
+    def _read_rule_messages(
+        self, application: strategy.ApplicationReleaseStrategy
+    ) -> RuleMessages:
+        """Read the last commit message of each policy of the rules of an application."""
+        return [
+            (
+                [
+                    self.git_reader.read_last_commit_message(
+                        policy.depth, policy.filter_regexp
+                    )
+                    for policy in rule.commit_msg
+                ]
+                if self.git_reader.current_reference_matches(rule.branches)
+                else None
+            )
+            for rule in application.on
+        ]
+
+    async def _read_rule_messages_async(
+        self, application: strategy.ApplicationReleaseStrategy
+    ) -> RuleMessages:
+        """Read the commit messages of the rules of an application like `_read_rule_messages`, concurrently."""
+        assert self.async_git_reader is not None
+        git_reader = self.async_git_reader
+        rules_match = await asyncio.gather(
+            *(
+                git_reader.current_reference_matches(rule.branches)
+                for rule in application.on
+            )
+        )
+        messages = iter(
+            await asyncio.gather(
+                *(
+                    git_reader.read_last_commit_message(
+                        policy.depth, policy.filter_regexp
+                    )
+                    for rule, matches in zip(application.on, rules_match)
+                    if matches
+                    for policy in rule.commit_msg
+                )
+            )
+        )
+        return [
+            [next(messages) for _ in rule.commit_msg] if matches else None
+            for rule, matches in zip(application.on, rules_match)
+        ]
+
+    @staticmethod
+    def _has_commit_sha_tag(application: strategy.ApplicationReleaseStrategy) -> bool:
+        """Check whether a policy of an application tags images with the SHA of HEAD."""
+        return any(
+            isinstance(tag, strategy.GitCommitShaTag)
+            for rule in application.on
+            for policy in rule.commit_msg
+            for tag in policy.tags
+        )
+
+    @classmethod
+    def _get_rules_to_evaluate(
+        cls, plan: ManifestPlan
+    ) -> dict[tuple[int, ...], strategy.ApplicationReleaseStrategy]:
+        """Get an application for each distinct rules of the applications which are not reused."""
+        return {
+            cls._get_rules_key(application): application
+            for application in plan.applications
+            if application.name not in plan.reused
+        }
+
+    @staticmethod
+    def _get_rules_key(
+        application_strategy: strategy.ApplicationReleaseStrategy,
+    ) -> tuple[int, ...]:
+        """Identify the rules of an application.
+
+        Rules are identified by identity: applications sharing the same rule
+        objects (e.g. the global rules of the strategy) get the same tags.
+        """
+        return tuple(id(rule) for rule in application_strategy.on)
+
+    def _write_application(
         self,
         application_strategy: strategy.ApplicationReleaseStrategy,
-    ) -> Iterator[artefact.Image]:
-        """Generate the list of images to release for an application."""
-        if not application_strategy.images:
+        tags: list[str],
+        fingerprint: str | None = None,
+    ) -> None:
+        """Write an application of the manifest, unless it has no image to release."""
+        images = list(self._build_application_images(application_strategy, tags))
+        if not images:
             return
-        tags = list(self._generate_application_tags(application_strategy))
+        self.manifest_writer.write_application(
+            application_strategy.name, artefact.Application(images=images), fingerprint
+        )
+
+    def _build_application_images(
+        self,
+        application_strategy: strategy.ApplicationReleaseStrategy,
+        tags: list[str],
+    ) -> Iterator[artefact.Image]:
+        """Build the images released for an application with given tags."""
         for image in application_strategy.images:
             for tag in tags:
                 image_artefact = artefact.Image(
@@ -72,47 +530,57 @@ class ManifestGenerator:
                         )
                 yield image_artefact
 
-    def _generate_application_tags(
-        self, application: strategy.ApplicationReleaseStrategy
-    ) -> Iterator[str]:
-        """Generate the list of tags to release for an application."""
-        for rule in application.on:
-            if not self.git_reader.current_reference_matches(rule.branches):
+    def _evaluate_tags(
+        self, plan: ManifestPlan, application: strategy.ApplicationReleaseStrategy
+    ) -> list[str]:
+        """Evaluate the list of tags to release for an application."""
+        messages = plan.messages.get(self._get_rules_key(application))
+        if messages is None:
+            messages = self._read_rule_messages(application)
+        return self._get_application_tags(application, messages, plan.revision)
+
+    async def _evaluate_tags_async(
+        self, plan: ManifestPlan, application: strategy.ApplicationReleaseStrategy
+    ) -> list[str]:
+        """Evaluate the list of tags to release for an application, reading git concurrently."""
+        messages = plan.messages.get(self._get_rules_key(application))
+        if messages is None:
+            messages = await self._read_rule_messages_async(application)
+        return self._get_application_tags(application, messages, plan.revision)
+
+    def _get_application_tags(
+        self,
+        application: strategy.ApplicationReleaseStrategy,
+        messages: RuleMessages,
+        revision: str,
+    ) -> list[str]:
+        """Get the tags of the policies of an application matching their commit message."""
+        tags: list[str] = []
+        for rule, rule_messages in zip(application.on, messages):
+            if rule_messages is None:
                 continue
-            for policy in rule.commit_msg:
-                msg = self.git_reader.read_last_commit_message(
-                    policy.depth, policy.filter
-                )
+            for policy, msg in zip(rule.commit_msg, rule_messages):
                 if not msg:
                     continue
                 if self._verify_commit_msg_match_against_policy(msg, policy):
                     for tag in policy.tags:
-                        yield self._get_value_for_tag(tag)
+                        tags.append(self._get_value_for_tag(tag, revision))
+        return tags
 
     def _verify_commit_msg_match_against_policy(
         self, commit_msg: str, policy: CommitMsgMatchPolicy
     ) -> bool:
         """Check if the commit message match the policy."""
-        for match_pattern in policy.match:
-            if match_pattern == "*":
-                return True
-            try:
-                regexp = re.compile(match_pattern)
-            except re.error as exc:
-                raise ValueError(
-                    f"Invalid regexp: {match_pattern} (patterns={policy.match})"
-                ) from exc
-            if regexp.match(commit_msg):
-                return True
-        return False
+        return policy.matcher.matches(commit_msg)
 
     def _get_value_for_tag(
-        self, tag: strategy.GitCommitShaTag | strategy.VersionTag | strategy.LiteralTag
+        self,
+        tag: strategy.GitCommitShaTag | strategy.VersionTag | strategy.LiteralTag,
+        revision: str,
     ) -> str:
-        """Get the value of a tag."""
+        """Get the value of a tag, `revision` being the SHA of HEAD."""
         if isinstance(tag, strategy.GitCommitShaTag):
-            sha = self.git_reader.read_most_recent_commit_sha()
-            return sha[: tag.size]
+            return revision[: tag.size]
         elif isinstance(tag, strategy.VersionTag):
             version = self.version_reader.read_version_tag(tag)
             if version is None:
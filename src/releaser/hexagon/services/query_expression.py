@@ -0,0 +1,233 @@
+"""Boolean expressions selecting images of a manifest.
+
+Expressions combine comparisons with `and`, `or`, `not` and parentheses,
+e.g. `repo~"registry.example.com/*" and platform=linux/arm64 and not app=docs`.
+A comparison is made of a field, an operator and a value, which must be
+quoted when it holds spaces, parentheses or operator characters:
+
+- fields: `app` (or `application`), `repo` (or `repository`), `platform`,
+  `tag` and `image` (the full image name).
+- operators: `=` and `!=` compare values, `~` and `!~` match glob patterns
+  (see `fnmatch`).
+
+An image matches `platform=...` when it has a platform image for the given
+platform. Expressions are parsed once into a tree of immutable nodes, and
+evaluated against a manifest index, as sets of image identifiers.
+"""
+
+from __future__ import annotations
+
+import abc
+import functools
+import json
+import re
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+from ..entities import artefact
+from ..errors import InvalidQueryError
+
+FIELDS = {
+    "app": "application",
+    "application": "application",
+    "repo": "repository",
+    "repository": "repository",
+    "platform": "platform",
+    "tag": "tag",
+    "image": "image",
+}
+"""Field names by alias."""
+
+OPERATORS = ("=", "!=", "~", "!~")
+
+_INDEXED_FIELDS = {
+    "application": "applications",
+    "repository": "repositories",
+    "platform": "platforms",
+}
+"""Fields answered using an index of the manifest, by filter name."""
+
+_TOKEN = re.compile(
+    r'\s*(?:(?P<punctuation>[()])|(?P<operator>!=|!~|=|~)|(?P<string>"(?:[^"\\]|\\.)*")|(?P<word>[^\s()=!~"]+))'
+)
+
+
+class Expression(abc.ABC):
+    """A node of an expression."""
+
+    @abc.abstractmethod
+    def select(self, index: artefact.BaseManifestIndex, images: set[int]) -> set[int]:
+        """Select the matching images among all `images` of the index."""
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class Comparison(Expression):
+    """Compare a field of images with a value."""
+
+    field: str
+    operator: str
+    value: str
+
+    def select(self, index: artefact.BaseManifestIndex, images: set[int]) -> set[int]:
+        selected = self._select_matching(index, images)
+        if self.operator.startswith("!"):
+            return images - selected
+        return selected
+
+    def _matches(self, value: str) -> bool:
+        if self.operator.endswith("~"):
+            return fnmatchcase(value, self.value)
+        return value == self.value
+
+    def _select_matching(
+        self, index: artefact.BaseManifestIndex, images: set[int]
+    ) -> set[int]:
+        kind = _INDEXED_FIELDS.get(self.field)
+        if kind is None:
+            return index.filter_images(self.field, self._matches, images)
+        keys = [key for key in index.get_keys(kind) if self._matches(key)]
+        if not keys:
+            # An empty filter would select all images
+            return set()
+        return index.find_images(**{kind: keys})
+
+
+@dataclass(frozen=True)
+class Not(Expression):
+    """Select images not matching an expression."""
+
+    expression: Expression
+
+    def select(self, index: artefact.BaseManifestIndex, images: set[int]) -> set[int]:
+        return images - self.expression.select(index, images)
+
+
+@dataclass(frozen=True)
+class And(Expression):
+    """Select images matching all expressions."""
+
+    expressions: tuple[Expression, ...]
+
+    def select(self, index: artefact.BaseManifestIndex, images: set[int]) -> set[int]:
+        selected = images
+        for expression in self.expressions:
+            if not selected:
+                break
+            selected = selected & expression.select(index, images)
+        return selected
+
+
+@dataclass(frozen=True)
+class Or(Expression):
+    """Select images matching any expression."""
+
+    expressions: tuple[Expression, ...]
+
+    def select(self, index: artefact.BaseManifestIndex, images: set[int]) -> set[int]:
+        selected: set[int] = set()
+        for expression in self.expressions:
+            selected |= expression.select(index, images)
+        return selected
+
+
+@functools.lru_cache(maxsize=128)
+def parse_expression(text: str) -> Expression:
+    """Parse an expression, raising InvalidQueryError when it is not valid."""
+    parser = _Parser(_tokenize(text))
+    expression = parser.parse_or()
+    token = parser.peek()
+    if token is not None:
+        raise InvalidQueryError(f"unexpected {token[1]!r} in expression")
+    return expression
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise InvalidQueryError(
+                f"unexpected {text[position:].strip()!r} in expression"
+            )
+        kind = match.lastgroup
+        assert kind is not None
+        value = match.group(kind)
+        if kind == "string":
+            try:
+                kind, value = "value", json.loads(value)
+            except ValueError:
+                raise InvalidQueryError(
+                    f"invalid string {value} in expression"
+                ) from None
+        elif kind == "word" and value.lower() in ("and", "or", "not"):
+            kind, value = "keyword", value.lower()
+        elif kind == "word":
+            kind = "value"
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser, where `not` binds tighter than `and`, and `and` than `or`."""
+
+    def __init__(self, tokens: list[tuple[str, str]]) -> None:
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def take(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise InvalidQueryError("unexpected end of expression")
+        self.position += 1
+        return token
+
+    def parse_or(self) -> Expression:
+        expressions = [self.parse_and()]
+        while self.peek() == ("keyword", "or"):
+            self.take()
+            expressions.append(self.parse_and())
+        return expressions[0] if len(expressions) == 1 else Or(tuple(expressions))
+
+    def parse_and(self) -> Expression:
+        expressions = [self.parse_not()]
+        while self.peek() == ("keyword", "and"):
+            self.take()
+            expressions.append(self.parse_not())
+        return expressions[0] if len(expressions) == 1 else And(tuple(expressions))
+
+    def parse_not(self) -> Expression:
+        if self.peek() == ("keyword", "not"):
+            self.take()
+            return Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> Expression:
+        kind, value = self.take()
+        if (kind, value) == ("punctuation", "("):
+            expression = self.parse_or()
+            if self.take() != ("punctuation", ")"):
+                raise InvalidQueryError("expected ')' in expression")
+            return expression
+        if kind != "value" or value not in FIELDS:
+            raise InvalidQueryError(
+                f"expected a field ({', '.join(FIELDS)}), got {value!r}"
+            )
+        field = FIELDS[value]
+        kind, operator = self.take()
+        if kind != "operator":
+            raise InvalidQueryError(
+                f"expected an operator ({', '.join(OPERATORS)}) after {value!r}"
+            )
+        kind, operand = self.take()
+        if kind != "value":
+            raise InvalidQueryError(f"expected a value after {operator!r}")
+        return Comparison(field, operator, operand)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import stat
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+from .objects import ObjectStore
+from .paths import is_within_any
+
+MODE_GITLINK = 0o160000
+MODE_SYMLINK = 0o120000
+MODE_TREE = 0o040000
+
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+_EXT_FLAG_SKIP_WORKTREE = 0x4000
+_ENTRY_HEADER = struct.Struct(">10I20sH")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """An entry of the git index (staging area)."""
+
+    path: str
+    mode: int
+    sha: str
+    mtime_s: int
+    mtime_ns: int
+    size: int
+    stage: int
+    skip_worktree: bool
+
+
+def read_index(filepath: Path) -> list[IndexEntry]:
+    """Read entries from a git index file (versions 2, 3 and 4)."""
+    data = filepath.read_bytes()
+    if data[:4] != b"DIRC":
+        raise ValueError(f"Invalid index file: {filepath.as_posix()}")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise ValueError(f"Unsupported index version: {version}")
+    entries: list[IndexEntry] = []
+    pos = 12
+    previous_name = b""
+    for _ in range(count):
+        start = pos
+        fields = _ENTRY_HEADER.unpack_from(data, pos)
+        pos += _ENTRY_HEADER.size
+        flags = fields[11]
+        extended_flags = 0
+        if flags & _FLAG_EXTENDED:
+            (extended_flags,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+        if version == 4:
+            strip, pos = _read_offset_varint(data, pos)
+            end = data.index(b"\0", pos)
+            name = previous_name[: len(previous_name) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            length = flags & _FLAG_NAME_MASK
+            if length == _FLAG_NAME_MASK:
+                length = data.index(b"\0", pos) - pos
+            name = data[pos : pos + length]
+            pos += length
+            # Entries are padded with 1 to 8 NUL bytes to a multiple of 8 bytes
+            pos = start + ((pos - start + 8) & ~7)
+        previous_name = name
+        entries.append(
+            IndexEntry(
+                path=name.decode(errors="surrogateescape"),
+                mode=fields[6],
+                sha=fields[10].hex(),
+                mtime_s=fields[2],
+                mtime_ns=fields[3],
+                size=fields[9],
+                stage=(flags & _FLAG_STAGE_MASK) >> 12,
+                skip_worktree=bool(extended_flags & _EXT_FLAG_SKIP_WORKTREE),
+            )
+        )
+    return entries
+
+
+def read_tree_recursive(
+    objects: ObjectStore, sha: str, prefix: str = ""
+) -> dict[str, tuple[int, str]]:
+    """Read all files within a tree, mapping paths to (mode, sha)."""
+    files: dict[str, tuple[int, str]] = {}
+    for entry in objects.read_tree(sha):
+        path = f"{prefix}{entry.name}"
+        if entry.mode == MODE_TREE:
+            files.update(read_tree_recursive(objects, entry.sha, f"{path}/"))
+        else:
+            files[path] = (entry.mode, entry.sha)
+    return files
+
+
+def diff_trees(
+    objects: ObjectStore, old: str | None, new: str | None, prefix: str = ""
+) -> list[str]:
+    """List files which differ between two trees, like `git diff --name-only --no-renames`.
+
+    Subtrees with the same SHA are skipped without being read.
+    """
+    if old == new:
+        return []
+    old_entries = {entry.name: entry for entry in objects.read_tree(old)} if old else {}
+    new_entries = {entry.name: entry for entry in objects.read_tree(new)} if new else {}
+    changed: list[str] = []
+    for name in sorted(old_entries.keys() | new_entries.keys()):
+        old_entry = old_entries.get(name)
+        new_entry = new_entries.get(name)
+        if (
+            old_entry is not None
+            and new_entry is not None
+            and (old_entry.mode, old_entry.sha) == (new_entry.mode, new_entry.sha)
+        ):
+            continue
+        path = f"{prefix}{name}"
+        old_tree = old_entry.sha if old_entry and old_entry.mode == MODE_TREE else None
+        new_tree = new_entry.sha if new_entry and new_entry.mode == MODE_TREE else None
+        if (old_entry and not old_tree) or (new_entry and not new_tree):
+            # A file was changed, added or removed (possibly replacing a directory)
+            changed.append(path)
+        if old_tree or new_tree:
+            changed.extend(diff_trees(objects, old_tree, new_tree, f"{path}/"))
+    return sorted(changed)
+
+
+def is_worktree_dirty(
+    worktree: Path,
+    index_path: Path,
+    objects: ObjectStore,
+    tree: str | None,
+    directories: list[str] | None = None,
+) -> bool:
+    """Check if tracked files differ from given tree, like `git diff-index HEAD`.
+
+    Files whose stat information matches the index are assumed to match
+    the index content, other files are hashed and compared to the tree.
+    When `directories` is given, only files within those directories
+    (relative to repository root) are checked.
+    """
+    head_files = read_tree_recursive(objects, tree) if tree else {}
+    entries = read_index(index_path) if index_path.is_file() else []
+    if directories is not None:
+        head_files = {
+            path: value
+            for path, value in head_files.items()
+            if is_within_any(path, directories)
+        }
+        entries = [entry for entry in entries if is_within_any(entry.path, directories)]
+    if len(entries) != len(head_files):
+        return True
+    if not entries:
+        return False
+    index_mtime_ns = index_path.stat().st_mtime_ns
+    for entry in entries:
+        if entry.stage:
+            return True
+        if head_files.get(entry.path) != (entry.mode, entry.sha):
+            return True
+        if entry.skip_worktree or entry.mode == MODE_GITLINK:
+            continue
+        if _worktree_file_differs(worktree, entry, index_mtime_ns):
+            return True
+    return False
+
+
+def _worktree_file_differs(
+    worktree: Path, entry: IndexEntry, index_mtime_ns: int
+) -> bool:
+    filepath = worktree.joinpath(entry.path)
+    try:
+        info = filepath.lstat()
+    except FileNotFoundError:
+        return True
+    if entry.mode == MODE_SYMLINK:
+        if not stat.S_ISLNK(info.st_mode):
+            return True
+    elif not stat.S_ISREG(info.st_mode):
+        return True
+    elif bool(info.st_mode & stat.S_IXUSR) != bool(entry.mode & stat.S_IXUSR):
+        return True
+    entry_mtime_ns = entry.mtime_s * 1_000_000_000 + entry.mtime_ns
+    if (
+        info.st_size & 0xFFFFFFFF == entry.size
+        and info.st_mtime_ns == entry_mtime_ns
+        # Racily clean entries may have changed within the same timestamp
+        and entry_mtime_ns < index_mtime_ns
+    ):
+        return False
+    if entry.mode == MODE_SYMLINK:
+        content = os.fsencode(os.readlink(filepath))
+    else:
+        content = filepath.read_bytes()
+    return hash_blob(content) != entry.sha
+
+
+def hash_blob(content: bytes) -> str:
+    """Compute the SHA of a blob object."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _read_offset_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a big-endian "offset" varint as used by index v4 and OFS_DELTA."""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
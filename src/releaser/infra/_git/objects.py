@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+OBJECT_TYPES = {
+    b"commit": OBJ_COMMIT,
+    b"tree": OBJ_TREE,
+    b"blob": OBJ_BLOB,
+    b"tag": OBJ_TAG,
+}
+
+_INFLATE_CHUNK_SIZE = 16 * 1024
+
+
+@dataclass(frozen=True)
+class Commit:
+    """A parsed commit object."""
+
+    sha: str
+    """The SHA of the commit."""
+
+    tree: str
+    """The SHA of the root tree of the commit."""
+
+    parents: tuple[str, ...]
+    """The SHA of the parent commits."""
+
+    timestamp: int
+    """The committer timestamp (seconds since epoch)."""
+
+    message: str
+    """The full commit message."""
+
+    @classmethod
+    def parse(cls, sha: str, data: bytes) -> "Commit":
+        """Parse a commit object from its raw content."""
+        headers, _, message = data.partition(b"\n\n")
+        tree = ""
+        parents: list[str] = []
+        timestamp = 0
+        encoding = "utf-8"
+        for line in headers.split(b"\n"):
+            if line.startswith(b" "):
+                # Continuation line of a multi-line header (e.g. gpgsig)
+                continue
+            key, _, value = line.partition(b" ")
+            if key == b"tree":
+                tree = value.decode()
+            elif key == b"parent":
+                parents.append(value.decode())
+            elif key == b"committer":
+                timestamp = int(value.rsplit(b" ", 2)[-2])
+            elif key == b"encoding":
+                encoding = value.decode()
+        return cls(
+            sha=sha,
+            tree=tree,
+            parents=tuple(parents),
+            timestamp=timestamp,
+            message=message.decode(encoding, errors="replace"),
+        )
+
+    @property
+    def subject(self) -> str:
+        """The commit subject, as displayed by `git log --pretty=%s`."""
+        lines: list[str] = []
+        for line in self.message.splitlines():
+            if not line.strip():
+                if lines:
+                    break
+                continue
+            lines.append(line.rstrip())
+        return " ".join(lines)
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    """An entry within a tree object."""
+
+    mode: int
+    name: str
+    sha: str
+
+
+def parse_tree(data: bytes) -> list[TreeEntry]:
+    """Parse a tree object from its raw content."""
+    entries: list[TreeEntry] = []
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        entries.append(
+            TreeEntry(
+                mode=int(data[pos:space], 8),
+                name=data[space + 1 : nul].decode(errors="surrogateescape"),
+                sha=data[nul + 1 : nul + 21].hex(),
+            )
+        )
+        pos = nul + 21
+    return entries
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply a git delta to a base object."""
+    source_size, pos = _read_size(delta, 0)
+    target_size, pos = _read_size(delta, pos)
+    if source_size != len(base):
+        raise ValueError("Invalid delta: base object size mismatch")
+    output = bytearray()
+    while pos < len(delta):
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            offset = 0
+            size = 0
+            for shift in range(4):
+                if opcode & (1 << shift):
+                    offset |= delta[pos] << (8 * shift)
+                    pos += 1
+            for shift in range(3):
+                if opcode & (1 << (4 + shift)):
+                    size |= delta[pos] << (8 * shift)
+                    pos += 1
+            output += base[offset : offset + (size or 0x10000)]
+        elif opcode:
+            output += delta[pos : pos + opcode]
+            pos += opcode
+        else:
+            raise ValueError("Invalid delta: unexpected opcode 0")
+    if len(output) != target_size:
+        raise ValueError("Invalid delta: target object size mismatch")
+    return bytes(output)
+
+
+def _read_size(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a little-endian base-128 size used in delta headers."""
+    size = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+class PackIndex:
+    """A version 2 pack index (`.idx` file)."""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+        self._data = filepath.read_bytes()
+        if self._data[:4] != b"\xfftOc":
+            raise ValueError(f"Unsupported pack index version: {filepath.as_posix()}")
+        (version,) = struct.unpack_from(">I", self._data, 4)
+        if version != 2:
+            raise ValueError(f"Unsupported pack index version: {filepath.as_posix()}")
+        self._fanout = struct.unpack_from(">256I", self._data, 8)
+        self.size = self._fanout[255]
+        self._names_offset = 8 + 256 * 4
+        self._offsets_offset = self._names_offset + self.size * (20 + 4)
+        self._large_offsets_offset = self._offsets_offset + self.size * 4
+
+    def find(self, sha: bytes) -> int | None:
+        """Return the offset of an object within the pack, if indexed."""
+        first = sha[0]
+        low = self._fanout[first - 1] if first else 0
+        high = self._fanout[first]
+        data = self._data
+        while low < high:
+            middle = (low + high) // 2
+            start = self._names_offset + middle * 20
+            name = data[start : start + 20]
+            if name < sha:
+                low = middle + 1
+            elif name > sha:
+                high = middle
+            else:
+                return self._offset(middle)
+        return None
+
+    def _offset(self, position: int) -> int:
+        (offset,) = struct.unpack_from(
+            ">I", self._data, self._offsets_offset + position * 4
+        )
+        if offset & 0x80000000:
+            (offset,) = struct.unpack_from(
+                ">Q",
+                self._data,
+                self._large_offsets_offset + (offset & 0x7FFFFFFF) * 8,
+            )
+        return offset
+
+
+class Pack:
+    """A packfile and its index."""
+
+    def __init__(self, store: "ObjectStore", pack_path: Path, index: PackIndex) -> None:
+        self.store = store
+        self.pack_path = pack_path
+        self.index = index
+        self._data: mmap.mmap | None = None
+        self._lock = threading.Lock()
+
+    def read_at(self, offset: int) -> tuple[int, bytes]:
+        """Read the object stored at given offset, resolving deltas."""
+        data = self._map()
+        pos = offset
+        byte = data[pos]
+        pos += 1
+        kind = (byte >> 4) & 0x07
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        if kind == OBJ_OFS_DELTA:
+            byte = data[pos]
+            pos += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base_kind, base = self.read_at(offset - distance)
+            return base_kind, apply_delta(base, self._inflate(pos, size))
+        if kind == OBJ_REF_DELTA:
+            base_sha = data[pos : pos + 20].hex()
+            base_kind, base = self.store.read(base_sha)
+            return base_kind, apply_delta(base, self._inflate(pos + 20, size))
+        return kind, self._inflate(pos, size)
+
+    def _inflate(self, pos: int, size: int) -> bytes:
+        data = self._map()
+        decompressor = zlib.decompressobj()
+        output = bytearray()
+        while not decompressor.eof:
+            chunk = data[pos : pos + _INFLATE_CHUNK_SIZE]
+            if not chunk:
+                raise ValueError(f"Truncated packfile: {self.pack_path.as_posix()}")
+            output += decompressor.decompress(chunk)
+            pos += _INFLATE_CHUNK_SIZE
+        if len(output) != size:
+            raise ValueError(f"Corrupted packfile: {self.pack_path.as_posix()}")
+        return bytes(output)
+
+    def _map(self) -> mmap.mmap:
+        if self._data is None:
+            # Threads reading the pack at once map it only once
+            with self._lock:
+                if self._data is None:
+                    with self.pack_path.open("rb") as fileobj:
+                        self._data = mmap.mmap(
+                            fileobj.fileno(), 0, access=mmap.ACCESS_READ
+                        )
+        return self._data
+
+
+class ObjectStore:
+    """Read objects from a git object database (loose objects and packfiles)."""
+
+    def __init__(self, objects_dir: Path) -> None:
+        self.directories = [objects_dir, *_read_alternates(objects_dir)]
+        self._packs: list[Pack] | None = None
+
+    def read(self, sha: str) -> tuple[int, bytes]:
+        """Read an object, returning its type and raw content."""
+        for directory in self.directories:
+            loose = directory.joinpath(sha[:2], sha[2:])
+            if loose.is_file():
+                raw = zlib.decompress(loose.read_bytes())
+                header, _, content = raw.partition(b"\0")
+                return OBJECT_TYPES[header.split(b" ", 1)[0]], content
+        name = bytes.fromhex(sha)
+        for pack in self.packs():
+            offset = pack.index.find(name)
+            if offset is not None:
+                return pack.read_at(offset)
+        raise KeyError(f"Object not found: {sha}")
+
+    def contains(self, sha: str) -> bool:
+        """Check if an object exists in the store."""
+        for directory in self.directories:
+            if directory.joinpath(sha[:2], sha[2:]).is_file():
+                return True
+        name = bytes.fromhex(sha)
+        return any(pack.index.find(name) is not None for pack in self.packs())
+
+    def read_commit(self, sha: str) -> Commit:
+        """Read and parse a commit object."""
+        kind, content = self.read(sha)
+        if kind != OBJ_COMMIT:
+            raise ValueError(f"Object is not a commit: {sha}")
+        return Commit.parse(sha, content)
+
+    def read_tree(self, sha: str) -> list[TreeEntry]:
+        """Read and parse a tree object."""
+        kind, content = self.read(sha)
+        if kind != OBJ_TREE:
+            raise ValueError(f"Object is not a tree: {sha}")
+        return parse_tree(content)
+
+    def packs(self) -> list[Pack]:
+        """List packs found in the object directories."""
+        if self._packs is None:
+            # Packs are published once listed, so concurrent readers never
+            # see a partial list
+            packs: list[Pack] = []
+            for directory in self.directories:
+                pack_dir = directory.joinpath("pack")
+                if not pack_dir.is_dir():
+                    continue
+                for index_path in sorted(pack_dir.glob("pack-*.idx")):
+                    pack_path = index_path.with_suffix(".pack")
+                    if pack_path.is_file():
+                        packs.append(Pack(self, pack_path, PackIndex(index_path)))
+            self._packs = packs
+        return self._packs
+
+
+def _read_alternates(objects_dir: Path) -> list[Path]:
+    alternates = objects_dir.joinpath("info", "alternates")
+    if not alternates.is_file():
+        return []
+    return [
+        objects_dir.joinpath(line.strip()).resolve()
+        for line in alternates.read_text().splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import posixpath
+
+
+def to_repository_paths(paths: list[str], prefix: str) -> list[str]:
+    """Convert paths relative to a working directory into paths relative to the repository root.
+
+    `prefix` is the path of the working directory relative to the
+    repository root (as returned by `git rev-parse --show-prefix`).
+    """
+    converted: list[str] = []
+    for path in paths:
+        normalized = posixpath.normpath(posixpath.join(prefix, path))
+        converted.append("" if normalized == "." else normalized)
+    return converted
+
+
+def is_within_any(path: str, directories: list[str]) -> bool:
+    """Check if a path relative to repository root is within any of given directories.
+
+    An empty directory designates the repository root.
+    """
+    for directory in directories:
+        if not directory or path == directory or path.startswith(f"{directory}/"):
+            return True
+    return False
+
+
+def to_working_directory_path(path: str, prefix: str) -> str:
+    """Convert a path relative to the repository root into a path relative to a working directory.
+
+    `prefix` is the path of the working directory relative to the
+    repository root (as returned by `git rev-parse --show-prefix`).
+    """
+    prefix = prefix.rstrip("/")
+    if not prefix:
+        return path
+    if path.startswith(f"{prefix}/"):
+        return path[len(prefix) + 1 :]
+    return posixpath.relpath(path, prefix)
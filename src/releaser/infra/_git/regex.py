@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import re
+
+# Expressions are evaluated byte by byte (git runs with LC_ALL=C), so expressions
+# matching any character may need up to 4 bytes to match a single UTF-8 character.
+# In the C locale, bytes which are neither control nor printable characters are
+# exactly the non-ASCII bytes, and Python classes such as `\w` also match
+# non-ASCII characters.
+_NON_ASCII_CHAR = "[^[:cntrl:][:print:]]{2,4}"
+_ANY_CHAR = "(.{1,4})"
+_ESCAPES = {
+    "d": f"([0-9]|{_NON_ASCII_CHAR})",
+    "D": "([^0-9]{1,4})",
+    "s": f"([[:space:]]|{_NON_ASCII_CHAR})",
+    "S": "([^[:space:]]{1,4})",
+    "w": f"([[:alnum:]_]|{_NON_ASCII_CHAR})",
+    "W": "([^[:alnum:]_]{1,4})",
+}
+_CLASS_ESCAPES = {
+    "d": "[:digit:]",
+    "s": "[:space:]",
+    "w": "[:alnum:]_",
+}
+_ERE_SPECIAL_CHARS = set(".[]()*+?{}|^$\\")
+_QUANTIFIER = re.compile(r"\{(\d*)(,?)(\d*)\}")
+
+
+def to_posix_ere(pattern: str, allow_spaces: bool = True) -> str | None:
+    """Translate a Python regular expression into a POSIX extended regular expression.
+
+    Only a conservative subset of Python syntax is supported: literals,
+    escaped punctuation, `.`, anchors, groups, alternations, greedy or lazy
+    quantifiers, bracket expressions and the `\\d`, `\\s` and `\\w` classes.
+    `None` is returned for any other construct (lookarounds, backreferences,
+    inline flags, word boundaries, ...), and for expressions which may match
+    a space when `allow_spaces` is false.
+
+    Translated expressions are meant to be evaluated on UTF-8 bytes in the C
+    locale, and match at least the strings matched by the Python expression,
+    so they can be used to pre-select candidates that are then verified
+    using the Python expression.
+    """
+    output: list[str] = []
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "(":
+            end, expression = _translate_group(pattern, pos)
+        elif char in "*+?{":
+            end, expression = _translate_quantifier(pattern, pos, bool(output))
+        else:
+            end, expression = _translate_atom(pattern, pos)
+            if expression is not None and not allow_spaces:
+                expression = _exclude_spaces(pattern[pos:end], expression)
+        if expression is None:
+            return None
+        output.append(expression)
+        pos = end
+    return "".join(output)
+
+
+def _exclude_spaces(atom: str, expression: str) -> str | None:
+    """Reject the translated `expression` of an atom when the atom may match a space."""
+    if atom in (")", "|", "^", "$") or not re.fullmatch(atom, " "):
+        return expression
+    return None
+
+
+def _translate_group(pattern: str, pos: int) -> tuple[int, str | None]:
+    """Translate the opening parenthesis of a group starting at `pos`."""
+    if pattern.startswith("(?:", pos):
+        return pos + 3, "("
+    if pattern.startswith("(?", pos):
+        return pos, None
+    return pos + 1, "("
+
+
+def _translate_quantifier(
+    pattern: str, pos: int, has_operand: bool
+) -> tuple[int, str | None]:
+    """Translate a quantifier starting at `pos`."""
+    if pattern[pos] == "{":
+        quantifier = _QUANTIFIER.match(pattern, pos)
+        if not quantifier:
+            # Python reads an invalid quantifier as a literal brace
+            return pos + 1, "\\{"
+        low, comma, high = quantifier.groups()
+        if not low and not comma:
+            return pos, None
+        expression = "{" + (low or "0") + comma + high + "}"
+        end = quantifier.end()
+    else:
+        expression = pattern[pos]
+        end = pos + 1
+    end = _skip_lazy_modifier(pattern, end)
+    if not has_operand or end < 0:
+        return pos, None
+    return end, expression
+
+
+def _translate_atom(pattern: str, pos: int) -> tuple[int, str | None]:
+    """Translate a single character, escape sequence or bracket expression."""
+    char = pattern[pos]
+    if char == "\\":
+        return pos + 2, _translate_escape(pattern[pos + 1 : pos + 2])
+    if char == "[":
+        return _translate_bracket(pattern, pos)
+    if char == "}":
+        return pos + 1, "\\}"
+    if char == ".":
+        return pos + 1, _ANY_CHAR
+    if not char.isascii():
+        # Group multi-byte characters so that quantifiers apply to all bytes
+        return pos + 1, f"({char})"
+    return pos + 1, char
+
+
+def _translate_escape(escaped: str) -> str | None:
+    """Translate the character following a backslash outside bracket expressions."""
+    if not escaped:
+        return None
+    if escaped in _ESCAPES:
+        return _ESCAPES[escaped]
+    if escaped in _ERE_SPECIAL_CHARS:
+        return "\\" + escaped
+    if escaped.isascii() and escaped.isprintable() and not escaped.isalnum():
+        return escaped
+    return None
+
+
+def _skip_lazy_modifier(pattern: str, pos: int) -> int:
+    """Skip the lazy modifier of a quantifier.
+
+    Laziness does not change whether an expression matches. Possessive
+    quantifiers are not supported and `-1` is returned.
+    """
+    if pos < len(pattern) and pattern[pos] == "?":
+        return pos + 1
+    if pos < len(pattern) and pattern[pos] == "+":
+        return -1
+    return pos
+
+
+class _Bracket:
+    """Members of a bracket expression being translated."""
+
+    def __init__(self, negate: bool) -> None:
+        self.negate = negate
+        self.members: list[str] = []
+        self.has_class_escape = False
+        self.has_closing_bracket = False
+        self.has_dash = False
+
+    def to_posix(self) -> str:
+        body = "".join(self.members)
+        if self.has_dash:
+            body += "-"
+        if self.has_closing_bracket:
+            body = "]" + body
+        if self.negate:
+            return "([^" + body + "]{1,4})"
+        if self.has_class_escape:
+            return f"([{body}]|{_NON_ASCII_CHAR})"
+        return "[" + body + "]"
+
+
+def _translate_bracket(pattern: str, pos: int) -> tuple[int, str | None]:
+    """Translate a bracket expression starting at `pos`."""
+    pos += 1
+    bracket = _Bracket(negate=pattern.startswith("^", pos))
+    if bracket.negate:
+        pos += 1
+    first = True
+    while pos < len(pattern):
+        if pattern[pos] == "]" and not first:
+            return pos + 1, bracket.to_posix()
+        first = False
+        end = _add_bracket_member(bracket, pattern, pos)
+        if end < 0:
+            return pos, None
+        pos = end
+    return pos, None
+
+
+def _add_bracket_member(bracket: _Bracket, pattern: str, pos: int) -> int:
+    """Add the member of a bracket expression at `pos`, returning its end or `-1`."""
+    char = pattern[pos]
+    if char == "\\":
+        escaped = pattern[pos + 1 : pos + 2]
+        if escaped in _CLASS_ESCAPES:
+            bracket.members.append(_CLASS_ESCAPES[escaped])
+            bracket.has_class_escape = True
+        elif (
+            not escaped
+            or escaped in "\\]^[-"
+            or escaped.isalnum()
+            or not escaped.isascii()
+        ):
+            return -1
+        else:
+            bracket.members.append(escaped)
+        return pos + 2
+    if char == "]":
+        bracket.has_closing_bracket = True
+    elif char == "[" and pattern[pos + 1 : pos + 2] in (":", ".", "="):
+        # Avoid POSIX character classes, equivalence classes and collating symbols
+        return -1
+    elif char == "-" and (
+        not bracket.members or pos + 1 >= len(pattern) or pattern[pos + 1] == "]"
+    ):
+        bracket.has_dash = True
+    elif (char == "^" and not bracket.members) or not char.isascii():
+        # A literal caret must not come first in a POSIX bracket expression
+        return -1
+    else:
+        bracket.members.append(char)
+    return pos + 1
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import heapq
+import re
+from pathlib import Path
+from typing import Iterator
+
+from .objects import OBJ_COMMIT, OBJ_TAG, Commit, ObjectStore
+
+_REVISION = re.compile(r"(?P<name>.+?)(?P<suffixes>(?:[~^][0-9]*)*)")
+_SUFFIX = re.compile(r"([~^])([0-9]*)")
+_SHA = re.compile(r"[0-9a-f]{40}")
+
+
+class Repository:
+    """A git repository read directly from its `.git` directory."""
+
+    def __init__(self, worktree: Path, git_dir: Path) -> None:
+        self.worktree = worktree
+        self.git_dir = git_dir
+        commondir = git_dir.joinpath("commondir")
+        if commondir.is_file():
+            self.common_dir = git_dir.joinpath(commondir.read_text().strip()).resolve()
+        else:
+            self.common_dir = git_dir
+        self.objects = ObjectStore(self.common_dir.joinpath("objects"))
+        self._packed_refs: dict[str, str] | None = None
+
+    @classmethod
+    def discover(cls, path: Path) -> "Repository":
+        """Find the repository containing given path."""
+        path = path.resolve()
+        for directory in (path, *path.parents):
+            dotgit = directory.joinpath(".git")
+            if dotgit.is_dir():
+                return cls(directory, dotgit)
+            if dotgit.is_file():
+                # Worktrees and submodules use a file pointing to the git directory
+                content = dotgit.read_text().strip()
+                if content.startswith("gitdir:"):
+                    git_dir = directory.joinpath(content[len("gitdir:") :].strip())
+                    return cls(directory, git_dir.resolve())
+        raise FileNotFoundError(f"Not a git repository: {path.as_posix()}")
+
+    def read_head(self) -> str:
+        """Read the HEAD reference (a ref name, or a SHA when detached)."""
+        content = self.git_dir.joinpath("HEAD").read_text().strip()
+        if content.startswith("ref:"):
+            return content[len("ref:") :].strip()
+        return content
+
+    def resolve(self, ref: str) -> str | None:
+        """Resolve a reference to a SHA, following symbolic references."""
+        for _ in range(10):
+            content = self._read_loose_ref(ref)
+            if content is None:
+                return self.read_packed_refs().get(ref)
+            if not content.startswith("ref:"):
+                return content
+            ref = content[len("ref:") :].strip()
+        raise ValueError(f"Too many levels of symbolic references: {ref}")
+
+    def resolve_revision(self, revision: str) -> str:
+        """Resolve a revision to a commit SHA.
+
+        Supported revisions are full SHAs, `HEAD`, reference names (expanded
+        like git does, e.g. `main` or `origin/main`), optionally followed by
+        `~<n>` and `^<n>` suffixes. Annotated tags are peeled to their commit.
+        """
+        match = _REVISION.fullmatch(revision)
+        if match is None:
+            raise ValueError(f"Unknown revision: {revision}")
+        sha = self._resolve_name(match.group("name"))
+        if sha is None:
+            raise ValueError(f"Unknown revision: {revision}")
+        sha = self._peel(sha)
+        for operator, value in _SUFFIX.findall(match.group("suffixes")):
+            count = int(value) if value else 1
+            if operator == "~":
+                for _ in range(count):
+                    sha = self._parent(sha, 0, revision)
+            elif count:
+                sha = self._parent(sha, count - 1, revision)
+        return sha
+
+    def read_packed_refs(self) -> dict[str, str]:
+        """Read references from the `packed-refs` file."""
+        if self._packed_refs is None:
+            refs: dict[str, str] = {}
+            packed_refs = self.common_dir.joinpath("packed-refs")
+            if packed_refs.is_file():
+                for line in packed_refs.read_text().splitlines():
+                    if not line or line.startswith(("#", "^")):
+                        continue
+                    sha, _, name = line.partition(" ")
+                    refs[name.strip()] = sha
+            self._packed_refs = refs
+        return self._packed_refs
+
+    def read_shallow(self) -> set[str]:
+        """Read the set of shallow commits (commits whose parents are missing)."""
+        shallow = self.common_dir.joinpath("shallow")
+        if not shallow.is_file():
+            return set()
+        return {line.strip() for line in shallow.read_text().splitlines() if line}
+
+    def walk(self, sha: str) -> Iterator[Commit]:
+        """Walk commit history from given commit.
+
+        Commits are yielded in reverse chronological order of commit date,
+        which is the default order used by `git log`.
+        """
+        shallow = self.read_shallow()
+        counter = 0
+        commit = self.objects.read_commit(sha)
+        queue: list[tuple[int, int, Commit]] = [(-commit.timestamp, counter, commit)]
+        seen = {sha}
+        while queue:
+            _, _, commit = heapq.heappop(queue)
+            yield commit
+            if commit.sha in shallow:
+                continue
+            for parent in commit.parents:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                counter += 1
+                parent_commit = self.objects.read_commit(parent)
+                heapq.heappush(
+                    queue, (-parent_commit.timestamp, counter, parent_commit)
+                )
+
+    def _resolve_name(self, name: str) -> str | None:
+        if name == "HEAD":
+            head = self.read_head()
+            return self.resolve(head) if head.startswith("refs/") else head
+        if _SHA.fullmatch(name) and self.objects.contains(name):
+            return name
+        for ref in (
+            name,
+            f"refs/{name}",
+            f"refs/tags/{name}",
+            f"refs/heads/{name}",
+            f"refs/remotes/{name}",
+            f"refs/remotes/{name}/HEAD",
+        ):
+            if sha := self.resolve(ref):
+                return sha
+        return None
+
+    def _peel(self, sha: str) -> str:
+        """Follow annotated tags until a commit is found."""
+        while True:
+            kind, content = self.objects.read(sha)
+            if kind == OBJ_COMMIT:
+                return sha
+            if kind != OBJ_TAG:
+                raise ValueError(f"Object is not a commit: {sha}")
+            sha = content.split(b"\n", 1)[0].split(b" ", 1)[1].decode()
+
+    def _parent(self, sha: str, position: int, revision: str) -> str:
+        parents = self.objects.read_commit(sha).parents
+        if position >= len(parents):
+            raise ValueError(f"Unknown revision: {revision}")
+        return parents[position]
+
+    def _read_loose_ref(self, ref: str) -> str | None:
+        directories = [self.git_dir]
+        if self.common_dir != self.git_dir:
+            directories.append(self.common_dir)
+        for directory in directories:
+            filepath = directory.joinpath(ref)
+            if filepath.is_file():
+                return filepath.read_text().strip()
+        return None
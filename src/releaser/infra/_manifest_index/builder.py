@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import sys
+from array import array
+from pathlib import Path
+
+from releaser.hexagon.entities import artefact
+
+from . import format
+
+
+class ManifestIndexBuilder:
+    """Build the binary index of a manifest, one application at a time.
+
+    Strings are interned and images are stored as integers, so that the
+    memory used while building stays small compared to the manifest.
+    """
+
+    def __init__(self, revision: str | None = None) -> None:
+        self._strings: dict[str, int] = {}
+        self._revision = array(format.U32)
+        if revision is not None:
+            self._revision.append(self._intern(revision))
+        self._applications = array(format.U32)
+        self._images = array(format.U32)
+        self._platform_images = array(format.U32)
+        self._keys: list[dict[int, list[int]]] = [{} for _ in range(4)]
+        self._application_indexes: dict[int, int] = {}
+        self._image_count = 0
+
+    def add_application(self, name: str, application: artefact.Application) -> None:
+        """Add an application and its images to the index."""
+        app_index = len(self._applications)
+        name_id = self._intern(name)
+        self._applications.append(name_id)
+        self._application_indexes[name_id] = app_index
+        self._keys[0].setdefault(name_id, [])
+        for image in application.images:
+            image_id = self._image_count
+            self._image_count += 1
+            self._images.extend(
+                [
+                    app_index,
+                    self._intern(image.repository),
+                    self._intern(image.image),
+                    self._intern(image.tag),
+                    len(self._platform_images) // format.PLATFORM_IMAGE_FIELDS,
+                    len(image.platforms),
+                ]
+            )
+            self._keys[0][name_id].append(image_id)
+            self._keys[1].setdefault(self._intern(image.repository), []).append(
+                image_id
+            )
+            if image.platforms:
+                # Only images with platforms have a manifest tag
+                self._keys[2].setdefault(self._intern(image.tag), []).append(image_id)
+            for platform, platform_image in image.platforms.items():
+                platform_id = self._intern(platform)
+                self._platform_images.extend(
+                    [
+                        platform_id,
+                        self._intern(platform_image.image),
+                        self._intern(platform_image.tag),
+                    ]
+                )
+                self._keys[3].setdefault(platform_id, []).append(image_id)
+
+    def build(self, json_size: int = 0, json_mtime_ns: int = 0) -> bytes:
+        """Build the index, recording the size and modification time of the JSON manifest."""
+        strings = sorted(self._strings.items(), key=lambda item: item[1])
+        string_offsets = array(format.U32)
+        string_data = bytearray()
+        for string, _ in strings:
+            string_offsets.append(len(string_data))
+            string_data += string.encode()
+        string_offsets.append(len(string_data))
+        postings = array(format.U32)
+        key_sections: list[array[int]] = []
+        for kind, keys in enumerate(self._keys):
+            section = array(format.U32)
+            for key_id in sorted(keys, key=lambda key_id: strings[key_id][0]):
+                image_ids = keys[key_id]
+                extra = self._application_indexes[key_id] if kind == 0 else 0
+                section.extend([key_id, len(postings), len(image_ids), extra])
+                postings.extend(image_ids)
+            key_sections.append(section)
+        sections: list[bytes] = [
+            _to_bytes(string_offsets),
+            bytes(string_data),
+            _to_bytes(self._applications),
+            _to_bytes(self._images),
+            _to_bytes(self._platform_images),
+            *(_to_bytes(section) for section in key_sections),
+            _to_bytes(postings),
+            _to_bytes(self._revision),
+        ]
+        layout: list[int] = []
+        offset = format.HEADER.size
+        for data in sections:
+            offset += -offset % 4
+            layout.extend([offset, len(data)])
+            offset += len(data)
+        output = bytearray(
+            format.HEADER.pack(
+                format.MAGIC, format.VERSION, json_size, json_mtime_ns, *layout
+            )
+        )
+        for data, section_offset in zip(sections, layout[::2]):
+            output += bytes(section_offset - len(output))
+            output += data
+        return bytes(output)
+
+    def write(self, path: Path, manifest_path: Path) -> None:
+        """Write the index of the JSON manifest written at `manifest_path`."""
+        info = manifest_path.stat()
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(self.build(info.st_size, info.st_mtime_ns))
+        os.replace(tmp_path, path)
+
+    def _intern(self, string: str) -> int:
+        string_id = self._strings.get(string)
+        if string_id is None:
+            string_id = self._strings[string] = len(self._strings)
+        return string_id
+
+
+def _to_bytes(values: array[int]) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
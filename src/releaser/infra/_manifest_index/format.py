@@ -0,0 +1,61 @@
+"""Layout of the binary manifest index written next to JSON manifests.
+
+All integers are little-endian. The file starts with a header holding
+the magic bytes, the format version, the size and modification time of
+the JSON manifest the index was built from, and the offset and length
+of each section. Sections are arrays of unsigned 32-bit integers, except
+the string data:
+
+- STRING_OFFSETS: offsets of each interned string within STRING_DATA,
+  followed by the end offset of the last string.
+- STRING_DATA: UTF-8 encoded strings.
+- APPLICATIONS: string id of each application name, in manifest order.
+- IMAGES: for each image, in manifest order, the index of its application
+  and the string ids of its repository, image and tag, followed by the
+  position and number of its platform images.
+- PLATFORM_IMAGES: for each platform image, the string ids of its
+  platform, image and tag.
+- *_KEYS: for each key, sorted by key, the string id of the key and the
+  position and number of its postings. The last value is the application
+  index for application keys (0 otherwise).
+- POSTINGS: image ids, in ascending order for each key.
+- REVISION: the string id of the revision of the manifest, if recorded.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+from pathlib import Path
+
+MAGIC = b"RLXI"
+VERSION = 2
+SUFFIX = ".idx"
+
+STRING_OFFSETS = 0
+STRING_DATA = 1
+APPLICATIONS = 2
+IMAGES = 3
+PLATFORM_IMAGES = 4
+APPLICATION_KEYS = 5
+REPOSITORY_KEYS = 6
+MANIFEST_TAG_KEYS = 7
+PLATFORM_KEYS = 8
+POSTINGS = 9
+REVISION = 10
+SECTIONS = 11
+
+IMAGE_FIELDS = 6
+PLATFORM_IMAGE_FIELDS = 3
+KEY_FIELDS = 4
+
+HEADER = struct.Struct(f"<4sIQq{2 * SECTIONS}Q")
+"""Magic, version, JSON size, JSON mtime (ns), then (offset, length) of each section."""
+
+U32 = "I" if array("I").itemsize == 4 else "L"
+"""Typecode of unsigned 32-bit integers arrays."""
+
+
+def sidecar_path(manifest_path: Path) -> Path:
+    """Get the path of the index of a JSON manifest."""
+    return manifest_path.with_name(manifest_path.name + SUFFIX)
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from pathlib import Path
+from typing import Callable, Collection, Iterable
+
+from releaser.hexagon.entities import artefact
+from releaser.infra.json_writer.json_file import JsonFileWriter
+
+from . import format
+
+MAGIC = "releaser-history"
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+MANIFEST_COLUMNS = ("manifest_revision", "manifest_source")
+APPLICATION_COLUMNS = ("application_manifest", "application_name")
+IMAGE_COLUMNS = (
+    "image_manifest",
+    "image_application",
+    "image_repository",
+    "image_tag",
+    "image_name",
+    "image_platform_start",
+    "image_platform_count",
+)
+PLATFORM_COLUMNS = ("platform_name", "platform_image_name", "platform_tag")
+COLUMNS = MANIFEST_COLUMNS + APPLICATION_COLUMNS + IMAGE_COLUMNS + PLATFORM_COLUMNS
+
+
+class ManifestHistoryStore(artefact.BaseManifestIndex):
+    """A columnar store of the images of many manifests.
+
+    Strings are stored once in a dictionary, and manifests, applications,
+    images and platform images are stored as columns of string ids (arrays
+    of unsigned 32-bit integers). Filters are evaluated over whole columns:
+    filter values are looked up once in the dictionary, and columns are
+    scanned for the matching ids.
+
+    Images are identified by their row, in the order manifests were added,
+    so that the store can be queried like the index of a single manifest
+    holding the images of all manifests.
+    """
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self.columns: dict[str, array[int]] = {
+            name: array(format.U32) for name in COLUMNS
+        }
+        self._distinct: dict[str, set[int]] = {}
+        self._manifest_keys: set[tuple[int, str]] | None = None
+
+    def __len__(self) -> int:
+        """The number of manifests in the store."""
+        return len(self.columns["manifest_revision"])
+
+    @property
+    def image_count(self) -> int:
+        """The number of images in the store."""
+        return len(self.columns["image_manifest"])
+
+    def add_manifest(
+        self, manifest: artefact.Manifest, source: str | None = None
+    ) -> bool:
+        """Add the images of a manifest, read from `source`.
+
+        Manifests already stored, with the same revision and content hash,
+        are skipped. Returns whether the manifest was added.
+        """
+        key = (self._intern(manifest.revision), manifest.content_hash)
+        manifest_keys = self._get_manifest_keys()
+        if key in manifest_keys:
+            return False
+        manifest_keys.add(key)
+        columns = self.columns
+        manifest_id = len(self)
+        columns["manifest_revision"].append(key[0])
+        columns["manifest_source"].append(self._intern(source))
+        for app_name, application in manifest.applications.items():
+            app_id = self._intern(app_name)
+            columns["application_manifest"].append(manifest_id)
+            columns["application_name"].append(app_id)
+            for image in application.images:
+                columns["image_manifest"].append(manifest_id)
+                columns["image_application"].append(app_id)
+                columns["image_repository"].append(self._intern(image.repository))
+                columns["image_tag"].append(self._intern(image.tag))
+                columns["image_name"].append(self._intern(image.image))
+                columns["image_platform_start"].append(len(columns["platform_name"]))
+                columns["image_platform_count"].append(len(image.platforms))
+                for platform, platform_image in image.platforms.items():
+                    columns["platform_name"].append(self._intern(platform))
+                    columns["platform_image_name"].append(
+                        self._intern(platform_image.image)
+                    )
+                    columns["platform_tag"].append(self._intern(platform_image.tag))
+        self._distinct.clear()
+        return True
+
+    def add_manifest_files(self, paths: Iterable[Path]) -> int:
+        """Add manifests read from JSON files, returning the number of manifests added.
+
+        Manifests already stored are skipped, and not counted.
+        """
+        added = 0
+        for path in paths:
+            manifest = JsonFileWriter(path).read_manifest()
+            if manifest is None:
+                raise FileNotFoundError(f"No manifest found: {path.as_posix()}")
+            added += self.add_manifest(manifest, path.as_posix())
+        return added
+
+    def save(self, path: Path) -> None:
+        """Save the store to a file.
+
+        The file starts with a JSON header line holding the strings and the
+        length of each column, followed by the columns.
+        """
+        header = {
+            "format": MAGIC,
+            "version": VERSION,
+            "byteorder": sys.byteorder,
+            "strings": self.strings,
+            "columns": {name: len(column) for name, column in self.columns.items()},
+        }
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as fileobj:
+            fileobj.write(json.dumps(header, separators=(",", ":")).encode())
+            fileobj.write(b"\n")
+            for name in COLUMNS:
+                self.columns[name].tofile(fileobj)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ManifestHistoryStore":
+        """Load a store saved to a file."""
+        store = cls()
+        with path.open("rb") as fileobj:
+            header = json.loads(fileobj.readline())
+            if header.get("format") != MAGIC or header.get("version") != VERSION:
+                raise ValueError(f"Unsupported manifest history: {path.as_posix()}")
+            store.strings = header["strings"]
+            store._string_ids = {
+                string: string_id for string_id, string in enumerate(store.strings)
+            }
+            for name in COLUMNS:
+                column = store.columns[name]
+                column.fromfile(fileobj, header["columns"][name])
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+        return store
+
+    def find_images(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+    ) -> set[int]:
+        candidates: list[set[int]] = []
+        if applications:
+            candidates.append(self._select("image_application", applications))
+        if repositories:
+            candidates.append(self._select("image_repository", repositories))
+        if manifest_tags:
+            # Only images with platforms have a manifest tag
+            with_platforms = self.columns["image_platform_count"]
+            candidates.append(
+                {
+                    image_id
+                    for image_id in self._select("image_tag", manifest_tags)
+                    if with_platforms[image_id]
+                }
+            )
+        if platforms:
+            candidates.append(self._select_platforms(platforms))
+        if not candidates:
+            return set(range(self.image_count))
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            result &= other
+        return result
+
+    def find_applications(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+    ) -> list[str]:
+        # Applications are listed once, in the order they were first added
+        app_ids = list(dict.fromkeys(self.columns["application_name"]))
+        if applications:
+            app_ids = [
+                app_id for app_id in app_ids if self.strings[app_id] in applications
+            ]
+        candidates: list[set[int]] = []
+        if repositories:
+            candidates.append(
+                self._select(
+                    "image_repository",
+                    [
+                        indexed
+                        for indexed in self.get_keys("repositories")
+                        if any(repository in indexed for repository in repositories)
+                    ],
+                )
+            )
+        if platforms:
+            candidates.append(self._select_platforms(platforms))
+        if manifest_tags:
+            candidates.append(
+                self.find_images(manifest_tags=[tag for tag in manifest_tags if tag])
+                if any(manifest_tags)
+                else set()
+            )
+        image_application = self.columns["image_application"]
+        for image_ids in candidates:
+            matching = {image_application[image_id] for image_id in image_ids}
+            app_ids = [app_id for app_id in app_ids if app_id in matching]
+        return [self.strings[app_id] for app_id in app_ids]
+
+    def get_keys(self, kind: str) -> Iterable[str]:
+        if kind == "manifest_tags":
+            with_platforms = self.columns["image_platform_count"]
+            tag_ids = set(compress(self.columns["image_tag"], with_platforms))
+            return [self.strings[tag_id] for tag_id in tag_ids]
+        column = {
+            "applications": "application_name",
+            "repositories": "image_repository",
+            "platforms": "platform_name",
+        }[kind]
+        return [self.strings[string_id] for string_id in self._distinct_ids(column)]
+
+    def get_image(self, image_id: int) -> artefact.Image:
+        columns = self.columns
+        strings = self.strings
+        image = artefact.Image(
+            repository=strings[columns["image_repository"][image_id]],
+            image=strings[columns["image_name"][image_id]],
+            tag=strings[columns["image_tag"][image_id]],
+        )
+        start = columns["image_platform_start"][image_id]
+        for row in range(start, start + columns["image_platform_count"][image_id]):
+            image.platforms[strings[columns["platform_name"][row]]] = (
+                artefact.PlatformImage(
+                    image=strings[columns["platform_image_name"][row]],
+                    tag=strings[columns["platform_tag"][row]],
+                )
+            )
+        return image
+
+    def filter_images(
+        self, field: str, match: Callable[[str], bool], image_ids: Iterable[int]
+    ) -> set[int]:
+        column = {"tag": "image_tag", "image": "image_name"}[field]
+        matching = {
+            string_id
+            for string_id in self._distinct_ids(column)
+            if match(self.strings[string_id])
+        }
+        return self._select_ids(column, matching).intersection(image_ids)
+
+    def get_revisions(self, image_ids: Collection[int]) -> list[str]:
+        image_manifest = self.columns["image_manifest"]
+        manifest_ids = sorted({image_manifest[image_id] for image_id in image_ids})
+        revisions = (
+            self.columns["manifest_revision"][manifest_id]
+            for manifest_id in manifest_ids
+        )
+        return [
+            self.strings[revision]
+            for revision in dict.fromkeys(revisions)
+            if revision != NO_STRING
+        ]
+
+    def _intern(self, string: str | None) -> int:
+        if string is None:
+            return NO_STRING
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def _get_manifest_keys(self) -> set[tuple[int, str]]:
+        """Get the revision and content hash of stored manifests, computed once."""
+        if self._manifest_keys is not None:
+            return self._manifest_keys
+        columns = self.columns
+        applications: list[dict[int, artefact.Application]] = [
+            {} for _ in range(len(self))
+        ]
+        for manifest_id, app_id in zip(
+            columns["application_manifest"], columns["application_name"]
+        ):
+            applications[manifest_id][app_id] = artefact.Application(images=[])
+        for image_id, (manifest_id, app_id) in enumerate(
+            zip(columns["image_manifest"], columns["image_application"])
+        ):
+            applications[manifest_id][app_id].images.append(self.get_image(image_id))
+        self._manifest_keys = {
+            (
+                revision,
+                artefact.Manifest(
+                    applications={
+                        self.strings[app_id]: application
+                        for app_id, application in apps.items()
+                    }
+                ).content_hash,
+            )
+            for revision, apps in zip(columns["manifest_revision"], applications)
+        }
+        return self._manifest_keys
+
+    def _distinct_ids(self, column: str) -> set[int]:
+        """Get the distinct string ids of a column, cached until manifests are added."""
+        distinct = self._distinct.get(column)
+        if distinct is None:
+            distinct = self._distinct[column] = set(self.columns[column])
+        return distinct
+
+    def _select(self, column: str, values: Iterable[str]) -> set[int]:
+        """Select the rows of a column holding any of the values."""
+        string_ids = {
+            self._string_ids[value] for value in values if value in self._string_ids
+        }
+        return self._select_ids(column, string_ids)
+
+    def _select_ids(self, column: str, string_ids: set[int]) -> set[int]:
+        if not string_ids:
+            return set()
+        values = self.columns[column]
+        return set(compress(range(len(values)), map(string_ids.__contains__, values)))
+
+    def _select_platforms(self, platforms: Iterable[str]) -> set[int]:
+        """Select the images with platform images for any of the platforms."""
+        # Platform rows are stored in image order, so the image owning a row is
+        # the last image starting at or before it
+        starts = self.columns["image_platform_start"]
+        return {
+            bisect_right(starts, row) - 1
+            for row in self._select("platform_name", platforms)
+        }
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Collection, Iterable
+
+from releaser.hexagon.entities import artefact
+
+from . import format
+
+_IMAGE = struct.Struct(f"<{format.IMAGE_FIELDS}I")
+_PLATFORM_IMAGE = struct.Struct(f"<{format.PLATFORM_IMAGE_FIELDS}I")
+_KEY = struct.Struct(f"<{format.KEY_FIELDS}I")
+_U32 = struct.Struct("<I")
+
+
+class MappedManifestIndex(artefact.BaseManifestIndex):
+    """A manifest index answering queries from a memory-mapped index file.
+
+    Keys are found by binary search and images are decoded on access, so
+    that opening the index and answering a query do not depend on the size
+    of the manifest.
+    """
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        self._data = data
+        fields = format.HEADER.unpack_from(data, 0)
+        magic, version = fields[0], fields[1]
+        if magic != format.MAGIC or version != format.VERSION:
+            raise ValueError("Unsupported manifest index")
+        self.json_size: int = fields[2]
+        self.json_mtime_ns: int = fields[3]
+        self._sections: list[tuple[int, int]] = [
+            (fields[4 + 2 * section], fields[5 + 2 * section])
+            for section in range(format.SECTIONS)
+        ]
+        self._strings_offset = self._sections[format.STRING_DATA][0]
+        self._string_cache: dict[int, str] = {}
+
+    @classmethod
+    def open(cls, path: Path) -> "MappedManifestIndex":
+        """Open an index file."""
+        with path.open("rb") as fileobj:
+            data = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data)
+
+    @classmethod
+    def open_for(cls, manifest_path: Path) -> "MappedManifestIndex | None":
+        """Open the index of a JSON manifest.
+
+        `None` is returned when the index does not exist, is invalid, or was
+        not built from the current version of the manifest.
+        """
+        path = format.sidecar_path(manifest_path)
+        try:
+            info = manifest_path.stat()
+            index = cls.open(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        if (index.json_size, index.json_mtime_ns) != (info.st_size, info.st_mtime_ns):
+            return None
+        return index
+
+    @property
+    def applications(self) -> list[str]:
+        """All application names of the manifest, in manifest order."""
+        return [
+            self._string(self._read_u32(format.APPLICATIONS, app_index))
+            for app_index in range(self._count(format.APPLICATIONS))
+        ]
+
+    def find_images(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+    ) -> set[int]:
+        candidates: list[set[int]] = []
+        if applications:
+            candidates.append(self._union(format.APPLICATION_KEYS, applications))
+        if repositories:
+            candidates.append(self._union(format.REPOSITORY_KEYS, repositories))
+        if manifest_tags:
+            candidates.append(self._union(format.MANIFEST_TAG_KEYS, manifest_tags))
+        if platforms:
+            candidates.append(self._union(format.PLATFORM_KEYS, platforms))
+        if not candidates:
+            return set(range(self._count(format.IMAGES, format.IMAGE_FIELDS)))
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            result &= other
+        return result
+
+    def find_applications(
+        self,
+        applications: Collection[str] | None = None,
+        repositories: Collection[str] | None = None,
+        platforms: Collection[str] | None = None,
+        manifest_tags: Collection[str] | None = None,
+    ) -> list[str]:
+        if applications:
+            app_indexes = {
+                key[3]
+                for name in applications
+                if (key := self._find_key(format.APPLICATION_KEYS, name)) is not None
+            }
+        else:
+            app_indexes = set(range(self._count(format.APPLICATIONS)))
+        candidates: list[set[int]] = []
+        if repositories:
+            candidates.append(
+                self._union(
+                    format.REPOSITORY_KEYS,
+                    (
+                        indexed
+                        for indexed in self._iter_keys(format.REPOSITORY_KEYS)
+                        if any(repository in indexed for repository in repositories)
+                    ),
+                )
+            )
+        if platforms:
+            candidates.append(self._union(format.PLATFORM_KEYS, platforms))
+        if manifest_tags:
+            # Images with an empty tag never match a manifest tag
+            candidates.append(
+                self._union(
+                    format.MANIFEST_TAG_KEYS, [tag for tag in manifest_tags if tag]
+                )
+            )
+        for image_ids in candidates:
+            app_indexes &= {self._read_image(image_id)[0] for image_id in image_ids}
+        return [
+            self._string(self._read_u32(format.APPLICATIONS, app_index))
+            for app_index in sorted(app_indexes)
+        ]
+
+    def get_keys(self, kind: str) -> Iterable[str]:
+        sections = {
+            "applications": format.APPLICATION_KEYS,
+            "repositories": format.REPOSITORY_KEYS,
+            "manifest_tags": format.MANIFEST_TAG_KEYS,
+            "platforms": format.PLATFORM_KEYS,
+        }
+        return self._iter_keys(sections[kind])
+
+    def get_revisions(self, image_ids: Collection[int]) -> list[str]:
+        if not image_ids or not self._count(format.REVISION):
+            return []
+        return [self._string(self._read_u32(format.REVISION, 0))]
+
+    def get_image(self, image_id: int) -> artefact.Image:
+        _, repository, image, tag, start, count = self._read_image(image_id)
+        result = artefact.Image(
+            repository=self._string(repository),
+            image=self._string(image),
+            tag=self._string(tag),
+        )
+        offset, _ = self._sections[format.PLATFORM_IMAGES]
+        for position in range(start, start + count):
+            platform, platform_image, platform_tag = _PLATFORM_IMAGE.unpack_from(
+                self._data, offset + position * _PLATFORM_IMAGE.size
+            )
+            result.platforms[self._string(platform)] = artefact.PlatformImage(
+                image=self._string(platform_image), tag=self._string(platform_tag)
+            )
+        return result
+
+    def _count(self, section: int, fields: int = 1) -> int:
+        return self._sections[section][1] // (4 * fields)
+
+    def _read_u32(self, section: int, position: int) -> int:
+        offset, _ = self._sections[section]
+        return _U32.unpack_from(self._data, offset + position * 4)[0]
+
+    def _read_image(self, image_id: int) -> tuple[int, ...]:
+        offset, _ = self._sections[format.IMAGES]
+        return _IMAGE.unpack_from(self._data, offset + image_id * _IMAGE.size)
+
+    def _read_key(self, section: int, position: int) -> tuple[int, ...]:
+        offset, _ = self._sections[section]
+        return _KEY.unpack_from(self._data, offset + position * _KEY.size)
+
+    def _string(self, string_id: int) -> str:
+        string = self._string_cache.get(string_id)
+        if string is None:
+            start, end = struct.unpack_from(
+                "<2I",
+                self._data,
+                self._sections[format.STRING_OFFSETS][0] + 4 * string_id,
+            )
+            offset = self._strings_offset
+            string = bytes(self._data[offset + start : offset + end]).decode()
+            self._string_cache[string_id] = string
+        return string
+
+    def _iter_keys(self, section: int) -> Iterable[str]:
+        for position in range(self._count(section, format.KEY_FIELDS)):
+            yield self._string(self._read_key(section, position)[0])
+
+    def _find_key(self, section: int, value: str) -> tuple[int, ...] | None:
+        """Find a key by binary search."""
+        low, high = 0, self._count(section, format.KEY_FIELDS)
+        while low < high:
+            middle = (low + high) // 2
+            key = self._read_key(section, middle)
+            string = self._string(key[0])
+            if string < value:
+                low = middle + 1
+            elif string > value:
+                high = middle
+            else:
+                return key
+        return None
+
+    def _union(self, section: int, values: Iterable[str]) -> set[int]:
+        result: set[int] = set()
+        postings_offset, _ = self._sections[format.POSTINGS]
+        for value in values:
+            key = self._find_key(section, value)
+            if key is None:
+                continue
+            start = postings_offset + key[1] * 4
+            postings = array(format.U32)
+            postings.frombytes(self._data[start : start + key[2] * 4])
+            if sys.byteorder == "big":
+                postings.byteswap()
+            result.update(postings)
+        return result
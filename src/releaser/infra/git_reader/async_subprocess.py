@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import re
+import signal
+import subprocess
+from typing import AsyncGenerator
+
+from releaser.hexagon.errors import UnknownRevisionError
+from releaser.hexagon.ports import AsyncGitReader
+
+from .._git.paths import to_working_directory_path
+from .deepening import DeepeningProgress, HistoryDeepening
+from .dirty_check import DirtyCheck
+from .subprocess import GIT_BRANCH_NAME_ENV_VAR
+
+
+class AsyncGitSubprocessReader(AsyncGitReader):
+    """A git reader running git subprocesses concurrently using asyncio.
+
+    Branch, HEAD SHA and working directory prefix are read once and shared
+    by concurrent callers. At most `max_processes` git subprocesses run at
+    the same time. An instance must only be used within a single event loop.
+    """
+
+    def __init__(
+        self,
+        dirty_check: DirtyCheck | None = None,
+        deepening: HistoryDeepening | None = None,
+        max_processes: int = 8,
+    ) -> None:
+        self.dirty_check = dirty_check or DirtyCheck()
+        self.max_processes = max_processes
+        self._deepening = DeepeningProgress(deepening)
+        self._semaphore: asyncio.Semaphore | None = None
+        self._deepening_lock: asyncio.Lock | None = None
+        self._shared: dict[str, asyncio.Future[str]] = {}
+
+    @property
+    def deepening(self) -> HistoryDeepening | None:
+        """The options used to deepen history, `None` when history is not deepened."""
+        return self._deepening.deepening
+
+    async def is_dirty(self, paths: list[str] | None = None) -> bool:
+        if self.dirty_check.engine == "status":
+            _, output = await self._run(self.dirty_check.status_command(paths))
+            return self.dirty_check.has_changes(output)
+        returncode, _ = await self._run(
+            self.dirty_check.diff_index_command(paths), check=False
+        )
+        return returncode != 0
+
+    async def read_current_branch(self) -> str:
+        if branch := os.environ.get(GIT_BRANCH_NAME_ENV_VAR):
+            return branch
+        return await self._read_shared(
+            "branch", ["git", "rev-parse", "--abbrev-ref", "HEAD"]
+        )
+
+    async def read_most_recent_commit_sha(self) -> str:
+        return await self._read_shared("sha", ["git", "rev-parse", "HEAD"])
+
+    async def read_commit_message_history(self, depth: int) -> list[str]:
+        await self._deepen_history(depth)
+        _, output = await self._run(["git", "log", f"-{depth}", "--pretty=%s"])
+        return [line.strip() for line in output.decode().strip().splitlines()]
+
+    async def read_changed_files(self, base: str) -> list[str]:
+        returncode, output = await self._run(
+            ["git", "diff", "--name-only", "--no-renames", "-z", f"{base}..HEAD"],
+            check=False,
+            stderr=subprocess.DEVNULL,
+        )
+        if returncode != 0:
+            raise UnknownRevisionError(base)
+        prefix = await self._read_shared(
+            "prefix", ["git", "rev-parse", "--show-prefix"]
+        )
+        return [
+            to_working_directory_path(path, prefix)
+            for path in output.decode(errors="surrogateescape").split("\0")
+            if path
+        ]
+
+    async def iter_commit_message_history(
+        self, depth: int
+    ) -> AsyncGenerator[str, None]:
+        await self._deepen_history(depth)
+        async with self._get_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                "git", "log", f"-{depth}", "--pretty=%s", stdout=subprocess.PIPE
+            )
+            assert process.stdout is not None
+            completed = False
+            try:
+                async for line in process.stdout:
+                    yield line.decode().strip()
+                completed = True
+            finally:
+                if completed:
+                    returncode = await process.wait()
+                else:
+                    # Generator was closed early: stop git instead of draining its output
+                    returncode = await _kill(process)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, ["git", "log"])
+
+    async def read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        """Extract the last commit message from a commit history.
+
+        History of shallow clones is deepened step by step, until a commit
+        message matches or `depth` commits are available.
+        """
+        available_depths = self._iter_available_depths(depth)
+        try:
+            async for available_depth in available_depths:
+                commit_msg = await super().read_last_commit_message(
+                    available_depth, filter
+                )
+                if commit_msg is not None:
+                    return commit_msg
+            return None
+        finally:
+            await available_depths.aclose()
+
+    async def _deepen_history(self, depth: int) -> None:
+        """Deepen the history of a shallow clone until `depth` commits are available."""
+        async for _ in self._iter_available_depths(depth):
+            pass
+
+    async def _iter_available_depths(self, depth: int) -> AsyncGenerator[int, None]:
+        """Iterate over the history depth available while deepening a shallow clone.
+
+        Concurrent tasks share the fetched history: a task only fetches
+        when no other task deepened history since its previous iteration.
+        """
+        if self.deepening is None:
+            yield depth
+            return
+        while True:
+            async with self._get_deepening_lock():
+                available_depth = await self._read_available_depth(depth)
+            if available_depth is None:
+                yield depth
+                return
+            yield available_depth
+            async with self._get_deepening_lock():
+                if await self._read_available_depth(depth) != available_depth:
+                    # History was deepened by another task meanwhile
+                    continue
+                if not await self._deepen(
+                    self._deepening.next_step(depth, available_depth)
+                ):
+                    return
+
+    async def _read_available_depth(self, depth: int) -> int | None:
+        """Read the history depth available, `None` when `depth` commits are available."""
+        while (command := self._deepening.pending_command()) is not None:
+            _, output = await self._run(command)
+            self._deepening.record_output(output)
+        return self._deepening.get_available_depth(depth)
+
+    async def _deepen(self, step: int) -> bool:
+        """Fetch `step` more commits, returning whether history was deepened."""
+        assert self.deepening is not None
+        try:
+            returncode, _ = await self._run(
+                self.deepening.fetch_command(step),
+                check=False,
+                env=self.deepening.fetch_env(),
+                timeout=self.deepening.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            returncode = -1
+        self._deepening.record_fetch(returncode == 0)
+        return returncode == 0
+
+    async def _read_shared(self, key: str, cmd: list[str]) -> str:
+        """Run a command once, sharing its output between concurrent callers."""
+        if key not in self._shared:
+            self._shared[key] = asyncio.ensure_future(self._read_output(cmd))
+        return await self._shared[key]
+
+    async def _read_output(self, cmd: list[str]) -> str:
+        _, output = await self._run(cmd)
+        return output.decode().strip()
+
+    async def _run(
+        self,
+        cmd: list[str],
+        check: bool = True,
+        env: dict[str, str] | None = None,
+        timeout: float | None = None,
+        stderr: int | None = None,
+    ) -> tuple[int, bytes]:
+        """Run a command, returning its exit code and standard output.
+
+        The command is killed and `subprocess.TimeoutExpired` is raised when
+        it runs longer than `timeout` seconds. It is killed as well when the
+        calling task is cancelled, so that no process outlives the event loop.
+        """
+        async with self._get_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                env=env,
+            )
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                raise subprocess.TimeoutExpired(cmd, timeout or 0) from None
+            finally:
+                await _kill(process)
+        assert process.returncode is not None
+        if check and process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, output)
+        return process.returncode, output
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so that it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_processes)
+        return self._semaphore
+
+    def _get_deepening_lock(self) -> asyncio.Lock:
+        if self._deepening_lock is None:
+            self._deepening_lock = asyncio.Lock()
+        return self._deepening_lock
+
+
+async def _kill(process: asyncio.subprocess.Process) -> int:
+    """Kill a process unless it already exited, and wait for it to be reaped."""
+    if process.returncode is None:
+        # `process.kill()` polls the process first, which reaps a process that
+        # exited before the child watcher did: the watcher then reports an
+        # unknown child. Until reaped, the pid cannot be reused.
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(process.pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    return await process.wait()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+from releaser.hexagon.ports import AsyncGitReader, GitReader
+
+from .async_subprocess import AsyncGitSubprocessReader
+from .deepening import HistoryDeepening
+from .dirty_check import DirtyCheck
+from .native import GitNativeReader
+from .snapshot import GitSnapshotReader
+from .threaded import ThreadedAsyncGitReader
+
+
+def create_git_reader(
+    project_root: Path,
+    dirty_check: DirtyCheck | None = None,
+    deepen_history: bool = False,
+) -> GitReader:
+    """Create a git reader for the project.
+
+    The git executable is used when available, otherwise the `.git`
+    directory is read directly, and `dirty_check` is ignored. When
+    `deepen_history` is set, history of shallow clones is fetched from the
+    `origin` remote on demand (git only).
+    """
+    if shutil.which("git"):
+        return GitSnapshotReader(
+            dirty_check=dirty_check,
+            deepening=HistoryDeepening() if deepen_history else None,
+        )
+    return GitNativeReader(project_root)
+
+
+def create_async_git_reader(
+    project_root: Path,
+    dirty_check: DirtyCheck | None = None,
+    deepen_history: bool = False,
+) -> AsyncGitReader:
+    """Create an async git reader for the project.
+
+    git subprocesses run concurrently when git is available, otherwise the
+    `.git` directory is read directly in a worker thread, and `dirty_check`
+    is ignored. When `deepen_history` is set, history of shallow clones is
+    fetched from the `origin` remote on demand (git only).
+    """
+    if shutil.which("git"):
+        return AsyncGitSubprocessReader(
+            dirty_check=dirty_check,
+            deepening=HistoryDeepening() if deepen_history else None,
+        )
+    return ThreadedAsyncGitReader(GitNativeReader(project_root))
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class HistoryDeepening:
+    """Options used to deepen the history of shallow clones on demand.
+
+    Shallow clones (e.g. `git clone --depth=1` in CI) only hold the most
+    recent commits, so commit message policies would silently see a
+    truncated history. History is fetched in exponential steps, only as
+    deep as requested by the policies.
+
+    Fetches never prompt for credentials, and are abandoned after `timeout`
+    seconds, so that they cannot hang a CI job.
+    """
+
+    remote: str = "origin"
+    """The remote to fetch history from."""
+
+    initial_step: int = 4
+    """The number of commits fetched by the first step."""
+
+    factor: int = 2
+    """The growth factor between two steps."""
+
+    timeout: float = 60.0
+    """The number of seconds after which a fetch is abandoned."""
+
+    def steps(self) -> Iterator[int]:
+        """Iterate over the number of commits to fetch at each step."""
+        step = self.initial_step
+        while True:
+            yield step
+            step *= self.factor
+
+    def is_shallow_command(self) -> list[str]:
+        """The command printing `true` when the repository is a shallow clone."""
+        return ["git", "rev-parse", "--is-shallow-repository"]
+
+    def count_command(self) -> list[str]:
+        """The command printing the number of commits available from HEAD."""
+        return ["git", "rev-list", "--count", "HEAD"]
+
+    def fetch_command(self, step: int) -> list[str]:
+        """The command fetching `step` more commits beyond the shallow boundary."""
+        return ["git", "fetch", "--quiet", "--no-tags", f"--deepen={step}", self.remote]
+
+    def fetch_env(self) -> dict[str, str]:
+        """The environment of fetch commands, disabling credential and passphrase prompts."""
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0", "GCM_INTERACTIVE": "never"}
+        env.setdefault("GIT_SSH_COMMAND", "ssh -o BatchMode=yes")
+        return env
+
+    def fetch(self, step: int) -> None:
+        """Fetch `step` more commits beyond the current shallow boundary.
+
+        Raises `subprocess.CalledProcessError` when fetching fails, and
+        `subprocess.TimeoutExpired` when it takes longer than `timeout`.
+        """
+        subprocess.run(
+            self.fetch_command(step),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            env=self.fetch_env(),
+            timeout=self.timeout,
+            check=True,
+        )
+
+
+class DeepeningProgress:
+    """The progress of the deepening of a shallow clone, shared by the reads of a git reader.
+
+    The progress tracks the history depth available locally and the size of
+    the next fetch, while readers run the git commands, synchronously or not.
+    """
+
+    def __init__(self, deepening: HistoryDeepening | None) -> None:
+        self.deepening = deepening
+        """The deepening options, `None` once deepening is disabled."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the available depth, and restart from the first step."""
+        self._shallow: bool | None = None
+        self._available_depth: int | None = None
+        self._steps: Iterator[int] | None = None
+
+    def pending_command(self) -> list[str] | None:
+        """The command whose output is needed to know the available depth, `None` once known."""
+        if self.deepening is None:
+            return None
+        if self._shallow is None:
+            return self.deepening.is_shallow_command()
+        if self._shallow and self._available_depth is None:
+            return self.deepening.count_command()
+        return None
+
+    def record_output(self, output: bytes) -> None:
+        """Record the output of the pending command."""
+        if self._shallow is None:
+            self._shallow = output.decode().strip() == "true"
+        else:
+            self._available_depth = int(output.decode().strip())
+
+    def get_available_depth(self, depth: int) -> int | None:
+        """Get the history depth available, `None` when `depth` commits are available.
+
+        The output of pending commands must have been recorded.
+        """
+        if self.deepening is None or not self._shallow:
+            return None
+        assert self._available_depth is not None
+        if self._available_depth >= depth:
+            return None
+        return self._available_depth
+
+    def next_step(self, depth: int, available_depth: int) -> int:
+        """The number of commits to fetch next, so that at most `depth` are available."""
+        assert self.deepening is not None
+        if self._steps is None:
+            # Steps are shared by all reads, so that growth stays exponential
+            self._steps = self.deepening.steps()
+        return min(next(self._steps), depth - available_depth)
+
+    def record_fetch(self, fetched: bool) -> None:
+        """Record whether a fetch succeeded."""
+        if fetched:
+            self._shallow = None
+            self._available_depth = None
+        else:
+            # Keep working with the available history (e.g. when offline)
+            self.deepening = None
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass
+from typing import Literal
+
+MODES = ("diff-index", "status", "fast")
+"""Names of the dirty checks which can be configured."""
+
+
+@dataclass(frozen=True)
+class DirtyCheck:
+    """Options used to check whether tracked files have uncommitted changes."""
+
+    engine: Literal["diff-index", "status"] = "diff-index"
+    """The git command used to detect changes.
+
+    `diff-index` runs `git diff-index --quiet HEAD`, while `status` runs
+    `git status --porcelain=v2 --untracked-files=no`, which can benefit
+    from the filesystem monitor.
+    """
+
+    fsmonitor: bool = False
+    """Enable the builtin filesystem monitor (`core.fsmonitor`) while checking for changes.
+
+    git ignores this option on platforms where the builtin monitor is not
+    available. Elsewhere, git starts a monitor daemon which keeps running
+    in the background, so this option must be enabled explicitly.
+    """
+
+    @classmethod
+    def fast(cls) -> "DirtyCheck":
+        """The fastest dirty check available, starting a filesystem monitor daemon."""
+        return cls(engine="status", fsmonitor=True)
+
+    @classmethod
+    def from_mode(cls, mode: str) -> "DirtyCheck":
+        """Create a dirty check from its name (see `MODES`)."""
+        if mode == "fast":
+            return cls.fast()
+        if mode == "status":
+            return cls(engine="status")
+        if mode == "diff-index":
+            return cls()
+        raise ValueError(f"Unknown dirty check: {mode}")
+
+    def git_options(self) -> list[str]:
+        """Options to give to git before the command name."""
+        if self.fsmonitor:
+            return ["-c", "core.fsmonitor=true"]
+        return []
+
+    def status_command(
+        self, paths: list[str] | None = None, branch: bool = False
+    ) -> list[str]:
+        """The `git status` command listing changes to tracked files."""
+        cmd = ["git", *self.git_options(), "status", "--porcelain=v2", "-z"]
+        if branch:
+            cmd.append("--branch")
+        cmd.append("--untracked-files=no")
+        if paths:
+            cmd.extend(["--", *paths])
+        return cmd
+
+    def diff_index_command(self, paths: list[str] | None = None) -> list[str]:
+        """The `git diff-index` command exiting with a non-zero code when tracked files changed."""
+        cmd = ["git", *self.git_options(), "diff-index", "--quiet", "HEAD", "--"]
+        return [*cmd, *(paths or [])]
+
+    @staticmethod
+    def has_changes(status_output: bytes) -> bool:
+        """Check if the output of the `git status` command lists changes."""
+        return any(
+            entry and not entry.startswith(b"#") for entry in status_output.split(b"\0")
+        )
+
+    def is_dirty(self, paths: list[str] | None = None) -> bool:
+        """Check if tracked files (within given paths, if any) have uncommitted changes."""
+        if self.engine == "status":
+            return self.has_changes(subprocess.check_output(self.status_command(paths)))
+        process = subprocess.run(self.diff_index_command(paths))
+        return process.returncode != 0
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Generator
+
+from releaser.hexagon.errors import UnknownRevisionError
+from releaser.hexagon.ports import GitReader
+
+from .._git.index import diff_trees, is_worktree_dirty
+from .._git.paths import to_repository_paths, to_working_directory_path
+from .._git.repository import Repository
+from .subprocess import GIT_BRANCH_NAME_ENV_VAR
+
+
+class GitNativeReader(GitReader):
+    """A git reader that reads the `.git` directory without running git.
+
+    References, loose objects and packfiles are read directly, so this
+    reader can be used where git is not installed.
+
+    Readers can be shared by several threads: files are read without
+    shared cursors, and caches are published once complete.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._repository: Repository | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def repository(self) -> Repository:
+        """The repository, discovered on first access."""
+        if self._repository is None:
+            with self._lock:
+                if self._repository is None:
+                    self._repository = Repository.discover(self.path or Path.cwd())
+        return self._repository
+
+    def is_dirty(self, paths: list[str] | None = None) -> bool:
+        repository = self.repository
+        sha = self._read_head_sha()
+        tree = repository.objects.read_commit(sha).tree if sha else None
+        directories: list[str] | None = None
+        if paths is not None:
+            directories = to_repository_paths(paths, self._read_prefix())
+        return is_worktree_dirty(
+            repository.worktree,
+            repository.git_dir.joinpath("index"),
+            repository.objects,
+            tree,
+            directories,
+        )
+
+    def read_current_branch(self) -> str:
+        if branch := os.environ.get(GIT_BRANCH_NAME_ENV_VAR):
+            return branch
+        head = self.repository.read_head()
+        if head.startswith("refs/heads/"):
+            return head[len("refs/heads/") :]
+        if head.startswith("refs/"):
+            return head
+        return "HEAD"
+
+    def read_most_recent_commit_sha(self) -> str:
+        sha = self._read_head_sha()
+        if sha is None:
+            raise RuntimeError("Cannot read commit SHA: repository has no commit")
+        return sha
+
+    def read_changed_files(self, base: str) -> list[str]:
+        repository = self.repository
+        objects = repository.objects
+        try:
+            base_tree = objects.read_commit(repository.resolve_revision(base)).tree
+        except (KeyError, ValueError) as exc:
+            # Unknown names, or commits missing from a shallow clone
+            raise UnknownRevisionError(base) from exc
+        head_tree = objects.read_commit(self.read_most_recent_commit_sha()).tree
+        prefix = self._read_prefix()
+        return [
+            to_working_directory_path(path, prefix)
+            for path in diff_trees(objects, base_tree, head_tree)
+        ]
+
+    def read_commit_message_history(self, depth: int) -> list[str]:
+        return list(self.iter_commit_message_history(depth))
+
+    def iter_commit_message_history(self, depth: int) -> Generator[str, None, None]:
+        sha = self._read_head_sha()
+        if sha is None:
+            return
+        for commit in islice(self.repository.walk(sha), depth):
+            yield commit.subject.strip()
+
+    def _read_head_sha(self) -> str | None:
+        head = self.repository.read_head()
+        if head.startswith("refs/"):
+            return self.repository.resolve(head)
+        return head
+
+    def _read_prefix(self) -> str:
+        """Read the path of the working directory relative to the repository root."""
+        cwd = (self.path or Path.cwd()).resolve()
+        prefix = cwd.relative_to(self.repository.worktree).as_posix()
+        return "" if prefix == "." else prefix
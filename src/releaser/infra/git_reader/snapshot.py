@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import Generator
+
+from releaser.hexagon.ports import GitReader
+
+from .._git.paths import is_within_any, to_repository_paths
+from .deepening import HistoryDeepening
+from .dirty_check import DirtyCheck
+from .subprocess import GIT_BRANCH_NAME_ENV_VAR, GitSubprocessReader
+
+
+@dataclass(frozen=True)
+class GitStatusSnapshot:
+    """Repository facts collected with a single `git status` invocation."""
+
+    branch: str
+    """The name of the current branch (`HEAD` when detached)."""
+
+    sha: str | None
+    """The SHA of the HEAD commit (`None` when repository has no commit)."""
+
+    changed_paths: tuple[str, ...]
+    """Paths of changed tracked files, relative to repository root."""
+
+    @property
+    def dirty(self) -> bool:
+        """Whether tracked files have uncommitted changes."""
+        return bool(self.changed_paths)
+
+    @classmethod
+    def parse_porcelain_v2(cls, output: str) -> "GitStatusSnapshot":
+        """Parse the output of `git status --porcelain=v2 --branch -z`."""
+        branch = "HEAD"
+        sha: str | None = None
+        changed_paths: list[str] = []
+        entries = iter(output.split("\0"))
+        for entry in entries:
+            if entry.startswith("# branch.oid "):
+                oid = entry[len("# branch.oid ") :].strip()
+                sha = None if oid == "(initial)" else oid
+            elif entry.startswith("# branch.head "):
+                head = entry[len("# branch.head ") :].strip()
+                branch = "HEAD" if head == "(detached)" else head
+            elif entry.startswith("1 "):
+                changed_paths.append(entry.split(" ", 8)[8])
+            elif entry.startswith("2 "):
+                # Renamed or copied entries are followed by the original path
+                changed_paths.append(entry.split(" ", 9)[9])
+                changed_paths.append(next(entries, ""))
+            elif entry.startswith("u "):
+                changed_paths.append(entry.split(" ", 10)[10])
+        return cls(branch=branch, sha=sha, changed_paths=tuple(changed_paths))
+
+
+class GitSnapshotReader(GitSubprocessReader):
+    """A git reader that collects repository facts once and answers from memory.
+
+    Branch, HEAD SHA and dirty state are read using a single `git status`
+    subprocess. Commit history is read using a single `git log` subprocess,
+    as deep as the deepest history requested so far (and at least `min_depth`
+    commits deep), so that all policies share the same history.
+
+    The `git status` subprocess always uses the porcelain v2 format, the
+    `dirty_check` options only configure the filesystem monitor.
+
+    Snapshots are thread-safe: concurrent reads wait for the subprocess
+    filling the cache instead of running the same subprocess again.
+    """
+
+    def __init__(
+        self,
+        min_depth: int = 20,
+        dirty_check: DirtyCheck | None = None,
+        deepening: HistoryDeepening | None = None,
+    ) -> None:
+        super().__init__(dirty_check or DirtyCheck(), deepening)
+        self.min_depth = min_depth
+        self._status: GitStatusSnapshot | None = None
+        self._history: list[str] | None = None
+        self._history_depth = 0
+        self._prefix: str | None = None
+        self._changed_files: dict[str, list[str]] = {}
+
+    def is_dirty(self, paths: list[str] | None = None) -> bool:
+        status = self.read_status()
+        if paths is None:
+            return status.dirty
+        directories = to_repository_paths(paths, self._read_prefix())
+        return any(is_within_any(path, directories) for path in status.changed_paths)
+
+    def read_current_branch(self) -> str:
+        if branch := os.environ.get(GIT_BRANCH_NAME_ENV_VAR):
+            return branch
+        return self.read_status().branch
+
+    def read_most_recent_commit_sha(self) -> str:
+        sha = self.read_status().sha
+        if sha is None:
+            raise RuntimeError("Cannot read commit SHA: repository has no commit")
+        return sha
+
+    def read_commit_message_history(self, depth: int) -> list[str]:
+        with self._lock:
+            self._deepen_history(depth)
+            if self._history is None or (
+                depth > self._history_depth
+                and len(self._history) >= self._history_depth
+            ):
+                # Either history was never read, or it was truncated by a previous
+                # (smaller) depth and must be read again.
+                self._history_depth = max(depth, self.min_depth)
+                self._history = self._read_commit_message_history(self._history_depth)
+            return self._history[:depth]
+
+    def _read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        # Filters are matched against the cached history shared by all
+        # policies, rather than pushed down to git
+        return GitReader.read_last_commit_message(self, depth, filter)
+
+    def read_changed_files(self, base: str) -> list[str]:
+        with self._lock:
+            if base not in self._changed_files:
+                self._changed_files[base] = super().read_changed_files(base)
+            return list(self._changed_files[base])
+
+    def iter_commit_message_history(self, depth: int) -> Generator[str, None, None]:
+        yield from self.read_commit_message_history(depth)
+
+    def read_status(self) -> GitStatusSnapshot:
+        """Read branch, HEAD SHA and dirty state, using a cached snapshot when possible."""
+        with self._lock:
+            if self._status is None:
+                output = subprocess.check_output(
+                    self.dirty_check.status_command(branch=True)
+                )
+                self._status = GitStatusSnapshot.parse_porcelain_v2(
+                    output.decode(errors="surrogateescape")
+                )
+            return self._status
+
+    def reset(self) -> None:
+        """Drop the snapshot so that next calls read the repository again."""
+        with self._lock:
+            self._status = None
+            self._history = None
+            self._history_depth = 0
+            self._prefix = None
+            self._changed_files = {}
+            self._deepening.reset()
+
+    def _deepen(self, step: int) -> bool:
+        deepened = super()._deepen(step)
+        if deepened:
+            # Cached history may have been truncated by the shallow boundary
+            self._history = None
+            self._history_depth = 0
+        return deepened
+
+    def _read_prefix(self) -> str:
+        with self._lock:
+            if self._prefix is None:
+                self._prefix = super()._read_prefix()
+            return self._prefix
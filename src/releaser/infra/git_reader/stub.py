@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from releaser.hexagon.ports import GitReader
+from releaser.hexagon.errors import UnknownRevisionError
+from releaser.hexagon.ports import AsyncGitReader, GitReader
 
 
 class GitReaderStub(GitReader):
@@ -10,16 +11,20 @@ class GitReaderStub(GitReader):
         self._sha: str | None = None
         self._history: list[str] | None = None
         self._is_dirty: bool | None = None
+        self.dirty_paths: list[str] | None = None
         self._branch: str | None = None
+        self._changed_files: list[str] | None = None
+        self._unknown_revisions: set[str] = set()
 
     def read_current_branch(self) -> str:
         if self._branch is None:
             raise RuntimeError("branch not set in stub git reader")
         return self._branch
 
-    def is_dirty(self) -> bool:
+    def is_dirty(self, paths: list[str] | None = None) -> bool:
         if self._is_dirty is None:
             raise RuntimeError("is_dirty not set in stub git reader")
+        self.dirty_paths = paths
         return self._is_dirty
 
     def read_most_recent_commit_sha(self) -> str:
@@ -32,6 +37,13 @@ class GitReaderStub(GitReader):
             raise RuntimeError("history not set in stub git reader")
         return list(self._history)
 
+    def read_changed_files(self, base: str) -> list[str]:
+        if base in self._unknown_revisions:
+            raise UnknownRevisionError(base)
+        if self._changed_files is None:
+            raise RuntimeError("changed files not set in stub git reader")
+        return list(self._changed_files)
+
     def set_sha(self, sha: str) -> None:
         """Test helper: Set the sha that will be returned by read_most_recent_commit_sha."""
         self._sha = sha
@@ -47,3 +59,37 @@ class GitReaderStub(GitReader):
     def set_branch(self, branch: str) -> None:
         """ Test helper : set the value that be returned by read_current_branch."""
         self._branch = branch
+
+    def set_changed_files(self, changed_files: list[str]) -> None:
+        """Test helper: Set the files that will be returned by read_changed_files."""
+        self._changed_files = changed_files
+
+    def set_unknown_revision(self, revision: str) -> None:
+        """Test helper: Make read_changed_files fail for the given revision."""
+        self._unknown_revisions.add(revision)
+
+
+class AsyncGitReaderStub(AsyncGitReader):
+    """A stub async git reader that can be used for testing.
+
+    Values are read from a synchronous stub, so that the same test helpers
+    can be used.
+    """
+
+    def __init__(self, stub: GitReaderStub | None = None) -> None:
+        self.stub = stub or GitReaderStub()
+
+    async def read_current_branch(self) -> str:
+        return self.stub.read_current_branch()
+
+    async def is_dirty(self, paths: list[str] | None = None) -> bool:
+        return self.stub.is_dirty(paths)
+
+    async def read_most_recent_commit_sha(self) -> str:
+        return self.stub.read_most_recent_commit_sha()
+
+    async def read_commit_message_history(self, depth: int) -> list[str]:
+        return self.stub.read_commit_message_history(depth)
+
+    async def read_changed_files(self, base: str) -> list[str]:
+        return self.stub.read_changed_files(base)
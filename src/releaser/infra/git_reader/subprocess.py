@@ -1,25 +1,51 @@
 from __future__ import annotations
 
 import os
+import re
 import subprocess
+import threading
+from typing import IO, Generator, Iterator
 
+from releaser.hexagon.errors import UnknownRevisionError
 from releaser.hexagon.ports import GitReader
 
+from .._git.paths import to_working_directory_path
+from .._git.regex import to_posix_ere
+from .deepening import DeepeningProgress, HistoryDeepening
+from .dirty_check import DirtyCheck
+
 GIT_BRANCH_NAME_ENV_VAR = "BUILD_BRANCH_NAME"
 
 
 class GitSubprocessReader(GitReader):
-    """A git reader that uses subprocesses to read git information."""
+    """A git reader that uses subprocesses to read git information.
+
+    When `deepening` is given, the history of shallow clones is fetched
+    on demand, as deep as requested by commit message policies.
 
-    def __init__(self) -> None:
+    Readers can be shared by several threads: deepening is serialized by
+    a reentrant lock, which subclasses also use to guard their caches.
+    """
+
+    def __init__(
+        self,
+        dirty_check: DirtyCheck | None = None,
+        deepening: HistoryDeepening | None = None,
+    ) -> None:
         # FIXME: Check if git is installed
         # FIXME: Check if directory is a git repository
         # Let the CLI handle these errors
-        pass
+        self.dirty_check = dirty_check or DirtyCheck()
+        self._deepening = DeepeningProgress(deepening)
+        self._lock = threading.RLock()
+
+    @property
+    def deepening(self) -> HistoryDeepening | None:
+        """The options used to deepen history, `None` when history is not deepened."""
+        return self._deepening.deepening
 
-    def is_dirty(self) -> bool:
-        process = subprocess.run(["git", "diff-index", "--quiet", "HEAD", "--"])
-        return process.returncode != 0
+    def is_dirty(self, paths: list[str] | None = None) -> bool:
+        return self.dirty_check.is_dirty(paths)
 
     def read_current_branch(self) -> str:
         if branch := os.environ.get(GIT_BRANCH_NAME_ENV_VAR):
@@ -34,6 +60,10 @@ class GitSubprocessReader(GitReader):
         return long_sha
 
     def read_commit_message_history(self, depth: int) -> list[str]:
+        self._deepen_history(depth)
+        return self._read_commit_message_history(depth)
+
+    def _read_commit_message_history(self, depth: int) -> list[str]:
         history = (
             subprocess.check_output(["git", "log", f"-{depth}", "--pretty=%s"])
             .decode()
@@ -41,3 +71,194 @@ class GitSubprocessReader(GitReader):
             .splitlines()
         )
         return [line.strip() for line in history]
+
+    def read_changed_files(self, base: str) -> list[str]:
+        try:
+            output = subprocess.check_output(
+                ["git", "diff", "--name-only", "--no-renames", "-z", f"{base}..HEAD"],
+                stderr=subprocess.DEVNULL,
+            )
+        except subprocess.CalledProcessError as exc:
+            raise UnknownRevisionError(base) from exc
+        prefix = self._read_prefix()
+        return [
+            to_working_directory_path(path, prefix)
+            for path in output.decode(errors="surrogateescape").split("\0")
+            if path
+        ]
+
+    def iter_commit_message_history(self, depth: int) -> Generator[str, None, None]:
+        self._deepen_history(depth)
+        yield from _stream_lines(["git", "log", f"-{depth}", "--pretty=%s"])
+
+    def read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        """Extract the last commit message from a commit history.
+
+        When the filter can be expressed as a POSIX regular expression, git
+        selects candidate commits natively (`git log --grep`) and only those
+        candidates are matched against the filter in Python.
+
+        History of shallow clones is deepened step by step, until a commit
+        message matches or `depth` commits are available.
+        """
+        for available_depth in self._iter_available_depths(depth):
+            commit_msg = self._read_last_commit_message(available_depth, filter)
+            if commit_msg is not None:
+                return commit_msg
+        return None
+
+    def _read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        if filter and depth > 0 and (pattern := _to_posix_ere(filter)) is not None:
+            try:
+                return self._grep_last_commit_message(depth, filter, pattern)
+            except subprocess.CalledProcessError:
+                # git may reject an expression it cannot compile
+                pass
+        return super().read_last_commit_message(depth, filter)
+
+    def _deepen_history(self, depth: int) -> None:
+        """Deepen the history of a shallow clone until `depth` commits are available."""
+        for _ in self._iter_available_depths(depth):
+            pass
+
+    def _iter_available_depths(self, depth: int) -> Iterator[int]:
+        """Iterate over the history depth available while deepening a shallow clone.
+
+        The history is deepened after each iteration, until `depth` commits
+        are available, the clone is complete, or fetching fails.
+        """
+        if self.deepening is None:
+            yield depth
+            return
+        while True:
+            with self._lock:
+                available_depth = self._read_available_depth(depth)
+            if available_depth is None:
+                yield depth
+                return
+            yield available_depth
+            with self._lock:
+                if self._read_available_depth(depth) != available_depth:
+                    # History was deepened by another thread meanwhile
+                    continue
+                if not self._deepen(self._deepening.next_step(depth, available_depth)):
+                    return
+
+    def _read_available_depth(self, depth: int) -> int | None:
+        """Read the history depth available, `None` when `depth` commits are available.
+
+        Must be called with the lock held.
+        """
+        while (command := self._deepening.pending_command()) is not None:
+            self._deepening.record_output(subprocess.check_output(command))
+        return self._deepening.get_available_depth(depth)
+
+    def _deepen(self, step: int) -> bool:
+        """Fetch `step` more commits, returning whether history was deepened.
+
+        Must be called with the lock held.
+        """
+        assert self.deepening is not None
+        try:
+            self.deepening.fetch(step)
+            fetched = True
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            fetched = False
+        self._deepening.record_fetch(fetched)
+        return fetched
+
+    def _read_prefix(self) -> str:
+        """Read the path of the working directory relative to the repository root."""
+        output = subprocess.check_output(["git", "rev-parse", "--show-prefix"])
+        return output.decode().strip()
+
+    def _grep_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str], pattern: str
+    ) -> str | None:
+        # git log --max-count limits the number of matching commits rather than
+        # the number of scanned commits, so commits within depth are listed by
+        # rev-list and piped to git log which filters them without walking history.
+        env = {**os.environ, "LC_ALL": "C"}
+        revisions = subprocess.Popen(
+            ["git", "rev-list", f"--max-count={depth}", "HEAD"],
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        assert revisions.stdout is not None
+        regexp = re.compile(filter)
+        candidates = _stream_lines(
+            [
+                "git",
+                "log",
+                "--stdin",
+                "--no-walk=unsorted",
+                "--extended-regexp",
+                f"--grep=^[[:space:]]*({pattern})",
+                "--pretty=%s",
+            ],
+            stdin=revisions.stdout,
+            env=env,
+        )
+        # The pipe is owned by git log from now on
+        revisions.stdout.close()
+        try:
+            # Candidates may match on a line of the commit body, not on the subject
+            for commit_msg in candidates:
+                if regexp.match(commit_msg):
+                    return commit_msg
+        finally:
+            candidates.close()
+            if revisions.poll() is None:
+                revisions.kill()
+            revisions.wait()
+        if revisions.returncode != 0:
+            raise subprocess.CalledProcessError(revisions.returncode, revisions.args)
+        return None
+
+
+def _to_posix_ere(filter: str | re.Pattern[str]) -> str | None:
+    """Translate a filter into a POSIX extended regular expression, when possible.
+
+    `git log --grep` matches message lines one at a time, while subjects join
+    the lines of the first paragraph with spaces. Filters which may match a
+    space could match across lines of a wrapped subject, so they are not
+    translated.
+    """
+    if isinstance(filter, str):
+        return to_posix_ere(filter, allow_spaces=False)
+    if filter.flags & ~re.UNICODE:
+        # Flags such as IGNORECASE cannot be translated
+        return None
+    return to_posix_ere(filter.pattern, allow_spaces=False)
+
+
+def _stream_lines(
+    cmd: list[str], stdin: IO[bytes] | None = None, env: dict[str, str] | None = None
+) -> Generator[str, None, None]:
+    """Start a command and stream the stripped lines written to its standard output.
+
+    The command is killed when the generator is closed before the command exits.
+    """
+    process = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE, env=env)
+    return _read_lines(process)
+
+
+def _read_lines(process: subprocess.Popen[bytes]) -> Generator[str, None, None]:
+    assert process.stdout is not None
+    completed = False
+    try:
+        for line in process.stdout:
+            yield line.decode().strip()
+        completed = True
+    finally:
+        if not completed and process.poll() is None:
+            # Generator was closed early: stop git instead of draining its output
+            process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, process.args)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Callable, TypeVar
+
+from releaser.hexagon.ports import AsyncGitReader, GitReader
+
+T = TypeVar("T")
+
+
+class ThreadedAsyncGitReader(AsyncGitReader):
+    """An async git reader running a synchronous git reader in a worker thread.
+
+    The reader must be safe to share between threads (as the native and
+    subprocess readers are): calls run concurrently in the default executor
+    of the event loop, so that reads of different applications overlap.
+    """
+
+    def __init__(self, reader: GitReader) -> None:
+        self.reader = reader
+
+    async def is_dirty(self, paths: list[str] | None = None) -> bool:
+        return await self._call(lambda: self.reader.is_dirty(paths))
+
+    async def read_current_branch(self) -> str:
+        return await self._call(self.reader.read_current_branch)
+
+    async def read_most_recent_commit_sha(self) -> str:
+        return await self._call(self.reader.read_most_recent_commit_sha)
+
+    async def read_commit_message_history(self, depth: int) -> list[str]:
+        return await self._call(lambda: self.reader.read_commit_message_history(depth))
+
+    async def read_changed_files(self, base: str) -> list[str]:
+        return await self._call(lambda: self.reader.read_changed_files(base))
+
+    async def read_last_commit_message(
+        self, depth: int, filter: str | re.Pattern[str] | None
+    ) -> str | None:
+        return await self._call(
+            lambda: self.reader.read_last_commit_message(depth, filter)
+        )
+
+    async def _call(self, function: Callable[[], T]) -> T:
+        return await asyncio.to_thread(function)
@@ -0,0 +1,171 @@
+"""Read JSON manifests incrementally, one application at a time."""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterator, TextIO, Tuple
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import AbortedManifestError
+
+CHUNK_SIZE = 64 * 1024
+
+_TOKEN = re.compile(
+    r'[ \t\n\r]*(?:([{}\[\]:,])|("(?:[^"\\]|\\.)*")|([^ \t\n\r{}\[\]:,"]+))', re.DOTALL
+)
+
+Event = Tuple[str, Any]
+"""A JSON event: a punctuation character and `None`, or "string" or "scalar" and the decoded value."""
+
+
+def iter_json_events(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Event]:
+    """Iterate over the tokens of a JSON document read from a text stream.
+
+    The stream is read by chunks, so that memory usage is bounded by the
+    size of the chunks and of the longest token. Structure is checked by
+    the consumer of the events.
+    """
+    buffer = ""
+    position = 0
+    eof = False
+    while True:
+        match = _TOKEN.match(buffer, position)
+        if match is None or (match.end() == len(buffer) and not eof):
+            # The next token may continue in the next chunk
+            if eof:
+                if not buffer[position:].strip(" \t\n\r"):
+                    return
+                raise ValueError(
+                    f"Invalid JSON: unexpected data {buffer[position:position + 20]!r}"
+                )
+            chunk = stream.read(chunk_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
+            continue
+        position = match.end()
+        punctuation, string, scalar = match.groups()
+        if punctuation:
+            yield punctuation, None
+        elif string:
+            yield "string", json.loads(string)
+        else:
+            if scalar not in ("true", "false", "null"):
+                try:
+                    float(scalar)
+                except ValueError:
+                    raise ValueError(
+                        f"Invalid JSON: unexpected value {scalar!r}"
+                    ) from None
+            yield "scalar", json.loads(scalar)
+
+
+def iter_manifest_applications(
+    stream: TextIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str, artefact.Application]]:
+    """Iterate over the applications of a JSON manifest read from a text stream.
+
+    Only the application being decoded is kept in memory, and other keys of
+    the manifest (revision and fingerprints) are skipped. The partial output
+    of an aborted generation is marked after its applications, so
+    `AbortedManifestError` is raised once they have been iterated.
+    """
+    events = iter_json_events(stream, chunk_size)
+    found = False
+    for key in _iter_keys(events):
+        if key == "aborted":
+            if _read_value(events):
+                raise AbortedManifestError()
+            continue
+        if key != "applications":
+            _skip_value(events)
+            continue
+        found = True
+        for name in _iter_keys(events):
+            yield name, artefact.Application.parse_dict(_read_value(events))
+    if not found:
+        raise ValueError("Invalid manifest: missing applications")
+    if next(events, None) is not None:
+        raise ValueError("Invalid JSON: extra data")
+
+
+def _next(events: Iterator[Event]) -> Event:
+    event = next(events, None)
+    if event is None:
+        raise ValueError("Invalid JSON: unexpected end of data")
+    return event
+
+
+def _expect(events: Iterator[Event], expected: str) -> None:
+    kind, _ = _next(events)
+    if kind != expected:
+        raise ValueError(f"Invalid JSON: expected {expected!r}, got {kind!r}")
+
+
+def _iter_keys(events: Iterator[Event]) -> Iterator[str]:
+    """Iterate over the keys of an object, whose values are consumed by the caller."""
+    _expect(events, "{")
+    kind, key = _next(events)
+    if kind == "}":
+        return
+    while True:
+        if kind != "string":
+            raise ValueError(f"Invalid JSON: expected a key, got {kind!r}")
+        _expect(events, ":")
+        yield key
+        kind, _ = _next(events)
+        if kind == "}":
+            return
+        if kind != ",":
+            raise ValueError(f"Invalid JSON: expected ',', got {kind!r}")
+        kind, key = _next(events)
+
+
+def _read_value(events: Iterator[Event]) -> Any:
+    return _build_value(events, _next(events))
+
+
+def _build_value(events: Iterator[Event], event: Event) -> Any:
+    kind, value = event
+    if kind in ("string", "scalar"):
+        return value
+    if kind == "{":
+        result: dict[str, Any] = {}
+        kind, key = _next(events)
+        while kind != "}":
+            if kind != "string":
+                raise ValueError(f"Invalid JSON: expected a key, got {kind!r}")
+            _expect(events, ":")
+            result[key] = _read_value(events)
+            kind, key = _next(events)
+            if kind == ",":
+                kind, key = _next(events)
+            elif kind != "}":
+                raise ValueError(f"Invalid JSON: expected ',', got {kind!r}")
+        return result
+    if kind == "[":
+        items: list[Any] = []
+        event = _next(events)
+        while event[0] != "]":
+            items.append(_build_value(events, event))
+            event = _next(events)
+            if event[0] == ",":
+                event = _next(events)
+            elif event[0] != "]":
+                raise ValueError(f"Invalid JSON: expected ',', got {event[0]!r}")
+        return items
+    raise ValueError(f"Invalid JSON: unexpected {kind!r}")
+
+
+def _skip_value(events: Iterator[Event]) -> None:
+    """Consume a value without building it."""
+    depth = 0
+    while True:
+        kind, _ = _next(events)
+        if kind in ("{", "["):
+            depth += 1
+        elif kind in ("}", "]"):
+            depth -= 1
+        if depth == 0:
+            return
@@ -1,33 +1,115 @@
 from __future__ import annotations
 
-import json
-from dataclasses import asdict
 from pathlib import Path
+from typing import Iterator, TextIO
 
 from releaser.hexagon.entities import artefact
 from releaser.hexagon.ports import JsonWriter
+from releaser.infra._manifest_index.builder import ManifestIndexBuilder
+from releaser.infra._manifest_index.format import sidecar_path
+
+from .events import iter_manifest_applications
+from .lazy import read_lazy_manifest
+from .streaming import ManifestJsonStream
 
 
 class JsonFileWriter(JsonWriter):
-    """A JSON writer that writes to a file."""
+    """A JSON writer that writes to a file.
+
+    Manifests written incrementally are streamed to the file, and the file
+    is removed when writing is aborted. Applications of manifests read from
+    the file are decoded when accessed, or can be streamed one at a time
+    with `read_applications`.
 
-    def __init__(self, filepath: Path) -> None:
+    When `index` is True, a binary index of the manifest is also written
+    next to the file (see `sidecar_path`), so that queries can be answered
+    without parsing the manifest. When `content_hashes` is True, the content
+    hashes of applications are recorded in the manifest.
+    """
+
+    def __init__(
+        self, filepath: Path, index: bool = False, content_hashes: bool = False
+    ) -> None:
         self.filepath = filepath
+        self.index = index
+        self.content_hashes = content_hashes
+        self._file: TextIO | None = None
+        self._stream: ManifestJsonStream | None = None
+        self._index_builder: ManifestIndexBuilder | None = None
 
     def write_manifest(self, manifest: artefact.Manifest) -> None:
-        if self.filepath.exists():
-            raise FileExistsError(
-                f"output filepath already exists: {self.filepath.as_posix()}"
-            )
-        self.filepath.write_text(
-            json.dumps(
-                asdict(manifest),
-                separators=(",", ":"),
-            )
-        )
+        self.begin_manifest(manifest.revision)
+        try:
+            for name, application in manifest.applications.items():
+                self.write_application(
+                    name, application, manifest.fingerprints.get(name)
+                )
+        except BaseException:
+            self.abort_manifest()
+            raise
+        self.end_manifest()
 
     def read_manifest(self) -> artefact.Manifest | None:
         if not self.filepath.exists():
             return None
-        content = self.filepath.read_text()
-        return artefact.Manifest(**json.loads(content))
+        return read_lazy_manifest(self.filepath.read_bytes())
+
+    def read_applications(
+        self,
+    ) -> Iterator[tuple[str, artefact.Application]] | None:
+        if not self.filepath.exists():
+            return None
+        return self._iter_applications()
+
+    def _iter_applications(self) -> Iterator[tuple[str, artefact.Application]]:
+        with self.filepath.open(encoding="utf-8") as stream:
+            yield from iter_manifest_applications(stream)
+
+    def begin_manifest(self, revision: str | None = None) -> None:
+        if self._stream is not None:
+            raise RuntimeError("a manifest is already being written")
+        try:
+            self._file = self.filepath.open("x")
+        except FileExistsError:
+            raise FileExistsError(
+                f"output filepath already exists: {self.filepath.as_posix()}"
+            ) from None
+        self._stream = ManifestJsonStream(self._file, self.content_hashes)
+        self._stream.begin(revision)
+        if self.index:
+            self._index_builder = ManifestIndexBuilder(revision)
+
+    def write_application(
+        self,
+        name: str,
+        application: artefact.Application,
+        fingerprint: str | None = None,
+    ) -> None:
+        if self._stream is None:
+            raise RuntimeError("begin_manifest must be called first")
+        self._stream.write_application(name, application, fingerprint)
+        if self._index_builder is not None:
+            self._index_builder.add_application(name, application)
+
+    def end_manifest(self) -> None:
+        if self._stream is None or self._file is None:
+            raise RuntimeError("begin_manifest must be called first")
+        self._stream.end()
+        index_builder = self._index_builder
+        self._close()
+        if index_builder is not None:
+            # Written once the manifest is complete, to record its size and mtime
+            index_builder.write(sidecar_path(self.filepath), self.filepath)
+
+    def abort_manifest(self) -> None:
+        if self._file is None:
+            return
+        self._close()
+        self.filepath.unlink(missing_ok=True)
+
+    def _close(self) -> None:
+        assert self._file is not None
+        self._file.close()
+        self._file = None
+        self._stream = None
+        self._index_builder = None
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Iterator, MutableMapping, Tuple, Union
+
+from releaser.hexagon.entities import artefact
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(rb"[^,:{}\[\]\s]+")
+_NESTED = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]', re.DOTALL)
+
+Span = Tuple[int, int]
+
+
+class LazyApplications(MutableMapping[str, artefact.Application]):
+    """The applications of a JSON manifest, decoded when accessed.
+
+    Each application is stored as the span of its JSON value within the
+    manifest until it is accessed for the first time. Iterating over names
+    does not decode applications.
+    """
+
+    def __init__(self, data: bytes, spans: dict[str, Span]) -> None:
+        self._data = data
+        self._entries: dict[str, Union[artefact.Application, Span]] = dict(spans)
+
+    def __getitem__(self, name: str) -> artefact.Application:
+        entry = self._entries[name]
+        if isinstance(entry, tuple):
+            start, end = entry
+            entry = artefact.Application.parse_dict(json.loads(self._data[start:end]))
+            self._entries[name] = entry
+        return entry
+
+    def __setitem__(self, name: str, application: artefact.Application) -> None:
+        self._entries[name] = application
+
+    def __delitem__(self, name: str) -> None:
+        del self._entries[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._entries)!r})"
+
+    @property
+    def decoded(self) -> list[str]:
+        """The names of the applications decoded so far."""
+        return [
+            name
+            for name, entry in self._entries.items()
+            if not isinstance(entry, tuple)
+        ]
+
+
+def read_lazy_manifest(data: bytes) -> artefact.Manifest:
+    """Read a JSON manifest, decoding applications only when accessed.
+
+    A single structural scan records the span of each application, while
+    the revision and the fingerprints are decoded immediately.
+    """
+    scanner = _Scanner(data)
+    spans: dict[str, Span] | None = None
+    fields: dict[str, object] = {}
+    for key, start in scanner.iter_object(scanner.skip_whitespace(0)):
+        if key == "applications":
+            spans = {}
+            for name, app_start in scanner.iter_object(start):
+                spans[name] = (app_start, scanner.skip_value(app_start))
+        else:
+            fields[key] = json.loads(data[start : scanner.skip_value(start)])
+    if scanner.skip_whitespace(scanner.position) != len(data):
+        raise scanner.error(scanner.position, "extra data")
+    if spans is None:
+        raise ValueError("Invalid manifest: missing applications")
+    manifest = artefact.Manifest.parse_dict({**fields, "applications": {}})
+    manifest.applications = LazyApplications(data, spans)
+    return manifest
+
+
+class _Scanner:
+    """Find the boundaries of JSON values without decoding them."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.position = 0
+
+    def skip_whitespace(self, position: int) -> int:
+        match = _WHITESPACE.match(self.data, position)
+        assert match is not None
+        return match.end()
+
+    def iter_object(self, position: int) -> Iterator[tuple[str, int]]:
+        """Iterate over the keys of an object, with the position of their values.
+
+        The value of each key must be skipped (or scanned) before the next
+        key is read, and `self.position` is set to the end of the object.
+        """
+        self._expect(position, b"{")
+        position = self.skip_whitespace(position + 1)
+        if self.data[position : position + 1] == b"}":
+            self.position = position + 1
+            return
+        while True:
+            match = _STRING.match(self.data, position)
+            if match is None:
+                raise self.error(position, "expected a key")
+            key = json.loads(match.group())
+            position = self.skip_whitespace(match.end())
+            self._expect(position, b":")
+            start = self.skip_whitespace(position + 1)
+            self.position = start
+            yield key, start
+            if self.position == start:
+                # The value was not scanned by the caller
+                self.skip_value(start)
+            position = self.skip_whitespace(self.position)
+            if self.data[position : position + 1] == b"}":
+                self.position = position + 1
+                return
+            self._expect(position, b",")
+            position = self.skip_whitespace(position + 1)
+
+    def skip_value(self, position: int) -> int:
+        """Find the end of the value starting at `position`, and move there."""
+        first = self.data[position : position + 1]
+        if first == b'"':
+            match = _STRING.match(self.data, position)
+            if match is None:
+                raise self.error(position, "unterminated string")
+            end = match.end()
+        elif first in (b"{", b"["):
+            depth = 0
+            for match in _NESTED.finditer(self.data, position):
+                token = match.group()
+                if token in (b"{", b"["):
+                    depth += 1
+                elif token in (b"}", b"]"):
+                    depth -= 1
+                    if depth == 0:
+                        end = match.end()
+                        break
+            else:
+                raise self.error(position, "unterminated value")
+        else:
+            match = _SCALAR.match(self.data, position)
+            if match is None:
+                raise self.error(position, "expected a value")
+            end = match.end()
+        self.position = end
+        return end
+
+    def _expect(self, position: int, token: bytes) -> None:
+        if self.data[position : position + 1] != token:
+            raise self.error(position, f"expected {token.decode()!r}")
+
+    def error(self, position: int, message: str) -> ValueError:
+        return ValueError(f"Invalid manifest at byte {position}: {message}")
@@ -1,21 +1,70 @@
 from __future__ import annotations
 
-import json
-from dataclasses import asdict
+import sys
 
 from releaser.hexagon.entities import artefact
 from releaser.hexagon.ports import JsonWriter
 
+from .streaming import ManifestJsonStream
+
 
 class JsonStdoutWriter(JsonWriter):
-    """A JSON writer that writes to the standard output."""
+    """A JSON writer that writes to the standard output.
+
+    Manifests written incrementally are streamed to the standard output,
+    each application being printed as soon as it is written. When
+    `content_hashes` is True, the content hashes of applications are
+    recorded in the manifest. Nothing is printed until the first application
+    is written, and an aborted manifest is closed with an `"aborted"` marker,
+    so that the standard output is never left with invalid JSON (readers
+    refuse such a manifest).
+    """
+
+    def __init__(self, content_hashes: bool = False) -> None:
+        self.content_hashes = content_hashes
+        self._stream: ManifestJsonStream | None = None
 
     def write_manifest(self, manifest: artefact.Manifest) -> None:
         """Write the given manifest to the standard output as JSON."""
 
-        print(json.dumps(asdict(manifest), separators=(",", ":")))
+        ManifestJsonStream(sys.stdout, self.content_hashes).write_manifest(manifest)
+        print()
 
     def read_manifest(self) -> artefact.Manifest | None:
         """Always raises NotImplementedError as reading from stdout is not supported."""
 
         raise NotImplementedError("JsonStdoutWriter does not support reading")
+
+    def begin_manifest(self, revision: str | None = None) -> None:
+        """Write the beginning of the manifest to the standard output."""
+
+        self._stream = ManifestJsonStream(sys.stdout, self.content_hashes)
+        self._stream.begin(revision)
+
+    def write_application(
+        self,
+        name: str,
+        application: artefact.Application,
+        fingerprint: str | None = None,
+    ) -> None:
+        """Write an application to the standard output."""
+
+        if self._stream is None:
+            raise RuntimeError("begin_manifest must be called first")
+        self._stream.write_application(name, application, fingerprint)
+
+    def end_manifest(self) -> None:
+        """Write the end of the manifest to the standard output."""
+
+        if self._stream is None:
+            raise RuntimeError("begin_manifest must be called first")
+        self._stream.end()
+        print()
+        self._stream = None
+
+    def abort_manifest(self) -> None:
+        """Stop writing the manifest, closing any output already printed."""
+
+        if self._stream is not None and self._stream.abort():
+            print()
+        self._stream = None
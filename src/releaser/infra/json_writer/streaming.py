@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+from typing import TextIO
+
+from releaser.hexagon.entities import artefact
+
+SEPARATORS = (",", ":")
+
+
+class ManifestJsonStream:
+    """Serialize a manifest to a text stream, one application at a time.
+
+    The output is the same as serializing the whole manifest at once with
+    compact separators, except that the revision and the fingerprints are
+    omitted when not recorded. When `content_hashes` is True, the content
+    hash of each application is recorded as well. Each application is written (and flushed) as
+    soon as it is given, so that memory usage does not grow with the manifest.
+
+    Nothing is written before the first application (or the end of the
+    manifest), so that a manifest aborted early leaves no output. A manifest
+    aborted after applications were written is closed with an `"aborted"`
+    marker, so that the output is always valid JSON, which manifest readers
+    refuse with `AbortedManifestError`.
+    """
+
+    def __init__(self, stream: TextIO, content_hashes: bool = False) -> None:
+        self.stream = stream
+        self.content_hashes = content_hashes
+        self._applications = 0
+        self._started = False
+        self._revision: str | None = None
+        self._fingerprints: dict[str, str] = {}
+        self._content_hashes: dict[str, str] = {}
+
+    def begin(self, revision: str | None = None) -> None:
+        """Write the beginning of the manifest."""
+        self._revision = revision
+        self._started = False
+
+    def write_application(
+        self,
+        name: str,
+        application: artefact.Application,
+        fingerprint: str | None = None,
+    ) -> None:
+        """Write an application and flush the stream."""
+        self._start()
+        separator = "," if self._applications else ""
+        self.stream.write(
+            f"{separator}{json.dumps(name)}:"
+            f"{json.dumps(application.to_dict(), separators=SEPARATORS)}"
+        )
+        self.stream.flush()
+        self._applications += 1
+        if fingerprint is not None:
+            self._fingerprints[name] = fingerprint
+        if self.content_hashes:
+            self._content_hashes[name] = application.content_hash
+
+    def end(self) -> None:
+        """Write the end of the manifest."""
+        self._start()
+        self.stream.write("}")
+        if self._revision is not None:
+            self.stream.write(f',"revision":{json.dumps(self._revision)}')
+        if self._fingerprints:
+            fingerprints = json.dumps(self._fingerprints, separators=SEPARATORS)
+            self.stream.write(f',"fingerprints":{fingerprints}')
+        if self._content_hashes:
+            content_hashes = json.dumps(self._content_hashes, separators=SEPARATORS)
+            self.stream.write(f',"content_hashes":{content_hashes}')
+        self.stream.write("}")
+        self.stream.flush()
+
+    def abort(self) -> bool:
+        """Close an unfinished manifest, returning whether anything was written."""
+        if not self._started:
+            return False
+        self.stream.write('},"aborted":true}')
+        self.stream.flush()
+        return True
+
+    def _start(self) -> None:
+        if not self._started:
+            self.stream.write('{"applications":{')
+            self._started = True
+
+    def write_manifest(self, manifest: artefact.Manifest) -> None:
+        """Write a whole manifest."""
+        self.begin(manifest.revision)
+        for name, application in manifest.applications.items():
+            self.write_application(name, application, manifest.fingerprints.get(name))
+        self.end()
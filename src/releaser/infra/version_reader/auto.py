@@ -4,34 +4,53 @@ from pathlib import Path
 
 from releaser.hexagon.ports import VersionReader
 
+from .cached import CachedVersionReader
 from .json_file import JsonFileVersionReader
 from .pyproject import PyprojectVersionReader
 
 
 class AutoVersionReader(VersionReader):
-    def __init__(self, project_root: Path) -> None:
+    """A version reader finding the version file within a project.
+
+    Version files are read through a CachedVersionReader by default, so
+    that a file is parsed once no matter how many version tags use it.
+    """
+
+    def __init__(self, project_root: Path, cache: bool = True) -> None:
         self.project_root = project_root
+        self.file_reader: VersionReader = (
+            CachedVersionReader(VersionFileReader()) if cache else VersionFileReader()
+        )
 
     def read(self, version_file: str | None) -> str | None:
+        version_path = self.find_version_file(version_file)
+        if version_path is None:
+            return None
+        return self.file_reader.read(version_path.as_posix())
+
+    def find_version_file(self, version_file: str | None) -> Path | None:
+        """Find the path of the version file to read."""
         if version_file:
             version_path = Path(version_file).expanduser()
             if version_path.is_file():
-                return self._read_version_file(version_path)
-            return self._read_version_file(self.project_root.joinpath(version_file))
+                return version_path
+            return self.project_root.joinpath(version_file)
         if self.project_root.joinpath("pyproject.toml").is_file():
-            return PyprojectVersionReader().read(
-                self.project_root.joinpath("pyproject.toml").as_posix()
-            )
+            return self.project_root.joinpath("pyproject.toml")
         if self.project_root.joinpath("package.json").is_file():
-            return JsonFileVersionReader().read(
-                self.project_root.joinpath("package.json").as_posix()
-            )
+            return self.project_root.joinpath("package.json")
         return None
 
-    def _read_version_file(self, version_file: Path) -> str | None:
-        if version_file.suffix == ".json":
-            return JsonFileVersionReader().read(version_file.as_posix())
-        if version_file.name == "pyproject.toml":
-            return PyprojectVersionReader().read(version_file.as_posix())
 
+class VersionFileReader(VersionReader):
+    """A version reader selecting how to read a version file from its name."""
+
+    def read(self, version_file: str | None) -> str | None:
+        if not version_file:
+            return None
+        version_path = Path(version_file)
+        if version_path.suffix == ".json":
+            return JsonFileVersionReader().read(version_path.as_posix())
+        if version_path.name == "pyproject.toml":
+            return PyprojectVersionReader().read(version_path.as_posix())
         return None
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from releaser.hexagon.ports import VersionReader
+
+_CacheKey = tuple[str, int, int, int]
+
+
+class CachedVersionReader(VersionReader):
+    """A version reader caching the versions read by another version reader.
+
+    Versions are cached by resolved path of the version file, and are
+    read again when the modification time, size or inode of the file
+    changes. At most `max_entries` versions are kept, least recently used
+    versions are evicted first. Reads without a version file, or with a
+    missing version file, are not cached.
+
+    Reads are serialized, so that the reader can be shared by several
+    threads and a file is read once even when requested concurrently.
+    """
+
+    def __init__(self, reader: VersionReader, max_entries: int = 128) -> None:
+        self.reader = reader
+        self.max_entries = max_entries
+        self._cache: OrderedDict[_CacheKey, str | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, version_file: str | None) -> str | None:
+        key = self._get_key(version_file) if version_file else None
+        if key is None:
+            return self.reader.read(version_file)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            version = self.reader.read(version_file)
+            self._cache[key] = version
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            return version
+
+    def clear(self) -> None:
+        """Drop all cached versions."""
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _get_key(version_file: str) -> _CacheKey | None:
+        path = Path(version_file).expanduser()
+        try:
+            resolved = path.resolve()
+            info = os.stat(resolved)
+        except OSError:
+            return None
+        return (resolved.as_posix(), info.st_mtime_ns, info.st_size, info.st_ino)
@@ -3,7 +3,6 @@ from __future__ import annotations
 import http
 import json
 import sys
-from dataclasses import asdict
 from http.client import HTTPConnection, HTTPSConnection
 from urllib.parse import urlparse
 
@@ -28,7 +27,7 @@ class HttpWebhookClient(WebhookClient):
             path_with_params = f"{parsed_url.path}?{parsed_url.query}"
         else:
             path_with_params = parsed_url.path
-        data = json.dumps(asdict(manifest), separators=(",", ":"))
+        data = json.dumps(manifest.to_dict(), separators=(",", ":"))
         if parsed_url.scheme == "http":
             connection = HTTPConnection(host=host, port=parsed_url.port)
         else:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 
 from .stubs import (
+    AsyncGitReaderStub,
     DependenciesForTests,
     GitReaderStub,
     ImageBakerStub,
@@ -59,5 +60,6 @@ def testing_dependencies(
         version_reader=version_reader,
         webhook_client=webhook_client,
         image_baker=image_baker,
+        async_git_reader=AsyncGitReaderStub(git_reader),
     )
     return testing_dependencies
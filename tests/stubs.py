@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from releaser.cli.context import Dependencies
-from releaser.infra.git_reader.stub import GitReaderStub
+from releaser.infra.git_reader.stub import AsyncGitReaderStub, GitReaderStub
 from releaser.infra.image_baker.stub import ImageBakerStub
 from releaser.infra.json_writer.stub import JsonWriterStub
 from releaser.infra.strategy_reader.stub import StrategyReaderStub
@@ -15,6 +15,7 @@ class DependenciesForTests(Dependencies):
     manifest_writer: JsonWriterStub
     strategy_reader: StrategyReaderStub
     version_reader: VersionReaderStub
+    async_git_reader: AsyncGitReaderStub
     webhook_client: WebhookClientStub
 
 
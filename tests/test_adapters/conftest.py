@@ -1,11 +1,45 @@
 from __future__ import annotations
 
+import subprocess
+from pathlib import Path
+
 import pytest
 import pytest_asyncio
 
 from .webhook import EmbeddedTestServer, Spy
 
 
+class GitRepository:
+    """A helper to create a git repository for tests."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def git(self, *args: str) -> str:
+        """Run a git command within the repository."""
+        return subprocess.check_output(
+            [
+                "git",
+                "-c",
+                "user.name=releaser",
+                "-c",
+                "user.email=releaser@example.com",
+                *args,
+            ],
+            cwd=self.root,
+        ).decode()
+
+    def commit(self, message: str, **files: str) -> str:
+        """Create a commit, writing given files first, and return its SHA."""
+        for name, content in files.items():
+            path = self.root.joinpath(name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            self.git("add", name)
+        self.git("commit", "--allow-empty", "-q", "-m", message)
+        return self.git("rev-parse", "HEAD").strip()
+
+
 @pytest.fixture
 def webhook_spy() -> Spy:
     return Spy()
@@ -15,3 +49,14 @@ def webhook_spy() -> Spy:
 async def test_webhook_server(webhook_spy: Spy):
     async with EmbeddedTestServer(webhook_spy) as server:
         yield server
+
+
+@pytest.fixture
+def git_repository(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> GitRepository:
+    root = tmp_path.joinpath("repository")
+    root.mkdir()
+    repository = GitRepository(root)
+    repository.git("init", "-q", "-b", "main")
+    monkeypatch.chdir(root)
+    monkeypatch.delenv("BUILD_BRANCH_NAME", raising=False)
+    return repository
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import threading
+import warnings
+from typing import Any
+
+import pytest
+
+from releaser.hexagon.errors import UnknownRevisionError
+from releaser.infra.git_reader.async_subprocess import AsyncGitSubprocessReader
+from releaser.infra.git_reader.dirty_check import DirtyCheck
+from releaser.infra.git_reader.native import GitNativeReader
+from releaser.infra.git_reader.stub import GitReaderStub
+from releaser.infra.git_reader.subprocess import GitSubprocessReader
+from releaser.infra.git_reader.threaded import ThreadedAsyncGitReader
+
+from .conftest import GitRepository
+
+
+class TestAsyncGitSubprocessReader:
+    @pytest.fixture(autouse=True)
+    def setup(
+        self, git_repository: GitRepository, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.repository = git_repository
+        self.base = self.repository.commit("first commit", **{"README.md": "hello"})
+        for idx in range(10):
+            self.repository.commit(
+                f"commit {idx}", **{f"apps/app_{idx % 3}/main.py": str(idx)}
+            )
+        self.expected = GitSubprocessReader()
+        self.commands: list[tuple[str, ...]] = []
+        self.processes: list[asyncio.subprocess.Process] = []
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        async def spy(*args: str, **kwargs: Any) -> asyncio.subprocess.Process:
+            self.commands.append(args)
+            process = await create_subprocess_exec(*args, **kwargs)
+            self.processes.append(process)
+            return process
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", spy)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("engine", ["diff-index", "status"])
+    async def test_it_should_read_same_facts_as_subprocess_reader(
+        self, engine: str
+    ) -> None:
+        reader = AsyncGitSubprocessReader(DirtyCheck(engine=engine))  # type: ignore
+        self.repository.root.joinpath("apps", "app_1", "main.py").write_text("new")
+        assert await reader.read_current_branch() == "main"
+        assert await reader.read_most_recent_commit_sha() == (
+            self.expected.read_most_recent_commit_sha()
+        )
+        assert await reader.is_dirty() is True
+        assert await reader.is_dirty(["apps/app_1"]) is True
+        assert await reader.is_dirty(["apps/app_2"]) is False
+        assert await reader.read_commit_message_history(
+            20
+        ) == self.expected.read_commit_message_history(20)
+        assert await reader.read_changed_files(
+            self.base
+        ) == self.expected.read_changed_files(self.base)
+        assert await reader.read_last_commit_message(20, "commit [0-5]") == "commit 5"
+        with pytest.raises(UnknownRevisionError):
+            await reader.read_changed_files("0" * 40)
+
+    @pytest.mark.asyncio
+    async def test_it_should_share_reads_between_concurrent_tasks(self) -> None:
+        reader = AsyncGitSubprocessReader(max_processes=2)
+        results = await asyncio.gather(
+            *(reader.read_current_branch() for _ in range(5)),
+            *(reader.read_last_commit_message(20, f"commit {idx}") for idx in range(5)),
+        )
+        assert results == ["main"] * 5 + [f"commit {idx}" for idx in range(5)]
+        assert self.commands.count(("git", "rev-parse", "--abbrev-ref", "HEAD")) == 1
+
+    @pytest.mark.asyncio
+    async def test_it_should_stop_git_when_closed_early(self) -> None:
+        reader = AsyncGitSubprocessReader()
+        history = reader.iter_commit_message_history(1000)
+        assert await history.__anext__() == "commit 9"
+        await history.aclose()
+        assert await reader.read_last_commit_message(1000, None) == "commit 9"
+
+    def test_it_should_reap_every_process(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        reader = AsyncGitSubprocessReader()
+
+        async def read_first_message() -> str:
+            history = reader.iter_commit_message_history(1000)
+            try:
+                return await history.__anext__()
+            finally:
+                await history.aclose()
+
+        async def main() -> None:
+            # git may exit before the generator is closed
+            for _ in range(50):
+                await read_first_message()
+            await asyncio.gather(
+                *(read_first_message() for _ in range(10)),
+                *(reader.read_last_commit_message(20, "commit") for _ in range(10)),
+                *(reader.read_commit_message_history(20) for _ in range(10)),
+            )
+            started = len(self.processes)
+            task = asyncio.ensure_future(reader._run(["sleep", "10"]))
+            while len(self.processes) == started:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        with warnings.catch_warnings(record=True) as recorded:
+            warnings.simplefilter("always")
+            asyncio.run(main(), debug=True)
+            gc.collect()
+        assert all(process.returncode is not None for process in self.processes)
+        assert [str(warning.message) for warning in recorded] == []
+        assert [
+            record.getMessage() for record in caplog.records if record.name == "asyncio"
+        ] == []
+
+    @pytest.mark.asyncio
+    async def test_threaded_reader_should_read_same_facts(self) -> None:
+        reader = ThreadedAsyncGitReader(GitNativeReader())
+        results = await asyncio.gather(
+            reader.read_current_branch(),
+            reader.read_most_recent_commit_sha(),
+            reader.is_dirty(),
+            reader.read_commit_message_history(20),
+            reader.read_changed_files(self.base),
+            reader.read_last_commit_message(20, "commit [0-5]"),
+        )
+        assert results == [
+            "main",
+            self.expected.read_most_recent_commit_sha(),
+            False,
+            self.expected.read_commit_message_history(20),
+            self.expected.read_changed_files(self.base),
+            "commit 5",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_threaded_reader_should_not_serialize_calls(self) -> None:
+        stub = GitReaderStub()
+        stub.set_branch("main")
+        barrier = threading.Barrier(2, timeout=5)
+        read_current_branch = stub.read_current_branch
+
+        def wait_for_other_call() -> str:
+            # Both calls must be running at once to cross the barrier
+            barrier.wait()
+            return read_current_branch()
+
+        stub.read_current_branch = wait_for_other_call  # type: ignore[method-assign]
+        reader = ThreadedAsyncGitReader(stub)
+        assert (
+            await asyncio.gather(
+                reader.read_current_branch(), reader.read_current_branch()
+            )
+            == [read_current_branch()] * 2
+        )
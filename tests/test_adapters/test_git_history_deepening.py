@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from releaser.infra.git_reader.async_subprocess import AsyncGitSubprocessReader
+from releaser.infra.git_reader.auto import create_git_reader
+from releaser.infra.git_reader.deepening import HistoryDeepening
+from releaser.infra.git_reader.snapshot import GitSnapshotReader
+from releaser.infra.git_reader.subprocess import GitSubprocessReader
+
+from .conftest import GitRepository
+
+
+class CountingDeepening(HistoryDeepening):
+    """A history deepening recording the fetched steps."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        object.__setattr__(self, "fetched", [])
+
+    def fetch_command(self, step: int) -> list[str]:
+        self.fetched.append(step)  # type: ignore[attr-defined]
+        return super().fetch_command(step)
+
+
+class TestHistoryDeepening:
+    @pytest.fixture(autouse=True)
+    def setup(
+        self,
+        git_repository: GitRepository,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        for idx in range(30):
+            git_repository.commit(f"commit {idx}")
+        remote = tmp_path.joinpath("remote.git")
+        git_repository.git("clone", "-q", "--bare", ".", remote.as_posix())
+        clone = GitRepository(tmp_path.joinpath("clone"))
+        git_repository.git(
+            "clone", "-q", "--depth=1", remote.as_uri(), clone.root.as_posix()
+        )
+        monkeypatch.chdir(clone.root)
+        self.clone = clone
+        self.deepening = CountingDeepening()
+
+    def count_commits(self) -> int:
+        return int(self.clone.git("rev-list", "--count", "HEAD"))
+
+    @pytest.mark.parametrize("reader_type", [GitSubprocessReader, GitSnapshotReader])
+    def test_it_should_deepen_history_as_deep_as_requested(
+        self, reader_type: type[GitSubprocessReader]
+    ) -> None:
+        reader = reader_type(deepening=self.deepening)
+        history = reader.read_commit_message_history(20)
+        assert history == [f"commit {idx}" for idx in range(29, 9, -1)]
+        assert self.count_commits() == 20
+        assert self.deepening.fetched == [4, 8, 7]  # type: ignore[attr-defined]
+
+    @pytest.mark.parametrize("reader_type", [GitSubprocessReader, GitSnapshotReader])
+    @pytest.mark.parametrize("filter", ["commit 23", "commit 2(?=3)"])
+    def test_it_should_stop_deepening_when_filter_matches(
+        self, reader_type: type[GitSubprocessReader], filter: str
+    ) -> None:
+        reader = reader_type(deepening=self.deepening)
+        assert reader.read_last_commit_message(20, "commit 2[3-9]") == "commit 29"
+        assert self.deepening.fetched == []  # type: ignore[attr-defined]
+        assert reader.read_last_commit_message(20, filter) == "commit 23"
+        assert self.deepening.fetched == [4, 8]  # type: ignore[attr-defined]
+        assert self.count_commits() == 13
+
+    def test_it_should_stop_deepening_when_history_is_complete(self) -> None:
+        reader = GitSubprocessReader(deepening=self.deepening)
+        assert reader.read_last_commit_message(100, "unknown") is None
+        assert len(reader.read_commit_message_history(100)) == 30
+        assert self.clone.git("rev-parse", "--is-shallow-repository").strip() == "false"
+
+    def test_it_should_keep_available_history_when_fetch_fails(self) -> None:
+        self.clone.git("remote", "remove", "origin")
+        reader = GitSubprocessReader(deepening=self.deepening)
+        assert reader.read_commit_message_history(20) == ["commit 29"]
+        assert reader.read_last_commit_message(20, "commit 23") is None
+
+    @pytest.mark.parametrize("reader_type", [GitSubprocessReader, GitSnapshotReader])
+    def test_it_should_keep_available_history_when_fetch_times_out(
+        self, reader_type: type[GitSubprocessReader]
+    ) -> None:
+        # The remote never answers in time
+        self.clone.git("config", "remote.origin.uploadpack", "sleep 5; git-upload-pack")
+        reader = reader_type(deepening=HistoryDeepening(timeout=0.2))
+        assert reader.read_commit_message_history(20) == ["commit 29"]
+        assert reader.deepening is None
+
+    @pytest.mark.asyncio
+    async def test_async_reader_should_keep_available_history_when_fetch_times_out(
+        self,
+    ) -> None:
+        self.clone.git("config", "remote.origin.uploadpack", "sleep 5; git-upload-pack")
+        reader = AsyncGitSubprocessReader(deepening=HistoryDeepening(timeout=0.2))
+        assert await reader.read_commit_message_history(20) == ["commit 29"]
+        assert reader.deepening is None
+
+    def test_it_should_fetch_without_prompting(self) -> None:
+        env = HistoryDeepening().fetch_env()
+        assert env["GIT_TERMINAL_PROMPT"] == "0"
+        assert "BatchMode=yes" in env["GIT_SSH_COMMAND"]
+
+    def test_it_should_not_deepen_by_default(self) -> None:
+        reader = GitSubprocessReader()
+        assert reader.read_commit_message_history(20) == ["commit 29"]
+        assert self.count_commits() == 1
+
+    @pytest.mark.asyncio
+    async def test_async_reader_should_share_deepening_between_tasks(self) -> None:
+        reader = AsyncGitSubprocessReader(deepening=self.deepening)
+        results = await asyncio.gather(
+            reader.read_last_commit_message(20, "commit 23"),
+            reader.read_last_commit_message(20, "commit 2(?=3)"),
+            reader.read_last_commit_message(20, "commit 29"),
+        )
+        assert results == ["commit 23", "commit 23", "commit 29"]
+        assert self.deepening.fetched == [4, 8]  # type: ignore[attr-defined]
+        assert self.count_commits() == 13
+
+
+def test_create_git_reader_should_not_deepen_by_default(tmp_path: Path) -> None:
+    reader = create_git_reader(tmp_path)
+    assert getattr(reader, "deepening", None) is None
+    reader = create_git_reader(tmp_path, deepen_history=True)
+    assert getattr(reader, "deepening", None) == HistoryDeepening()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from releaser.hexagon.errors import UnknownRevisionError
+from releaser.infra.git_reader.native import GitNativeReader
+from releaser.infra.git_reader.subprocess import GitSubprocessReader
+
+from .conftest import GitRepository
+
+
+class TestGitNativeReader:
+    @pytest.fixture(autouse=True)
+    def setup(self, git_repository: GitRepository) -> None:
+        self.repository = git_repository
+        self.reader = GitNativeReader()
+        self.expected = GitSubprocessReader()
+
+    def create_history(self, size: int = 5) -> None:
+        for idx in range(size):
+            self.repository.commit(
+                f"commit {idx}\n\nbody of commit {idx}",
+                **{
+                    "README.md": "\n".join(f"line {i}" for i in range(200 + idx)),
+                    f"src/module_{idx}.py": f"value = {idx}\n",
+                },
+            )
+
+    def assert_same_as_git(self) -> None:
+        assert self.reader.read_current_branch() == self.expected.read_current_branch()
+        assert (
+            self.reader.read_most_recent_commit_sha()
+            == self.expected.read_most_recent_commit_sha()
+        )
+        assert self.reader.read_commit_message_history(
+            20
+        ) == self.expected.read_commit_message_history(20)
+        assert self.reader.is_dirty() is self.expected.is_dirty()
+
+    def test_it_should_read_loose_objects(self) -> None:
+        self.create_history()
+        self.assert_same_as_git()
+
+    def test_it_should_read_packfiles_with_deltas(self) -> None:
+        self.create_history()
+        self.repository.git("gc", "-q", "--aggressive")
+        assert not list(self.repository.root.glob(".git/refs/heads/*"))
+        self.assert_same_as_git()
+
+    def test_it_should_be_shared_by_threads(self) -> None:
+        self.create_history(10)
+        self.repository.git("gc", "-q", "--aggressive")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            histories = list(
+                executor.map(self.reader.read_commit_message_history, [20] * 32)
+            )
+        assert histories == [self.expected.read_commit_message_history(20)] * 32
+
+    def test_it_should_read_merge_history(self) -> None:
+        self.create_history(2)
+        self.repository.git("checkout", "-q", "-b", "feature")
+        self.repository.commit("feature commit")
+        self.repository.git("checkout", "-q", "main")
+        self.repository.commit("main commit")
+        self.repository.git("merge", "-q", "--no-ff", "-m", "merge feature", "feature")
+        self.assert_same_as_git()
+
+    def test_it_should_read_detached_head(self) -> None:
+        self.create_history(3)
+        self.repository.git("checkout", "-q", "HEAD~1")
+        assert self.reader.read_current_branch() == "HEAD"
+        self.assert_same_as_git()
+
+    def test_it_should_detect_dirty_files(self) -> None:
+        self.create_history(2)
+        self.repository.root.joinpath("README.md").write_text("changed")
+        assert self.reader.is_dirty() is True
+
+    def test_it_should_detect_staged_files(self) -> None:
+        self.create_history(2)
+        self.repository.root.joinpath("new.txt").write_text("new")
+        self.repository.git("add", "new.txt")
+        assert self.reader.is_dirty() is True
+
+    def test_it_should_detect_deleted_files(self) -> None:
+        self.create_history(2)
+        self.repository.root.joinpath("README.md").unlink()
+        assert self.reader.is_dirty() is True
+
+    def test_it_should_ignore_untracked_files(self) -> None:
+        self.create_history(2)
+        self.repository.root.joinpath("untracked.txt").write_text("new")
+        assert self.reader.is_dirty() is False
+
+    def test_it_should_read_index_version_4(self) -> None:
+        self.create_history(2)
+        self.repository.git("update-index", "--index-version", "4")
+        assert self.reader.is_dirty() is False
+        self.repository.root.joinpath("src", "module_1.py").write_text("changed")
+        assert self.reader.is_dirty() is True
+
+    def test_it_should_work_from_subdirectory(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.create_history(2)
+        monkeypatch.chdir(self.repository.root.joinpath("src"))
+        self.assert_same_as_git()
+
+    @pytest.mark.parametrize("base", ["HEAD~2", "main~1", "v1", "HEAD^"])
+    def test_it_should_read_changed_files(self, base: str) -> None:
+        self.create_history(2)
+        self.repository.git("tag", "-a", "-m", "first release", "v1", "HEAD~1")
+        self.repository.commit(
+            "change files",
+            **{"src/module_0.py": "changed", "docs/index.md": "docs", "setup.py": ""},
+        )
+        self.repository.git("rm", "-q", "src/module_1.py")
+        self.repository.git("commit", "-q", "-m", "remove module")
+        self.repository.git("gc", "-q")
+        assert self.reader.read_changed_files(base) == self.expected.read_changed_files(
+            base
+        )
+
+    def test_it_should_read_changed_files_from_subdirectory(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.create_history(2)
+        base = self.repository.git("rev-parse", "HEAD").strip()
+        self.repository.commit("change files", **{"src/a/b.py": "", "setup.py": ""})
+        monkeypatch.chdir(self.repository.root.joinpath("src"))
+        assert self.reader.read_changed_files(base) == ["../setup.py", "a/b.py"]
+        assert self.expected.read_changed_files(base) == ["../setup.py", "a/b.py"]
+
+    def test_it_should_reject_unknown_revision(self) -> None:
+        self.create_history(1)
+        for reader in [self.reader, self.expected]:
+            with pytest.raises(UnknownRevisionError):
+                reader.read_changed_files("unknown")
+            with pytest.raises(UnknownRevisionError):
+                reader.read_changed_files("0" * 40)
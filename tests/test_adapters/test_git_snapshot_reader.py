@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from releaser.infra.git_reader.dirty_check import DirtyCheck
+from releaser.infra.git_reader.native import GitNativeReader
+from releaser.infra.git_reader.snapshot import GitSnapshotReader, GitStatusSnapshot
+from releaser.infra.git_reader.subprocess import GitSubprocessReader
+
+from .conftest import GitRepository
+
+
+class TestGitSnapshotReader:
+    @pytest.fixture(autouse=True)
+    def setup(self, git_repository: GitRepository) -> None:
+        self.repository = git_repository
+        self.reader = GitSnapshotReader(min_depth=2)
+
+    def test_it_should_read_repository_facts(self) -> None:
+        self.repository.commit("first commit", **{"README.md": "hello"})
+        sha = self.repository.commit("second commit")
+        assert self.reader.read_current_branch() == "main"
+        assert self.reader.read_most_recent_commit_sha() == sha
+        assert self.reader.is_dirty() is False
+        assert self.reader.read_commit_message_history(5) == [
+            "second commit",
+            "first commit",
+        ]
+
+    def test_it_should_detect_dirty_tracked_files(self) -> None:
+        self.repository.commit("first commit", **{"README.md": "hello"})
+        self.repository.root.joinpath("README.md").write_text("changed")
+        assert self.reader.is_dirty() is True
+
+    def test_it_should_ignore_untracked_files(self) -> None:
+        self.repository.commit("first commit", **{"README.md": "hello"})
+        self.repository.root.joinpath("untracked.txt").write_text("new")
+        assert self.reader.is_dirty() is False
+
+    @pytest.mark.parametrize(
+        "paths,expected",
+        [
+            (["backend"], True),
+            (["backend/src"], True),
+            (["frontend"], False),
+            (["back"], False),
+            (["frontend", "backend"], True),
+            (["."], True),
+        ],
+    )
+    def test_it_should_detect_dirty_files_within_paths(
+        self, paths: list[str], expected: bool
+    ) -> None:
+        self.repository.commit(
+            "first commit",
+            **{"backend/src/app.py": "app", "frontend/index.js": "index"},
+        )
+        self.repository.root.joinpath("backend/src/app.py").write_text("changed")
+        assert self.reader.is_dirty(paths) is expected
+        assert GitSubprocessReader().is_dirty(paths) is expected
+        assert GitNativeReader().is_dirty(paths) is expected
+
+    def test_it_should_detect_dirty_files_within_paths_from_subdirectory(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.repository.commit(
+            "first commit",
+            **{"backend/src/app.py": "app", "frontend/index.js": "index"},
+        )
+        self.repository.root.joinpath("backend/src/app.py").write_text("changed")
+        monkeypatch.chdir(self.repository.root.joinpath("backend"))
+        assert self.reader.is_dirty(["src"]) is True
+        assert self.reader.is_dirty(["../frontend"]) is False
+        assert GitNativeReader().is_dirty(["src"]) is True
+        assert GitNativeReader().is_dirty(["../frontend"]) is False
+
+    def test_it_should_read_status_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.repository.commit("first commit")
+        calls: list[list[str]] = []
+        check_output = subprocess.check_output
+
+        def spy(args: list[str], *a: object, **kw: object) -> bytes:
+            calls.append(args)
+            return check_output(args, *a, **kw)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(subprocess, "check_output", spy)
+        self.reader.read_current_branch()
+        self.reader.read_most_recent_commit_sha()
+        self.reader.is_dirty()
+        self.reader.read_commit_message_history(1)
+        self.reader.read_commit_message_history(2)
+        assert len(calls) == 2
+
+    def test_it_should_search_cached_history(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.repository.commit("chore(release): bump")
+        self.repository.commit("fix: typo")
+        assert self.reader.read_commit_message_history(2) == [
+            "fix: typo",
+            "chore(release): bump",
+        ]
+
+        def fail(*args: object, **kwargs: object) -> None:
+            raise AssertionError("git should not run")
+
+        monkeypatch.setattr(subprocess, "Popen", fail)
+        monkeypatch.setattr(subprocess, "check_output", fail)
+        assert (
+            self.reader.read_last_commit_message(2, "chore\\(release\\):")
+            == "chore(release): bump"
+        )
+        assert self.reader.read_last_commit_message(2, "feat:") is None
+
+    def test_it_should_read_status_once_from_several_threads(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.repository.commit("first commit")
+        calls: list[list[str]] = []
+        check_output = subprocess.check_output
+
+        def spy(args: list[str], *a: object, **kw: object) -> bytes:
+            calls.append(args)
+            return check_output(args, *a, **kw)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(subprocess, "check_output", spy)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            shas = list(
+                executor.map(
+                    lambda _: self.reader.read_most_recent_commit_sha(), range(16)
+                )
+            )
+            histories = list(
+                executor.map(self.reader.read_commit_message_history, [1, 2] * 8)
+            )
+        assert len(set(shas)) == 1
+        assert histories[:2] == [["first commit"], ["first commit"]]
+        assert len(calls) == 2
+
+
+def test_dirty_check_modes() -> None:
+    assert DirtyCheck.from_mode("diff-index") == DirtyCheck()
+    assert DirtyCheck.from_mode("status").git_options() == []
+    assert DirtyCheck.from_mode("fast").git_options() == ["-c", "core.fsmonitor=true"]
+    assert GitSnapshotReader().dirty_check == DirtyCheck()
+    with pytest.raises(ValueError):
+        DirtyCheck.from_mode("slow")
+
+
+@pytest.mark.parametrize(
+    "dirty_check", [DirtyCheck(), DirtyCheck(engine="status"), DirtyCheck.fast()]
+)
+def test_dirty_check_engines(
+    git_repository: GitRepository, dirty_check: DirtyCheck
+) -> None:
+    git_repository.commit("first commit", **{"README.md": "hello"})
+    assert dirty_check.is_dirty() is False
+    git_repository.root.joinpath("untracked.txt").write_text("new")
+    assert dirty_check.is_dirty() is False
+    git_repository.root.joinpath("README.md").write_text("changed")
+    assert dirty_check.is_dirty() is True
+    assert dirty_check.is_dirty(["README.md"]) is True
+    assert dirty_check.is_dirty(["untracked.txt"]) is False
+
+    def test_it_should_read_deeper_history_when_required(self) -> None:
+        for idx in range(4):
+            self.repository.commit(f"commit {idx}")
+        assert self.reader.read_commit_message_history(1) == ["commit 3"]
+        assert self.reader.read_commit_message_history(3) == [
+            "commit 3",
+            "commit 2",
+            "commit 1",
+        ]
+
+    def test_it_should_use_branch_from_environment(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self.repository.commit("first commit")
+        monkeypatch.setenv("BUILD_BRANCH_NAME", "next")
+        assert self.reader.read_current_branch() == "next"
+
+
+@pytest.mark.parametrize(
+    "output,expected",
+    [
+        (
+            "# branch.oid abc\0# branch.head main\0",
+            GitStatusSnapshot(branch="main", sha="abc", changed_paths=()),
+        ),
+        (
+            "# branch.oid abc\0# branch.head (detached)\0"
+            "1 .M N... 100644 100644 100644 a b dir/file name\0",
+            GitStatusSnapshot(
+                branch="HEAD", sha="abc", changed_paths=("dir/file name",)
+            ),
+        ),
+        (
+            "# branch.oid abc\0# branch.head main\0"
+            "2 R. N... 100644 100644 100644 a b R100 new\0old\0"
+            "u UU N... 100644 100644 100644 100644 a b c conflict\0",
+            GitStatusSnapshot(
+                branch="main", sha="abc", changed_paths=("new", "old", "conflict")
+            ),
+        ),
+        (
+            "# branch.oid (initial)\0# branch.head main\0",
+            GitStatusSnapshot(branch="main", sha=None, changed_paths=()),
+        ),
+    ],
+)
+def test_parse_porcelain_v2(output: str, expected: GitStatusSnapshot) -> None:
+    assert GitStatusSnapshot.parse_porcelain_v2(output) == expected
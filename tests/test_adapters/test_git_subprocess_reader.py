@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import re
+import subprocess
+
+import pytest
+
+from releaser.infra.git_reader.subprocess import GitSubprocessReader
+
+from .conftest import GitRepository
+
+
+class TestGitSubprocessReader:
+    @pytest.fixture(autouse=True)
+    def setup(self, git_repository: GitRepository) -> None:
+        self.repository = git_repository
+        self.reader = GitSubprocessReader()
+        for idx in range(5):
+            self.repository.commit(f"commit {idx}")
+
+    def test_it_should_stream_history(self) -> None:
+        assert list(self.reader.iter_commit_message_history(3)) == [
+            "commit 4",
+            "commit 3",
+            "commit 2",
+        ]
+
+    @pytest.mark.parametrize(
+        "filter,expected",
+        [(None, "commit 4"), ("commit 2", "commit 2"), ("commit 0", None)],
+    )
+    def test_it_should_read_last_commit_message(
+        self, filter: str | None, expected: str | None
+    ) -> None:
+        assert self.reader.read_last_commit_message(4, filter) == expected
+
+    def test_it_should_stop_git_when_closed_early(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        processes: list[subprocess.Popen[bytes]] = []
+        popen = subprocess.Popen
+
+        def spy(*args: object, **kwargs: object) -> subprocess.Popen[bytes]:
+            process = popen(*args, **kwargs)  # type: ignore[call-overload]
+            processes.append(process)
+            return process
+
+        monkeypatch.setattr(subprocess, "Popen", spy)
+        assert self.reader.read_last_commit_message(1000, None) == "commit 4"
+        assert self.reader.read_last_commit_message(1000, "commit") == "commit 4"
+        assert len(processes) == 3
+        for process in processes:
+            assert process.returncode is not None
+            assert process.stdout is not None and process.stdout.closed
+
+    def test_it_should_raise_when_git_fails(self) -> None:
+        self.repository.git("checkout", "-q", "--orphan", "empty")
+        with pytest.raises(subprocess.CalledProcessError):
+            list(self.reader.iter_commit_message_history(1))
+
+
+class TestGitSubprocessReaderWithFilter:
+    @pytest.fixture(autouse=True)
+    def setup(self, git_repository: GitRepository) -> None:
+        self.repository = git_repository
+        self.reader = GitSubprocessReader()
+        self.repository.commit("chore(release): bump to 1.0.0")
+        self.repository.commit("feat: add café support\n\nchore(release): in body")
+        self.repository.commit("  fix: résumé 42")
+        self.repository.commit("docs: update")
+
+    @pytest.mark.parametrize(
+        "depth,filter,expected",
+        [
+            (10, "chore\\(release\\):", "chore(release): bump to 1.0.0"),
+            (3, "chore\\(release\\):", None),
+            (10, "feat: add caf.", "feat: add café support"),
+            (10, "feat: add caf\\w+ support", "feat: add café support"),
+            (10, "fix: r[^a-z]sum[é] \\d+$", "fix: résumé 42"),
+            (10, "fix: .*?[0-9]{2}", "fix: résumé 42"),
+            (10, "(?:docs|fix):", "docs: update"),
+            (10, "fix", "fix: résumé 42"),
+            (10, "(?i)DOCS", "docs: update"),
+            (10, "\\bdocs\\b", "docs: update"),
+            (10, "missing", None),
+        ],
+    )
+    def test_it_should_match_like_python(
+        self, depth: int, filter: str, expected: str | None
+    ) -> None:
+        assert self.reader.read_last_commit_message(depth, filter) == expected
+        assert (
+            super(GitSubprocessReader, self.reader).read_last_commit_message(
+                depth, filter
+            )
+            == expected
+        )
+
+    @pytest.mark.parametrize(
+        "filter", ["chore\\(release\\): bump", "chore\\(release\\):.bump", "bump$"]
+    )
+    def test_it_should_match_wrapped_subjects(self, filter: str) -> None:
+        self.repository.commit("chore(release):\nbump\n\nbody")
+        expected = "chore(release): bump"
+        assert self.reader.read_last_commit_message(10, filter) == (
+            None if filter == "bump$" else expected
+        )
+
+    @pytest.mark.parametrize(
+        "filter,expected",
+        [
+            (re.compile("chore\\(release\\):"), "chore(release): bump to 1.0.0"),
+            (re.compile("DOCS", re.IGNORECASE), "docs: update"),
+            (re.compile("missing"), None),
+        ],
+    )
+    def test_it_should_accept_compiled_filters(
+        self, filter: re.Pattern[str], expected: str | None
+    ) -> None:
+        assert self.reader.read_last_commit_message(10, filter) == expected
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import AbortedManifestError
+from releaser.infra.json_writer.events import iter_manifest_applications
+from releaser.infra.json_writer.json_file import JsonFileWriter
+from releaser.infra.json_writer.lazy import LazyApplications, read_lazy_manifest
+from releaser.infra.json_writer.stdout import JsonStdoutWriter
+
+
+@pytest.fixture
+def manifest() -> artefact.Manifest:
+    return artefact.Manifest(
+        applications={
+            "front": artefact.Application(
+                images=[
+                    artefact.Image(
+                        repository="front",
+                        image="front:1.0.0",
+                        tag="1.0.0",
+                        platforms={
+                            "linux/amd64": artefact.PlatformImage(
+                                image="front:1.0.0-amd64", tag="1.0.0-amd64"
+                            )
+                        },
+                    )
+                ]
+            ),
+            "bäck": artefact.Application(
+                images=[artefact.Image(repository="back", image="back:2", tag="2")]
+            ),
+        }
+    )
+
+
+def expected_json(manifest: artefact.Manifest) -> str:
+    return json.dumps(manifest.to_dict(), separators=(",", ":"))
+
+
+class TestJsonFileWriter:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path) -> None:
+        self.filepath = tmp_path.joinpath("manifest.json")
+        self.writer = JsonFileWriter(self.filepath)
+
+    def test_it_should_write_manifest(self, manifest: artefact.Manifest) -> None:
+        self.writer.write_manifest(manifest)
+        assert self.filepath.read_text() == expected_json(manifest)
+
+    def test_it_should_write_revision_and_fingerprints(
+        self, manifest: artefact.Manifest
+    ) -> None:
+        manifest.revision = "1234567890"
+        manifest.fingerprints = {"front": "abc", "bäck": "def"}
+        self.writer.write_manifest(manifest)
+        assert self.filepath.read_text() == expected_json(manifest)
+        assert self.writer.read_manifest() == manifest
+
+    def test_it_should_stream_applications(self, manifest: artefact.Manifest) -> None:
+        self.writer.begin_manifest()
+        self.writer.write_application("front", manifest.applications["front"])
+        # The first application is available before the manifest is complete
+        assert self.filepath.read_text().startswith('{"applications":{"front":')
+        self.writer.write_application("bäck", manifest.applications["bäck"])
+        self.writer.end_manifest()
+        assert self.filepath.read_text() == expected_json(manifest)
+
+    def test_it_should_write_empty_manifest(self) -> None:
+        self.writer.begin_manifest()
+        self.writer.end_manifest()
+        assert json.loads(self.filepath.read_text()) == {"applications": {}}
+
+    def test_it_should_remove_file_when_aborted(
+        self, manifest: artefact.Manifest
+    ) -> None:
+        self.writer.begin_manifest()
+        self.writer.write_application("front", manifest.applications["front"])
+        self.writer.abort_manifest()
+        assert not self.filepath.exists()
+
+    def test_it_should_not_overwrite_existing_file(
+        self, manifest: artefact.Manifest
+    ) -> None:
+        self.filepath.write_text("{}")
+        with pytest.raises(FileExistsError, match="output filepath already exists"):
+            self.writer.write_manifest(manifest)
+        assert self.filepath.read_text() == "{}"
+
+    def test_it_should_decode_applications_when_accessed(
+        self, manifest: artefact.Manifest
+    ) -> None:
+        self.writer.write_manifest(manifest)
+        result = self.writer.read_manifest()
+        assert result is not None
+        applications = result.applications
+        assert isinstance(applications, LazyApplications)
+        assert list(applications) == ["front", "bäck"]
+        assert applications.decoded == []
+        assert result.get_apps(["bäck"]) == {"bäck": manifest.applications["bäck"]}
+        assert applications.decoded == ["bäck"]
+        assert result == manifest
+
+    def test_it_should_record_content_hashes(self, manifest: artefact.Manifest) -> None:
+        JsonFileWriter(self.filepath, content_hashes=True).write_manifest(manifest)
+        result = self.writer.read_manifest()
+        assert result is not None
+        assert result.content_hashes == {
+            name: application.content_hash
+            for name, application in manifest.applications.items()
+        }
+        assert result.content_hash == manifest.content_hash
+        # Recorded hashes are used without decoding applications
+        assert isinstance(result.applications, LazyApplications)
+        assert result.applications.decoded == []
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_lazy_manifest_should_read_any_json_layout(
+    manifest: artefact.Manifest, indent: int | None
+) -> None:
+    manifest.fingerprints = {"front": "abc"}
+    data = json.dumps(manifest.to_dict(), indent=indent, ensure_ascii=indent is None)
+    assert read_lazy_manifest(data.encode()) == manifest
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"[]",
+        b'{"revision":"abc"}',
+        b'{"applications":{"front":{"images":[]}}',
+        b'{"applications":{}} {}',
+    ],
+)
+def test_lazy_manifest_should_reject_invalid_json(data: bytes) -> None:
+    with pytest.raises(ValueError):
+        read_lazy_manifest(data)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_it_should_stream_applications_from_json(
+    manifest: artefact.Manifest, chunk_size: int, indent: int | None
+) -> None:
+    manifest.revision = "1234567890"
+    manifest.fingerprints = {"front": "abc", "bäck": "def"}
+    stream = io.StringIO(json.dumps(manifest.to_dict(), indent=indent))
+    assert list(iter_manifest_applications(stream, chunk_size)) == list(
+        manifest.applications.items()
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "[]",
+        '{"revision":"abc"}',
+        '{"applications":{"front":{"images":[]}}',
+        '{"applications":{"front":{"images":[tru]}}}',
+        '{"applications":{"front" {"images":[]}}}',
+        '{"applications":{}} {}',
+    ],
+)
+def test_it_should_reject_invalid_json_streams(data: str) -> None:
+    with pytest.raises(ValueError):
+        list(iter_manifest_applications(io.StringIO(data), 4))
+
+
+def test_stdout_writer_should_stream_applications(
+    manifest: artefact.Manifest, capsys: pytest.CaptureFixture[str]
+) -> None:
+    writer = JsonStdoutWriter()
+    writer.begin_manifest()
+    writer.write_application("front", manifest.applications["front"])
+    first = capsys.readouterr().out
+    assert first.startswith('{"applications":{"front":')
+    writer.write_application("bäck", manifest.applications["bäck"])
+    writer.end_manifest()
+    assert first + capsys.readouterr().out == expected_json(manifest) + "\n"
+    writer.write_manifest(manifest)
+    assert capsys.readouterr().out == expected_json(manifest) + "\n"
+
+
+def test_stdout_writer_should_print_nothing_when_aborted_early(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    writer = JsonStdoutWriter()
+    writer.begin_manifest("abc")
+    writer.abort_manifest()
+    assert capsys.readouterr().out == ""
+
+
+def test_stdout_writer_should_print_valid_json_when_aborted(
+    manifest: artefact.Manifest, capsys: pytest.CaptureFixture[str]
+) -> None:
+    writer = JsonStdoutWriter()
+    writer.begin_manifest()
+    writer.write_application("front", manifest.applications["front"])
+    writer.abort_manifest()
+    assert json.loads(capsys.readouterr().out) == {
+        "applications": {"front": manifest.applications["front"].to_dict()},
+        "aborted": True,
+    }
+
+
+def test_readers_should_refuse_aborted_manifest(
+    manifest: artefact.Manifest, capsys: pytest.CaptureFixture[str]
+) -> None:
+    writer = JsonStdoutWriter()
+    writer.begin_manifest()
+    writer.write_application("front", manifest.applications["front"])
+    writer.abort_manifest()
+    output = capsys.readouterr().out
+    with pytest.raises(AbortedManifestError):
+        artefact.Manifest.parse_dict(json.loads(output))
+    with pytest.raises(AbortedManifestError):
+        read_lazy_manifest(output.encode())
+    with pytest.raises(AbortedManifestError):
+        list(iter_manifest_applications(io.StringIO(output)))
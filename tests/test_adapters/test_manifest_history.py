@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+
+import pytest
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.services.manifest_analyzer import (
+    ApplicationQuery,
+    ImageQuery,
+    ManifestAnalyzer,
+    PlatformQuery,
+    RepositoryQuery,
+    RevisionQuery,
+    TagQuery,
+)
+from releaser.infra._manifest_index.history import ManifestHistoryStore
+from releaser.infra.json_writer.json_file import JsonFileWriter
+
+from ..test_hexagon.test_manifest_analyzer import PLATFORMS, random_manifest
+
+
+def random_history(seed: int) -> list[artefact.Manifest]:
+    manifests: list[artefact.Manifest] = []
+    for offset in range(3):
+        manifest = random_manifest(seed * 3 + offset)
+        manifest.revision = f"commit-{offset}"
+        manifests.append(manifest)
+    return manifests
+
+
+def merge_manifests(manifests: list[artefact.Manifest]) -> artefact.Manifest:
+    """Create a single manifest holding the images of all manifests."""
+    images: dict[str, list[artefact.Image]] = {}
+    for manifest in manifests:
+        for name, application in manifest.applications.items():
+            images.setdefault(name, []).extend(application.images)
+    return artefact.Manifest(
+        applications={
+            name: artefact.Application(images=app_images)
+            for name, app_images in images.items()
+        }
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_history_should_answer_queries_like_merged_manifest(seed: int) -> None:
+    manifests = random_history(seed)
+    store = ManifestHistoryStore()
+    for manifest in manifests:
+        store.add_manifest(manifest)
+    expected = ManifestAnalyzer(merge_manifests(manifests))
+    analyzer = ManifestAnalyzer.from_index(store)
+    assert len(store) == 3
+    applications = [None, ["app-0", "app-3", "app-5", "unknown"]]
+    repositories = [None, ["repo-1"], ["repo-0", "repo-2"], ["repo"]]
+    platforms = [None, ["linux/arm64"], PLATFORMS[::2]]
+    manifest_tags = [None, ["edge"], ["1.0.0", "1", ""]]
+    for app, repo, platform, tag in itertools.product(
+        applications, repositories, platforms, manifest_tags
+    ):
+        queries = [
+            ApplicationQuery(app, repo, platform, tag),
+            RepositoryQuery(app, tag, platform),
+            PlatformQuery(app, repo, tag),
+            PlatformQuery(app, repo, tag, where="tag~1* or image~*edge"),
+            *(
+                query_type(app, repo, platform, tag, no_platform)
+                for query_type in (ImageQuery, TagQuery)
+                for no_platform in [False, True]
+            ),
+        ]
+        for query in queries:
+            result = analyzer.execute(query)
+            if isinstance(query, ApplicationQuery):
+                assert result == expected.execute(query)
+            else:
+                assert sorted(result) == sorted(expected.execute(query))
+
+
+def test_history_should_list_revisions_of_matching_images() -> None:
+    manifests = random_history(0)
+    store = ManifestHistoryStore()
+    for manifest in manifests:
+        store.add_manifest(manifest)
+    store.add_manifest(artefact.Manifest(applications=manifests[0].applications))
+    analyzer = ManifestAnalyzer.from_index(store)
+    for repository in ["repo-0", "repo-1", "repo-2", "repo-3"]:
+        query = RevisionQuery(None, [repository], None, None)
+        assert analyzer.execute(query) == [
+            manifest.revision
+            for manifest in manifests
+            if manifest.get_images(repositories=[repository])
+        ]
+    assert analyzer.execute(RevisionQuery(["unknown"], None, None, None)) == []
+
+
+def test_history_should_skip_manifests_already_stored(tmp_path: Path) -> None:
+    manifests = random_history(2)
+    store = ManifestHistoryStore()
+    assert all(store.add_manifest(manifest) for manifest in manifests)
+    image_count = store.image_count
+    assert not store.add_manifest(manifests[0])
+    assert (len(store), store.image_count) == (len(manifests), image_count)
+    path = tmp_path.joinpath("history.bin")
+    store.save(path)
+    loaded = ManifestHistoryStore.load(path)
+    assert not any(loaded.add_manifest(manifest) for manifest in manifests)
+    assert loaded.columns == store.columns
+    # The same images at another revision are another manifest
+    assert loaded.add_manifest(
+        artefact.Manifest(applications=manifests[0].applications, revision="other")
+    )
+    assert len(loaded) == len(manifests) + 1
+
+
+def test_history_should_be_saved_and_loaded(tmp_path: Path) -> None:
+    store = ManifestHistoryStore()
+    for manifest in random_history(1):
+        store.add_manifest(manifest)
+    path = tmp_path.joinpath("history.bin")
+    store.save(path)
+    loaded = ManifestHistoryStore.load(path)
+    assert loaded.strings == store.strings
+    assert loaded.columns == store.columns
+    assert loaded.get_images(loaded.find_images()) == store.get_images(
+        store.find_images()
+    )
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_history_should_reject_invalid_files(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("history.bin")
+    path.write_bytes(b'{"format":"other"}\n')
+    with pytest.raises(ValueError):
+        ManifestHistoryStore.load(path)
+
+
+def test_history_should_add_manifest_files(tmp_path: Path) -> None:
+    paths: list[Path] = []
+    for index, manifest in enumerate(random_history(2)):
+        paths.append(tmp_path.joinpath(f"manifest-{index}.json"))
+        JsonFileWriter(paths[-1]).write_manifest(manifest)
+    store = ManifestHistoryStore()
+    assert store.add_manifest_files(paths) == 3
+    assert [store.strings[source] for source in store.columns["manifest_source"]] == [
+        path.as_posix() for path in paths
+    ]
+    with pytest.raises(FileNotFoundError):
+        store.add_manifest_files([tmp_path.joinpath("missing.json")])
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import itertools
+import os
+from pathlib import Path
+
+import pytest
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.services.manifest_analyzer import (
+    ApplicationQuery,
+    ImageQuery,
+    ManifestAnalyzer,
+    PlatformQuery,
+    RepositoryQuery,
+    TagQuery,
+)
+from releaser.infra._manifest_index.builder import ManifestIndexBuilder
+from releaser.infra._manifest_index.format import sidecar_path
+from releaser.infra._manifest_index.mapped import MappedManifestIndex
+from releaser.infra.json_writer.json_file import JsonFileWriter
+
+from ..test_hexagon.test_manifest_analyzer import PLATFORMS, random_manifest
+
+
+def build_index(manifest: artefact.Manifest) -> MappedManifestIndex:
+    builder = ManifestIndexBuilder()
+    for name, application in manifest.applications.items():
+        builder.add_application(name, application)
+    return MappedManifestIndex(builder.build())
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_mapped_index_should_answer_queries_like_manifest_index(seed: int) -> None:
+    manifest = random_manifest(seed)
+    index = build_index(manifest)
+    expected = ManifestAnalyzer(manifest)
+    analyzer = ManifestAnalyzer.from_index(index)
+    assert index.applications == list(manifest.applications)
+    assert index.get_images(index.find_images()) == manifest.get_images()
+    applications = [None, ["app-0", "app-3", "app-5", "unknown"]]
+    repositories = [None, ["repo-1"], ["repo-0", "repo-2"], ["repo"]]
+    platforms = [None, ["linux/arm64"], PLATFORMS[::2]]
+    manifest_tags = [None, ["edge"], ["1.0.0", "1", ""]]
+    for app, repo, platform, tag in itertools.product(
+        applications, repositories, platforms, manifest_tags
+    ):
+        queries = [
+            ApplicationQuery(app, repo, platform, tag),
+            RepositoryQuery(app, tag, platform),
+            PlatformQuery(app, repo, tag),
+            PlatformQuery(app, repo, tag, where="repo~repo-[12] or app!=app-1"),
+            *(
+                query_type(app, repo, platform, tag, no_platform)
+                for query_type in (ImageQuery, TagQuery)
+                for no_platform in [False, True]
+            ),
+        ]
+        for query in queries:
+            result = analyzer.execute(query)
+            if isinstance(query, ApplicationQuery):
+                assert result == expected.execute(query)
+            else:
+                assert sorted(result) == sorted(expected.execute(query))
+
+
+def test_mapped_index_should_reject_invalid_files() -> None:
+    with pytest.raises(ValueError):
+        MappedManifestIndex(bytes(256))
+
+
+class TestJsonFileWriterIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path) -> None:
+        self.filepath = tmp_path.joinpath("manifest.json")
+        self.manifest = random_manifest(0)
+        JsonFileWriter(self.filepath, index=True).write_manifest(self.manifest)
+
+    def test_it_should_write_index_next_to_manifest(self) -> None:
+        assert sidecar_path(self.filepath).name == "manifest.json.idx"
+        index = MappedManifestIndex.open_for(self.filepath)
+        assert index is not None
+        assert index.get_images(index.find_images()) == self.manifest.get_images()
+
+    def test_it_should_record_revision(self, tmp_path: Path) -> None:
+        filepath = tmp_path.joinpath("other.json")
+        self.manifest.revision = "abc123"
+        JsonFileWriter(filepath, index=True).write_manifest(self.manifest)
+        index = MappedManifestIndex.open_for(filepath)
+        assert index is not None
+        assert index.get_revisions(index.find_images()) == ["abc123"]
+        assert index.get_revisions(set()) == []
+
+    def test_it_should_ignore_stale_index(self) -> None:
+        self.filepath.write_text(self.filepath.read_text() + " ")
+        assert MappedManifestIndex.open_for(self.filepath) is None
+
+    def test_it_should_ignore_missing_index(self) -> None:
+        os.remove(sidecar_path(self.filepath))
+        assert MappedManifestIndex.open_for(self.filepath) is None
+
+    def test_it_should_not_write_index_by_default(self, tmp_path: Path) -> None:
+        filepath = tmp_path.joinpath("other.json")
+        JsonFileWriter(filepath).write_manifest(self.manifest)
+        assert not sidecar_path(filepath).exists()
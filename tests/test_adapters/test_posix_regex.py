@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from releaser.infra._git.regex import to_posix_ere
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("chore\\(release\\):", "chore\\(release\\):"),
+        ("feat|fix", "feat|fix"),
+        ("(?:feat|fix)!?:", "(feat|fix)!?:"),
+        ("v[0-9]+\\.[0-9]+", "v[0-9]+\\.[0-9]+"),
+        ("a{,3}b{2}c*?", "a{0,3}b{2}c*"),
+        ("release\\/", "release/"),
+        ("[]a-]", "[]a-]"),
+        ("a{b", "a\\{b"),
+    ],
+)
+def test_it_should_translate_pattern(pattern: str, expected: str) -> None:
+    assert to_posix_ere(pattern) == expected
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["(?i)fix", "(?=fix)", "\\bfix", "(a)\\1", "a*+", "[\\]]", "[[:alpha:]]", "\\n"],
+)
+def test_it_should_reject_unsupported_pattern(pattern: str) -> None:
+    assert to_posix_ere(pattern) is None
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("chore\\(release\\):", "chore\\(release\\):"),
+        ("(?:feat|fix)!?:$", "(feat|fix)!?:$"),
+        ("[a-z]+", "[a-z]+"),
+        ("chore: bump", None),
+        ("chore:\\ bump", None),
+        ("chore:.bump", None),
+        ("chore:\\sbump", None),
+        ("chore:[^a]bump", None),
+        ("chore:[ -~]bump", None),
+    ],
+)
+def test_it_should_reject_patterns_matching_spaces(
+    pattern: str, expected: str | None
+) -> None:
+    assert to_posix_ere(pattern, allow_spaces=False) == expected
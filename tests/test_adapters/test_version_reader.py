@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from releaser.hexagon.entities import strategy
+from releaser.infra.version_reader.auto import AutoVersionReader, VersionFileReader
+from releaser.infra.version_reader.cached import CachedVersionReader
+
+
+class CountingVersionReader(VersionFileReader):
+    """A version file reader recording the files read."""
+
+    def __init__(self) -> None:
+        self.files_read: list[str | None] = []
+
+    def read(self, version_file: str | None) -> str | None:
+        self.files_read.append(version_file)
+        return super().read(version_file)
+
+
+class TestCachedVersionReader:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path) -> None:
+        self.root = tmp_path
+        self.counter = CountingVersionReader()
+        self.reader = CachedVersionReader(self.counter, max_entries=2)
+
+    def write_package_json(self, name: str, version: str) -> str:
+        path = self.root.joinpath(name)
+        path.write_text(json.dumps({"version": version}))
+        return path.as_posix()
+
+    def test_it_should_read_file_once_for_all_version_tags(self) -> None:
+        self.root.joinpath("pyproject.toml").write_text(
+            '[tool.poetry]\nversion = "1.2.3"\n'
+        )
+        reader = AutoVersionReader(self.root)
+        reader.file_reader = CachedVersionReader(self.counter)
+        tags = [
+            strategy.VersionTag(),
+            strategy.VersionTag(minor=True),
+            strategy.VersionTag(major=True),
+        ]
+        assert [reader.read_version_tag(tag) for tag in tags] == ["1.2.3", "1.2", "1"]
+        assert len(self.counter.files_read) == 1
+
+    def test_it_should_read_file_again_when_modified(self) -> None:
+        path = self.write_package_json("package.json", "1.0.0")
+        assert self.reader.read(path) == "1.0.0"
+        assert self.reader.read(path) == "1.0.0"
+        self.write_package_json("package.json", "1.10.0")
+        assert self.reader.read(path) == "1.10.0"
+        assert len(self.counter.files_read) == 2
+
+    def test_it_should_share_entries_between_equivalent_paths(self) -> None:
+        path = self.write_package_json("package.json", "1.0.0")
+        self.root.joinpath("sub").mkdir()
+        assert self.reader.read(path) == "1.0.0"
+        assert (
+            self.reader.read(f"{self.root.as_posix()}/sub/../package.json") == "1.0.0"
+        )
+        assert len(self.counter.files_read) == 1
+
+    def test_it_should_evict_least_recently_used_entries(self) -> None:
+        paths = [
+            self.write_package_json(f"{idx}.json", f"{idx}.0.0") for idx in range(3)
+        ]
+        self.reader.read(paths[0])
+        self.reader.read(paths[1])
+        self.reader.read(paths[0])
+        self.reader.read(paths[2])
+        assert len(self.counter.files_read) == 3
+        # paths[1] was the least recently used entry
+        self.reader.read(paths[0])
+        assert len(self.counter.files_read) == 3
+        self.reader.read(paths[1])
+        assert len(self.counter.files_read) == 4
+
+    def test_it_should_not_cache_missing_files(self) -> None:
+        path = self.root.joinpath("package.json").as_posix()
+        assert self.reader.read(path) is None
+        self.write_package_json("package.json", "2.0.0")
+        assert self.reader.read(path) == "2.0.0"
+
+    def test_auto_version_reader_can_disable_cache(self) -> None:
+        self.write_package_json("package.json", "1.0.0")
+        reader = AutoVersionReader(self.root, cache=False)
+        assert not isinstance(reader.file_reader, CachedVersionReader)
+        assert reader.read(None) == "1.0.0"
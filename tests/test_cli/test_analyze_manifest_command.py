@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import json
+import shlex
+from pathlib import Path
+
+import pytest
+
+from releaser.cli.app import Application
+from releaser.hexagon.entities import artefact, strategy
+from releaser.infra._manifest_index.history import ManifestHistoryStore
+from releaser.infra.json_writer.json_file import JsonFileWriter
+
+from ..stubs import DependenciesForTests
+
+
+class TestAnalyzeManifestBatch:
+    @pytest.fixture(autouse=True)
+    def setup(
+        self,
+        testing_dependencies: DependenciesForTests,
+        capsys: pytest.CaptureFixture[str],
+    ):
+        self.deps = testing_dependencies
+        self.app = Application(testing_dependencies=self.deps)
+        self.capsys = capsys
+        image = artefact.Image(repository="front", image="front:edge", tag="edge")
+        image.platforms["linux/arm64"] = artefact.PlatformImage(
+            image="front:edge-arm64", tag="edge-arm64"
+        )
+        self.deps.manifest_writer.write_manifest(
+            artefact.Manifest(
+                applications={
+                    "front": artefact.Application(images=[image]),
+                    "back": artefact.Application(
+                        images=[
+                            artefact.Image(
+                                repository="back", image="back:edge", tag="edge"
+                            )
+                        ]
+                    ),
+                }
+            )
+        )
+
+    def run_batch(self, tmp_path: Path, *queries: str) -> tuple[int, list[object]]:
+        queries_file = tmp_path.joinpath("queries.jsonl")
+        queries_file.write_text("\n".join(queries) + "\n")
+        status = self.app.execute(
+            shlex.split(f"analyze-manifest -i manifest.json --batch {queries_file}")
+        )
+        lines = self.capsys.readouterr().out.splitlines()
+        return status, [json.loads(line) for line in lines]
+
+    def test_it_should_answer_each_query(self, tmp_path: Path):
+        status, outputs = self.run_batch(
+            tmp_path,
+            '{"query": "applications", "repository": ["back"]}',
+            "",
+            '{"id": 2, "query": "tags", "application": ["front"], "no_platform": true}',
+            '{"query": "platforms"}',
+        )
+        assert status == 0
+        assert outputs == [
+            {"result": ["back"]},
+            {"id": 2, "result": ["edge"]},
+            {"result": ["linux/arm64"]},
+        ]
+
+    def test_it_should_report_invalid_queries(self, tmp_path: Path):
+        status, outputs = self.run_batch(
+            tmp_path,
+            "not json",
+            '{"id": "a", "query": "unknown"}',
+            '{"query": "images", "platform": "linux/arm64"}',
+            '{"query": "images", "platform": ["linux/arm64"]}',
+        )
+        assert status == 1
+        assert [sorted(output) for output in outputs] == [
+            ["error"],
+            ["error", "id"],
+            ["error"],
+            ["result"],
+        ]
+        assert outputs[3] == {"result": ["front:edge-arm64"]}
+
+    def test_it_should_read_queries_from_stdin(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(
+            "sys.stdin", ['{"query": "repositories", "application": ["front"]}\n']
+        )
+        assert (
+            self.app.execute(shlex.split("analyze-manifest -i manifest.json --batch"))
+            == 0
+        )
+        assert self.capsys.readouterr().out == '{"result":["front"]}\n'
+
+    def test_it_should_filter_queries_with_expressions(self, tmp_path: Path):
+        status, outputs = self.run_batch(
+            tmp_path,
+            '{"query": "repositories", "where": "platform=linux/arm64 or app=back"}',
+            '{"query": "images", "where": "not repo~\\"f*\\""}',
+            '{"query": "tags", "where": "repo="}',
+        )
+        assert status == 1
+        assert sorted(outputs[0]["result"]) == ["back", "front"]
+        assert outputs[1] == {"result": ["back:edge"]}
+        assert "error" in outputs[2]
+
+    def test_it_should_list_images_matching_expression(self):
+        command = "analyze-manifest -i manifest.json --list-repositories --where 'tag=edge and not app=front'"
+        assert self.app.execute(shlex.split(command)) == 0
+        assert self.capsys.readouterr().out == '["back"]\n'
+
+    def test_it_should_reject_invalid_expressions(self):
+        command = (
+            "analyze-manifest -i manifest.json --list-images --where 'app=front and'"
+        )
+        with pytest.raises(SystemExit):
+            self.app.execute(shlex.split(command))
+
+    def test_it_should_require_query_with_expression(self):
+        command = "analyze-manifest -i manifest.json --where 'app=front'"
+        with pytest.raises(SystemExit):
+            self.app.execute(shlex.split(command))
+
+
+class TestAnalyzeManifestIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+        self.filepath = tmp_path.joinpath("manifest.json")
+        self.capsys = capsys
+        JsonFileWriter(self.filepath, index=True).write_manifest(
+            artefact.Manifest(
+                applications={
+                    "front": artefact.Application(
+                        images=[
+                            artefact.Image(
+                                repository="front", image="front:edge", tag="edge"
+                            )
+                        ]
+                    ),
+                    "back": artefact.Application(images=[]),
+                }
+            )
+        )
+
+    def test_it_should_answer_queries_using_index(self):
+        command = f"--debug analyze-manifest -i {self.filepath.as_posix()} --list-images --app front"
+        assert Application().execute(shlex.split(command)) == 0
+        output = self.capsys.readouterr().out.splitlines()
+        assert output[0].startswith("💡 Reading manifest index")
+        assert json.loads(output[1]) == ["front:edge"]
+
+    def test_it_should_read_manifest_when_index_is_stale(self):
+        self.filepath.write_text(self.filepath.read_text().replace("edge", "latest"))
+        command = f"--debug analyze-manifest -i {self.filepath.as_posix()} --list-images --app front"
+        assert Application().execute(shlex.split(command)) == 0
+        output = self.capsys.readouterr().out.splitlines()
+        assert output == ['["front:latest"]']
+
+    def test_it_should_stream_manifest(self):
+        command = f"analyze-manifest -i {self.filepath.as_posix()} --stream --list-images --app front back"
+        assert Application().execute(shlex.split(command)) == 0
+        assert self.capsys.readouterr().out == '["front:edge"]\n'
+
+    def abort_manifest(self) -> None:
+        text = self.filepath.read_text()
+        self.filepath.write_text(text[:-1] + ',"aborted":true}')
+
+    @pytest.mark.parametrize("options", ["", "--list-images", "--batch -"])
+    def test_it_should_refuse_aborted_manifest(self, options: str):
+        self.abort_manifest()
+        command = f"analyze-manifest -i {self.filepath.as_posix()} {options}"
+        with pytest.raises(SystemExit):
+            Application().execute(shlex.split(command))
+        assert "ERROR: Invalid manifest: its generation was aborted" in (
+            self.capsys.readouterr().err
+        )
+
+    def test_it_should_refuse_aborted_manifest_when_streaming(self):
+        self.abort_manifest()
+        command = (
+            f"analyze-manifest -i {self.filepath.as_posix()} --stream --list-images"
+        )
+        assert Application().execute(shlex.split(command)) == 1
+        assert "ERROR: Invalid manifest: its generation was aborted" in (
+            self.capsys.readouterr().err
+        )
+
+    def test_it_should_require_query_to_stream(self):
+        command = f"analyze-manifest -i {self.filepath.as_posix()} --stream"
+        with pytest.raises(SystemExit):
+            Application().execute(shlex.split(command))
+
+
+class TestAnalyzeManifestHistory:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+        self.root = tmp_path
+        self.store = tmp_path.joinpath("history.bin")
+        self.capsys = capsys
+        self.manifests = [
+            self.write_manifest("manifest-1.json", "commit-1", "1.0.0"),
+            self.write_manifest("manifest-2.json", "commit-2", "1.1.0"),
+        ]
+
+    def write_manifest(self, name: str, revision: str, tag: str) -> str:
+        path = self.root.joinpath(name)
+        JsonFileWriter(path).write_manifest(
+            artefact.Manifest(
+                applications={
+                    "front": artefact.Application(
+                        images=[
+                            artefact.Image(
+                                repository="front", image=f"front:{tag}", tag=tag
+                            ),
+                            artefact.Image(
+                                repository="front", image="front:edge", tag="edge"
+                            ),
+                        ]
+                    ),
+                },
+                revision=revision,
+            )
+        )
+        return path.as_posix()
+
+    def ingest(self, *manifests: str) -> None:
+        command = (
+            f"ingest-manifest --store {self.store.as_posix()} {' '.join(manifests)}"
+        )
+        assert Application().execute(shlex.split(command)) == 0
+
+    def test_it_should_list_revisions(self):
+        self.ingest(self.manifests[0])
+        self.ingest(self.manifests[1])
+        command = f"analyze-manifest --history {self.store.as_posix()} --list-revisions --where 'repo=front and tag=edge'"
+        assert Application().execute(shlex.split(command)) == 0
+        assert json.loads(self.capsys.readouterr().out) == ["commit-1", "commit-2"]
+        command = f"analyze-manifest --history {self.store.as_posix()} --list-revisions --where 'tag=1.1.0'"
+        assert Application().execute(shlex.split(command)) == 0
+        assert json.loads(self.capsys.readouterr().out) == ["commit-2"]
+
+    def test_it_should_list_revisions_of_created_manifests(
+        self, testing_dependencies: DependenciesForTests
+    ):
+        deps = testing_dependencies
+        deps.strategy_reader.set_strategy(
+            strategy.ReleaseStrategy.parse_dict(
+                {
+                    "applications": {"front": {"images": [{"repository": "front"}]}},
+                    "on": {
+                        "all": {
+                            "commit_msg": [{"match": "*", "tags": [{"value": "edge"}]}]
+                        }
+                    },
+                }
+            )
+        )
+        deps.git_reader.set_branch("next")
+        deps.git_reader.set_history(["feat: new"])
+        deps.git_reader.set_sha("commit-3")
+        assert Application(testing_dependencies=deps).execute(["create-manifest"]) == 0
+        manifest = deps.manifest_writer.read_manifest()
+        assert manifest is not None
+        created = self.root.joinpath("manifest-3.json")
+        JsonFileWriter(created).write_manifest(manifest)
+        self.ingest(self.manifests[0], created.as_posix())
+        command = f"analyze-manifest --history {self.store.as_posix()} --list-revisions --where 'tag=edge'"
+        assert Application().execute(shlex.split(command)) == 0
+        assert json.loads(self.capsys.readouterr().out) == ["commit-1", "commit-3"]
+
+    def test_it_should_list_revision_of_manifest_for_applications(self):
+        command = (
+            f"analyze-manifest -i {self.manifests[0]} --list-revisions --app front"
+        )
+        assert Application().execute(shlex.split(command)) == 0
+        assert json.loads(self.capsys.readouterr().out) == ["commit-1"]
+
+    def test_it_should_list_images_across_manifests(self):
+        self.ingest(*self.manifests)
+        command = f"analyze-manifest --history {self.store.as_posix()} --list-images"
+        assert Application().execute(shlex.split(command)) == 0
+        assert sorted(json.loads(self.capsys.readouterr().out)) == [
+            "front:1.0.0",
+            "front:1.1.0",
+            "front:edge",
+        ]
+
+    def test_it_should_skip_manifests_already_ingested(self):
+        self.ingest(*self.manifests)
+        self.capsys.readouterr()
+        self.ingest(self.manifests[1], self.manifests[0])
+        assert "WARNING: Skipped 2 manifests already stored" in (
+            self.capsys.readouterr().err
+        )
+        command = f"analyze-manifest --history {self.store.as_posix()} --list-revisions --where 'tag=edge'"
+        assert Application().execute(shlex.split(command)) == 0
+        assert json.loads(self.capsys.readouterr().out) == ["commit-1", "commit-2"]
+        assert len(ManifestHistoryStore.load(self.store)) == 2
+
+    def test_it_should_fail_when_manifest_is_missing(self):
+        command = f"ingest-manifest --store {self.store.as_posix()} {self.root.joinpath('missing.json').as_posix()}"
+        assert Application().execute(shlex.split(command)) == 1
+        assert not self.store.exists()
+
+    def test_it_should_fail_when_history_is_missing(self):
+        command = f"analyze-manifest --history {self.store.as_posix()} --list-revisions"
+        with pytest.raises(SystemExit):
+            Application().execute(shlex.split(command))
+
+    def test_it_should_require_query_with_history(self):
+        self.ingest(*self.manifests)
+        command = f"analyze-manifest --history {self.store.as_posix()}"
+        with pytest.raises(SystemExit):
+            Application().execute(shlex.split(command))
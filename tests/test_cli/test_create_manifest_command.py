@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import json
 import shlex
 from pathlib import Path
@@ -9,6 +10,7 @@ import toml
 
 from releaser.cli.app import Application
 from releaser.hexagon.entities import artefact, strategy
+from releaser.infra.json_writer.json_file import JsonFileWriter
 
 from ..stubs import DependenciesForTests
 
@@ -89,19 +91,167 @@ class CreateManifestCommandSetup:
 
 class TestCreateManifestCommand(CreateManifestCommandSetup):
 
+    def test_it_should_require_output_to_write_index(self):
+        with pytest.raises(SystemExit):
+            self.run_command("create-manifest --index")
+
+    @pytest.mark.parametrize("dirty,status", [(False, 0), (True, 1)])
+    def test_it_should_require_clean_files(self, dirty: bool, status: int):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        self.set_git_state(
+            branch="next", history=["feat: new"], sha="shatest", dirty=dirty
+        )
+        assert (
+            self.app.execute(
+                shlex.split("create-manifest --require-clean --dirty-check fast")
+            )
+            == status
+        )
+        assert self.deps.git_reader.dirty_paths
+
+    def test_it_should_reject_unknown_dirty_check(self):
+        with pytest.raises(SystemExit):
+            self.run_command("create-manifest --dirty-check slow")
+
+    @pytest.mark.parametrize("options", ["", "--concurrent"])
+    def test_it_should_reject_unknown_changed_since_revision(
+        self, options: str, capsys: pytest.CaptureFixture[str]
+    ):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        self.set_git_state(branch="next", history=["feat: new"], sha="shatest")
+        self.deps.git_reader.set_unknown_revision("nosuchref")
+        command = f"create-manifest --changed-since nosuchref {options}"
+        assert self.app.execute(shlex.split(command)) == 1
+        assert "ERROR: Unknown revision: nosuchref" in capsys.readouterr().err
+        assert self.deps.manifest_writer.read_manifest() is None
+
+    def test_bake_should_reject_unknown_changed_since_revision(
+        self, capsys: pytest.CaptureFixture[str]
+    ):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        self.set_git_state(branch="next", history=["feat: new"], sha="shatest")
+        self.deps.git_reader.set_unknown_revision("nosuchref")
+        with pytest.raises(SystemExit):
+            self.run_command("bake-manifest --changed-since nosuchref")
+        assert "ERROR: Unknown revision: nosuchref" in capsys.readouterr().err
+
+    def test_bake_should_refuse_aborted_manifest(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        filepath = tmp_path.joinpath("manifest.json")
+        filepath.write_text('{"applications":{"front":{"images":[]}},"aborted":true}')
+        app = Application(
+            testing_dependencies=dataclasses.replace(
+                self.deps, manifest_writer=JsonFileWriter(filepath)
+            )
+        )
+        with pytest.raises(SystemExit):
+            app.execute(["bake-manifest", "-i", filepath.as_posix()])
+        assert "ERROR: Invalid manifest: its generation was aborted" in (
+            capsys.readouterr().err
+        )
+        assert self.deps.image_baker.get_bake_calls() == []
+
     def test_it_should_create_an_empty_manifest(self):
         self.set_strategy(
             {"applications": {}},
         )
+        self.set_git_state(branch="next", history=[], sha="shatest")
         self.run_command(
             "create-manifest",
         )
         self.assert_manifest(
             {
                 "applications": {},
+                "revision": "shatest",
             }
         )
 
+    def test_it_should_reuse_applications_from_previous_manifest(self, tmp_path: Path):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        self.deps.version_reader.set_version("1.0.0")
+        release = ["chore(release): bumped to version 1.0.0 "]
+        self.set_git_state(branch="next", history=release, sha="shatest")
+        self.deps.git_reader.set_changed_files([])
+        previous = tmp_path.joinpath("previous.json")
+        self.run_command(f"create-manifest --previous {previous.as_posix()}")
+        generated = self.read_manifest()
+        assert generated.applications
+        assert generated.revision == "shatest"
+        assert set(generated.fingerprints) == set(generated.applications)
+        previous.write_text(json.dumps(generated.to_dict()))
+        self.deps.manifest_writer.reset()
+        self.run_command(f"create-manifest --previous {previous.as_posix()}")
+        assert self.read_manifest() == generated
+
+    def test_it_should_not_reuse_applications_when_history_changed(
+        self, tmp_path: Path
+    ):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        self.deps.version_reader.set_version("1.0.0")
+        release = ["chore(release): bumped to version 1.0.0 "]
+        self.set_git_state(branch="next", history=release, sha="shatest")
+        self.deps.git_reader.set_changed_files([])
+        previous = tmp_path.joinpath("previous.json")
+        self.run_command(f"create-manifest --previous {previous.as_posix()}")
+        previous.write_text(json.dumps(self.read_manifest().to_dict()))
+        self.deps.manifest_writer.reset()
+        self.set_git_state(
+            branch="next", history=["fix: other", *release], sha="newsha"
+        )
+        self.run_command(f"create-manifest --previous {previous.as_posix()}")
+        updated = self.read_manifest()
+        self.deps.manifest_writer.reset()
+        self.run_command("create-manifest")
+        assert updated.applications == self.read_manifest().applications
+        assert updated.revision == "newsha"
+        tags = {
+            image.tag
+            for application in updated.applications.values()
+            for image in application.images
+        }
+        assert tags == {"newsha", "next"}
+
+    def test_it_should_evaluate_applications_with_unknown_previous_revision(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ):
+        self.set_strategy(
+            self.read_releaser_config("quara-frontend.package.json"),
+        )
+        self.set_git_state(branch="next", history=["feat: new"], sha="shatest")
+        self.deps.git_reader.set_unknown_revision("rebased")
+        previous = tmp_path.joinpath("previous.json")
+        previous.write_text(json.dumps({"applications": {}, "revision": "rebased"}))
+        status = self.app.execute(
+            shlex.split(f"create-manifest --previous {previous.as_posix()}")
+        )
+        assert status == 0
+        assert "WARNING: Unknown revision: rebased" in capsys.readouterr().err
+        generated = self.read_manifest()
+        assert generated.applications
+        assert set(generated.fingerprints) == set(generated.applications)
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "create-manifest",
+            "create-manifest --concurrent",
+            "create-manifest --jobs 4",
+        ],
+    )
     @pytest.mark.parametrize(
         "strategy_file_name, branch, output_file_name",
         [
@@ -127,6 +277,7 @@ class TestCreateManifestCommand(CreateManifestCommandSetup):
         strategy_file_name: str,
         branch: str,
         output_file_name: str,
+        command: str,
     ):
         expected_output = self.read_test_file(
             "regression_test_data", "output", output_file_name
@@ -139,8 +290,6 @@ class TestCreateManifestCommand(CreateManifestCommandSetup):
             sha="shatest",
         )
         # Act
-        self.run_command(
-            "create-manifest",
-        )
-        # Assert
-        self.assert_manifest(json.loads(expected_output))
+        self.run_command(command)
+        # Assert: manifests also record the revision they were generated from
+        self.assert_manifest({**json.loads(expected_output), "revision": "shatest"})
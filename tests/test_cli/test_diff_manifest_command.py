@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import shlex
+from pathlib import Path
+
+import pytest
+
+from releaser.cli.app import Application
+from releaser.hexagon.entities import artefact
+from releaser.infra.json_writer.json_file import JsonFileWriter
+
+
+class TestDiffManifestCommand:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+        self.root = tmp_path
+        self.capsys = capsys
+
+    def write_manifest(self, name: str, tags: list[str]) -> Path:
+        path = self.root.joinpath(name)
+        JsonFileWriter(path, content_hashes=True).write_manifest(
+            artefact.Manifest(
+                applications={
+                    "front": artefact.Application(
+                        images=[
+                            artefact.Image(
+                                repository="front", image=f"front:{tag}", tag=tag
+                            )
+                            for tag in tags
+                        ]
+                    ),
+                    "back": artefact.Application(
+                        images=[
+                            artefact.Image(repository="back", image="back:1", tag="1")
+                        ]
+                    ),
+                }
+            )
+        )
+        return path
+
+    def run(self, command: str) -> tuple[int, dict[str, object]]:
+        status = Application().execute(shlex.split(command))
+        return status, json.loads(self.capsys.readouterr().out)
+
+    def test_it_should_print_changed_images(self):
+        previous = self.write_manifest("previous.json", ["edge", "1.0.0"])
+        current = self.write_manifest("current.json", ["edge", "1.1.0"])
+        status, output = self.run(f"diff-manifest {previous} {current}")
+        assert status == 0
+        assert output["added_images"] == [
+            {
+                "application": "front",
+                "repository": "front",
+                "tag": "1.1.0",
+                "image": "front:1.1.0",
+            }
+        ]
+        assert output["removed_images"] == [
+            {
+                "application": "front",
+                "repository": "front",
+                "tag": "1.0.0",
+                "image": "front:1.0.0",
+            }
+        ]
+        assert output["retagged_images"] == []
+
+    @pytest.mark.parametrize("tags, expected", [(["edge"], 0), (["1"], 1)])
+    def test_it_should_exit_with_status_1_when_images_changed(
+        self, tags: list[str], expected: int
+    ):
+        previous = self.write_manifest("previous.json", ["edge"])
+        current = self.write_manifest("current.json", tags)
+        status, _ = self.run(f"diff-manifest --exit-code {previous} {current}")
+        assert status == expected
+
+    def test_it_should_refuse_aborted_manifest(self):
+        previous = self.write_manifest("previous.json", ["edge"])
+        current = self.write_manifest("current.json", ["edge"])
+        text = current.read_text()
+        current.write_text(text[:-1] + ',"aborted":true}')
+        with pytest.raises(SystemExit):
+            Application().execute(
+                ["diff-manifest", previous.as_posix(), current.as_posix()]
+            )
+        assert "ERROR: Invalid manifest: its generation was aborted" in (
+            self.capsys.readouterr().err
+        )
+
+    def test_it_should_fail_when_manifest_is_missing(self):
+        previous = self.write_manifest("previous.json", ["edge"])
+        with pytest.raises(SystemExit):
+            Application().execute(
+                ["diff-manifest", previous.as_posix(), "missing.json"]
+            )
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import pytest
+
+from releaser.hexagon.entities import artefact
+
+
+def parse_image(tag: str) -> artefact.Image:
+    return artefact.Image.parse_dict(
+        {
+            "repository": "registry/front",
+            "image": f"registry/front:{tag}",
+            "tag": tag,
+            "platforms": {
+                "linux/arm64": {
+                    "image": f"registry/front:{tag}-arm64",
+                    "tag": f"{tag}-arm64",
+                }
+            },
+        }
+    )
+
+
+def test_entities_should_not_have_instance_dict() -> None:
+    image = parse_image("edge")
+    for entity in (image, image.platforms["linux/arm64"], artefact.Application([])):
+        with pytest.raises(AttributeError):
+            entity.__dict__
+
+
+def test_images_should_share_strings() -> None:
+    first, second = parse_image("".join(["ed", "ge"])), parse_image("edge")
+    assert first.repository is second.repository
+    assert first.tag is second.tag
+    assert list(first.platforms)[0] is list(second.platforms)[0]
+    assert first.platforms["linux/arm64"].tag is second.platforms["linux/arm64"].tag
+
+
+def test_images_should_derive_image_names() -> None:
+    image = parse_image("edge")
+    assert image.image == "registry/front:edge"
+    assert image.platforms["linux/arm64"].image == "registry/front:edge-arm64"
+    assert image == parse_image("edge")
+    assert image != parse_image("1.0.0")
+
+
+def test_images_should_keep_unusual_image_names() -> None:
+    image = artefact.Image(repository="front", image="registry/front:1", tag="1")
+    image.platforms["linux/amd64"] = artefact.PlatformImage(image="other", tag="1")
+    assert image.image == "registry/front:1"
+    assert image.platforms["linux/amd64"].image == "other"
+    assert artefact.Image.parse_dict(image.to_dict()) == image
+    image.image = "front:1"
+    assert image.to_dict()["image"] == "front:1"
+
+
+def test_application_should_convert_to_dict() -> None:
+    application = artefact.Application(images=[parse_image("edge")])
+    assert application.to_dict() == {
+        "images": [
+            {
+                "repository": "registry/front",
+                "image": "registry/front:edge",
+                "tag": "edge",
+                "platforms": {
+                    "linux/arm64": {
+                        "image": "registry/front:edge-arm64",
+                        "tag": "edge-arm64",
+                    }
+                },
+            }
+        ]
+    }
+    assert artefact.Application.parse_dict(application.to_dict()) == application
+
+
+class TestContentHash:
+    def test_it_should_hash_images_from_content(self) -> None:
+        image = parse_image("edge")
+        assert image.content_hash == parse_image("edge").content_hash
+        assert image.content_hash != parse_image("1.0.0").content_hash
+        image.platforms["linux/arm64"].tag = "other"
+        assert image.content_hash != parse_image("edge").content_hash
+
+    def test_it_should_hash_applications_from_images(self) -> None:
+        first = artefact.Application([parse_image("edge"), parse_image("1")])
+        second = artefact.Application([parse_image("edge"), parse_image("1")])
+        assert first == second
+        assert first.content_hash == second.content_hash
+        reordered = artefact.Application([parse_image("1"), parse_image("edge")])
+        assert first.content_hash != reordered.content_hash
+        longer = artefact.Application([parse_image("edge"), parse_image("1")] * 2)
+        assert first != longer
+        assert first.content_hash != longer.content_hash
+
+    def test_it_should_hash_applications_once(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        application = artefact.Application([parse_image("edge"), parse_image("1")])
+        expected = application.content_hash
+        hashed: list[artefact.Image] = []
+        image_hash = artefact.Image.content_hash
+
+        def spy(image: artefact.Image) -> str:
+            hashed.append(image)
+            return image_hash.fget(image)  # type: ignore[misc]
+
+        monkeypatch.setattr(artefact.Image, "content_hash", property(spy))
+        assert application.content_hash == expected
+        copy = artefact.Application(list(application.images))
+        assert copy.content_hash == expected
+        assert copy.content_hash == expected
+        assert application == copy
+        assert hashed == copy.images
+
+    def test_it_should_roll_up_hashes_into_manifest(self) -> None:
+        front = artefact.Application([parse_image("edge")])
+        back = artefact.Application([parse_image("1")])
+        manifest = artefact.Manifest(applications={"front": front, "back": back})
+        reordered = artefact.Manifest(applications={"back": back, "front": front})
+        assert manifest.content_hash == reordered.content_hash
+        renamed = artefact.Manifest(applications={"front": back, "back": front})
+        assert manifest.content_hash != renamed.content_hash
+
+    def test_it_should_use_recorded_hashes(self) -> None:
+        manifest = artefact.Manifest.parse_dict(
+            {
+                "applications": {"front": {"images": []}},
+                "content_hashes": {"front": "recorded"},
+            }
+        )
+        assert manifest.get_content_hash("front") == "recorded"
+        assert manifest.to_dict()["content_hashes"] == {"front": "recorded"}
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from releaser.hexagon.entities import strategy
+from releaser.hexagon.entities.strategy.matcher import literal_prefix
+from releaser.hexagon.errors import InvalidPatternError
+
+MESSAGES = [
+    "feat: add feature",
+    "feat(api): add endpoint",
+    "fix: bug",
+    "fix!: breaking bug",
+    "Fix: capitalized",
+    "chore(release): 1.0.0",
+    "docs: update",
+    "aaa",
+    "",
+]
+
+
+class TestCommitMsgMatcher:
+    @pytest.mark.parametrize(
+        "patterns",
+        [
+            ["*"],
+            ["feat"],
+            ["feat", "fix"],
+            ["feat\\(api\\)", "chore\\(release\\)"],
+            ["fe+at", "fix?!"],
+            ["feat|fix"],
+            ["(?i)fix", "docs"],
+            ["(a)\\1", "feat"],
+            ["(?P<type>feat)", "(?P<type>fix)"],
+            ["^docs", "\\w+: bug$"],
+            ["feat.*endpoint", "docs"],
+            ["f{2}", "x*"],
+            [],
+        ],
+    )
+    def test_it_should_match_like_python(self, patterns: list[str]) -> None:
+        matcher = strategy.CommitMsgMatcher(patterns)
+        for message in MESSAGES:
+            expected = "*" in patterns or any(
+                re.match(pattern, message) for pattern in patterns
+            )
+            assert matcher.matches(message) is bool(expected), message
+
+    @pytest.mark.parametrize(
+        "pattern,prefix,is_literal",
+        [
+            ("feat", "feat", True),
+            ("feat\\(api\\):", "feat(api):", True),
+            ("feat.*", "feat", False),
+            ("feat?", "fea", False),
+            ("fe+at", "fe", False),
+            ("feat{2}", "fea", False),
+            ("feat|fix", "", False),
+            ("\\w+", "", False),
+            ("(?i)feat", "", False),
+            ("^feat", "", False),
+        ],
+    )
+    def test_it_should_extract_literal_prefix(
+        self, pattern: str, prefix: str, is_literal: bool
+    ) -> None:
+        assert literal_prefix(pattern) == (prefix, is_literal)
+
+    def test_it_should_report_invalid_patterns_when_loading_strategy(self) -> None:
+        with pytest.raises(InvalidPatternError, match="Invalid regexp: feat\\("):
+            strategy.CommitMsgMatchPolicy.parse_dict(
+                {"match": ["fix", "feat("], "tags": []}
+            )
+        with pytest.raises(InvalidPatternError, match="Invalid regexp: \\[fix"):
+            strategy.CommitMsgMatchPolicy.parse_dict(
+                {"match": "*", "filter": "[fix", "tags": []}
+            )
+
+    def test_it_should_compile_patterns_once(self) -> None:
+        policy = strategy.CommitMsgMatchPolicy(match=["feat"], tags=[], filter="fix")
+        assert policy.matcher is policy.matcher
+        assert policy.filter_regexp is policy.filter_regexp
+        assert policy.filter_regexp is not None
+        assert policy.filter_regexp.pattern == "fix"
+        assert policy == strategy.CommitMsgMatchPolicy(
+            match=["feat"], tags=[], filter="fix"
+        )
+
+    def test_it_should_compile_patterns_again_when_modified(self) -> None:
+        policy = strategy.CommitMsgMatchPolicy(match=["feat"], tags=[])
+        assert policy.filter_regexp is None
+        policy.match = ["fix"]
+        policy.filter = "docs"
+        assert policy.matcher.matches("fix: bug")
+        assert not policy.matcher.matches("feat: feature")
+        assert policy.filter_regexp is not None
+        assert policy.filter_regexp.pattern == "docs"
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import InvalidQueryError
+from releaser.hexagon.services.manifest_analyzer import (
+    ApplicationQuery,
+    ImageQuery,
+    ManifestAnalyzer,
+    PlatformQuery,
+    RepositoryQuery,
+    RevisionQuery,
+    TagQuery,
+    parse_query,
+)
+
+PLATFORMS = ["linux/amd64", "linux/arm64", "linux/arm/v7"]
+TAGS = ["edge", "1.0.0", "1"]
+
+
+def create_image(
+    repository: str, tag: str, platforms: list[str] | None = None
+) -> artefact.Image:
+    image = artefact.Image(repository=repository, image=f"{repository}:{tag}", tag=tag)
+    for platform in platforms or []:
+        suffix = platform.replace("linux/", "").replace("/", "")
+        image.platforms[platform] = artefact.PlatformImage(
+            image=f"{repository}:{tag}-{suffix}", tag=f"{tag}-{suffix}"
+        )
+    return image
+
+
+@pytest.fixture
+def manifest() -> artefact.Manifest:
+    return artefact.Manifest(
+        applications={
+            "front": artefact.Application(
+                images=[
+                    create_image("registry/front", "edge", PLATFORMS[:2]),
+                    create_image("registry/front", "1.0.0", PLATFORMS[:2]),
+                ]
+            ),
+            "back": artefact.Application(
+                images=[
+                    create_image("registry/back", "edge"),
+                    create_image("registry/back-worker", "edge", PLATFORMS[1:]),
+                ]
+            ),
+            "empty": artefact.Application(images=[]),
+        }
+    )
+
+
+def random_manifest(seed: int) -> artefact.Manifest:
+    rng = random.Random(seed)
+    return artefact.Manifest(
+        applications={
+            f"app-{app}": artefact.Application(
+                images=[
+                    create_image(
+                        f"repo-{rng.randrange(4)}",
+                        rng.choice(TAGS),
+                        rng.sample(PLATFORMS, rng.randrange(len(PLATFORMS) + 1)),
+                    )
+                    for _ in range(rng.randrange(4))
+                ]
+            )
+            for app in range(8)
+        }
+    )
+
+
+def scan_applications(
+    manifest: artefact.Manifest, query: ApplicationQuery
+) -> list[str]:
+    """Answer an application query by scanning all images."""
+    return [
+        app_name
+        for app_name, app in manifest.get_apps(query.application).items()
+        if not query.repository
+        or app.contains_image_for_any_repository(*query.repository)
+        if not query.platform or app.contains_image_for_any_platform(*query.platform)
+        if not query.manifest_tag
+        or app.contains_image_for_any_manifest_tag(*query.manifest_tag)
+    ]
+
+
+def scan_images(manifest: artefact.Manifest, query: ImageQuery) -> set[str]:
+    """Answer an image query by scanning all images."""
+    images: set[str] = set()
+    for image in manifest.get_images(
+        query.application, query.repository, query.manifest_tag
+    ):
+        if not (query.platform or query.manifest_tag) or query.no_platform:
+            images.add(image.image)
+        else:
+            images.update(
+                img.image for img in image.get_platform_images(query.platform)
+            )
+    return images
+
+
+def scan_tags(manifest: artefact.Manifest, query: TagQuery) -> set[str]:
+    """Answer a tag query by scanning all images."""
+    tags: set[str] = set()
+    for image in manifest.get_images(
+        query.application, query.repository, query.manifest_tag
+    ):
+        if not (query.platform or query.manifest_tag) or query.no_platform:
+            tags.add(image.tag)
+        if not query.no_platform:
+            tags.update(image.get_platform_tags(query.platform))
+    return tags
+
+
+class TestManifestAnalyzer:
+    def test_it_should_query_applications(self, manifest: artefact.Manifest):
+        analyzer = ManifestAnalyzer(manifest)
+        assert analyzer.get_applications(ApplicationQuery(None, None, None, None)) == [
+            "front",
+            "back",
+            "empty",
+        ]
+        # Repositories match by substring
+        assert analyzer.get_applications(
+            ApplicationQuery(None, ["back"], None, None)
+        ) == ["back"]
+        # Each filter may match a different image
+        assert analyzer.get_applications(
+            ApplicationQuery(None, ["registry/back"], ["linux/arm/v7"], ["edge"])
+        ) == ["back"]
+        assert analyzer.get_applications(
+            ApplicationQuery(["front", "back"], None, None, ["1.0.0"])
+        ) == ["front"]
+
+    def test_it_should_query_repositories(self, manifest: artefact.Manifest):
+        analyzer = ManifestAnalyzer(manifest)
+        assert sorted(
+            analyzer.get_repositories(RepositoryQuery(["back"], None, None))
+        ) == ["registry/back", "registry/back-worker"]
+        assert sorted(
+            analyzer.get_repositories(RepositoryQuery(None, ["linux/arm/v7"], None))
+        ) == ["registry/back-worker"]
+
+    def test_it_should_query_images(self, manifest: artefact.Manifest):
+        analyzer = ManifestAnalyzer(manifest)
+        assert sorted(
+            analyzer.get_images(
+                ImageQuery(["front"], None, ["linux/arm64"], ["edge"], False)
+            )
+        ) == ["registry/front:edge-arm64"]
+        assert sorted(
+            analyzer.get_images(ImageQuery(["back"], None, None, None, False))
+        ) == ["registry/back-worker:edge", "registry/back:edge"]
+
+    def test_it_should_query_platforms(self, manifest: artefact.Manifest):
+        analyzer = ManifestAnalyzer(manifest)
+        assert sorted(
+            analyzer.execute(PlatformQuery(None, ["registry/back-worker"], None))
+        ) == ["linux/arm/v7", "linux/arm64"]
+
+    def test_it_should_query_revisions(self, manifest: artefact.Manifest):
+        manifest.revision = "abc123"
+        analyzer = ManifestAnalyzer(manifest)
+        assert analyzer.execute(RevisionQuery(["front"], None, None, None)) == [
+            "abc123"
+        ]
+        assert analyzer.execute(RevisionQuery(["unknown"], None, None, None)) == []
+
+    def test_it_should_rebuild_index_for_another_manifest(
+        self, manifest: artefact.Manifest
+    ):
+        analyzer = ManifestAnalyzer(manifest)
+        index = analyzer.index
+        assert analyzer.index is index
+        analyzer.manifest = artefact.Manifest(applications={})
+        assert analyzer.index is not index
+        assert analyzer.get_applications(ApplicationQuery(None, None, None, None)) == []
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_it_should_answer_like_a_full_scan(self, seed: int):
+        manifest = random_manifest(seed)
+        analyzer = ManifestAnalyzer(manifest)
+        applications = [None, ["app-0", "app-3", "app-5"]]
+        repositories = [None, ["repo-1"], ["repo-0", "repo-2"], ["repo"]]
+        platforms = [None, ["linux/arm64"], PLATFORMS[::2]]
+        manifest_tags = [None, ["edge"], ["1.0.0", "1"]]
+        for app, repo, platform, tag in itertools.product(
+            applications, repositories, platforms, manifest_tags
+        ):
+            query = ApplicationQuery(app, repo, platform, tag)
+            assert analyzer.get_applications(query) == scan_applications(
+                manifest, query
+            )
+            for no_platform in [False, True]:
+                image_query = ImageQuery(app, repo, platform, tag, no_platform)
+                assert set(analyzer.get_images(image_query)) == scan_images(
+                    manifest, image_query
+                )
+                tag_query = TagQuery(app, repo, platform, tag, no_platform)
+                assert set(analyzer.execute(tag_query)) == scan_tags(
+                    manifest, tag_query
+                )
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_it_should_answer_in_a_single_pass(self, seed: int):
+        manifest = random_manifest(seed)
+        analyzer = ManifestAnalyzer(manifest)
+        for app, repo, platform, tag in itertools.product(
+            [None, ["app-0", "app-3", "app-5"]],
+            [None, ["repo-1"], ["repo"]],
+            [None, ["linux/arm64"]],
+            [None, ["edge"]],
+        ):
+            queries = [
+                ApplicationQuery(app, repo, platform, tag),
+                RepositoryQuery(app, tag, platform),
+                PlatformQuery(app, repo, tag),
+                ImageQuery(app, repo, platform, tag, False),
+                TagQuery(app, repo, platform, tag, True),
+            ]
+            for query in queries:
+                result = ManifestAnalyzer.execute_streaming(
+                    query, iter(manifest.applications.items())
+                )
+                assert len(result) == len(set(result))
+                if isinstance(query, ApplicationQuery):
+                    assert result == analyzer.execute(query)
+                else:
+                    assert set(result) == set(analyzer.execute(query))
+
+
+def test_parse_query() -> None:
+    assert parse_query({"query": "tags", "application": ["front"]}) == TagQuery(
+        application=["front"],
+        repository=None,
+        platform=None,
+        manifest_tag=None,
+        no_platform=False,
+    )
+    assert parse_query({"query": "platforms"}) == PlatformQuery(None, None, None)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [],
+        {"application": ["front"]},
+        {"query": "unknown"},
+        {"query": "platforms", "platform": ["linux/amd64"]},
+        {"query": "images", "repository": "front"},
+        {"query": "images", "no_platform": "yes"},
+    ],
+)
+def test_parse_invalid_query(data: object) -> None:
+    with pytest.raises(InvalidQueryError):
+        parse_query(data)
+
+
+def test_queries_should_be_hashable() -> None:
+    query = ImageQuery(["front", "back"], ["registry/front"], None, None, False)
+    same = ImageQuery(("back", "front", "back"), {"registry/front"}, None, None, False)
+    assert query == same
+    assert hash(query) == hash(same)
+    assert query.application == frozenset({"front", "back"})
+    assert query != TagQuery(["front", "back"], ["registry/front"], None, None, False)
+    with pytest.raises(TypeError):
+        ImageQuery("front", None, None, None, False)
+
+
+class TestManifestAnalyzerCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, manifest: artefact.Manifest, monkeypatch: pytest.MonkeyPatch):
+        self.analyzer = ManifestAnalyzer(manifest, max_cached_results=2)
+        self.found: list[object] = []
+        find_images = self.analyzer._find_images
+
+        def spy(query: ImageQuery) -> list[str]:
+            self.found.append(query)
+            return find_images(query)
+
+        monkeypatch.setattr(self.analyzer, "_find_images", spy)
+
+    def query(self, application: str) -> ImageQuery:
+        return ImageQuery([application], None, None, None, False)
+
+    def test_it_should_cache_results(self):
+        results = list(
+            self.analyzer.execute_batch([self.query("front"), self.query("front")])
+        )
+        assert results[0] == results[1]
+        assert self.found == [self.query("front")]
+        # Cached results cannot be modified by callers
+        results[1].clear()
+        assert self.analyzer.get_images(self.query("front")) == results[0]
+
+    def test_it_should_evict_least_recently_used_results(self):
+        for application in ["front", "back", "front", "empty", "front", "back"]:
+            self.analyzer.get_images(self.query(application))
+        assert self.found == [
+            self.query("front"),
+            self.query("back"),
+            self.query("empty"),
+            self.query("back"),
+        ]
+
+    def test_it_should_drop_results_when_manifest_changes(self):
+        assert self.analyzer.get_images(self.query("front"))
+        self.analyzer.manifest = artefact.Manifest(applications={})
+        assert self.analyzer.get_images(self.query("front")) == []
+        self.analyzer.manifest.applications["front"] = artefact.Application(
+            images=[create_image("other", "edge")]
+        )
+        self.analyzer.invalidate()
+        assert self.analyzer.get_images(self.query("front")) == ["other:edge"]
+        assert len(self.found) == 3
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import pytest
+
+from releaser.hexagon.entities import artefact, strategy
+from releaser.hexagon.services.manifest_differ import (
+    ImageDiff,
+    ManifestDiffer,
+    PlatformImageDiff,
+)
+from releaser.hexagon.services.manifest_generator import ManifestGenerator
+
+from ..stubs import (
+    GitReaderStub,
+    JsonWriterStub,
+    StrategyReaderStub,
+    VersionReaderStub,
+)
+from .test_manifest_analyzer import create_image
+
+
+@pytest.fixture
+def previous() -> artefact.Manifest:
+    return artefact.Manifest(
+        applications={
+            "front": artefact.Application(
+                images=[
+                    create_image("registry/front", "edge", ["linux/amd64"]),
+                    create_image("registry/front", "1.0.0", ["linux/amd64"]),
+                ]
+            ),
+            "back": artefact.Application(images=[create_image("registry/back", "1")]),
+            "docs": artefact.Application(images=[create_image("registry/docs", "1")]),
+        }
+    )
+
+
+def test_it_should_find_no_change_between_identical_manifests(
+    previous: artefact.Manifest,
+) -> None:
+    current = artefact.Manifest.parse_dict(previous.to_dict())
+    diff = ManifestDiffer(previous, current).execute()
+    assert diff.is_empty()
+    assert diff.skipped_applications == 3
+
+
+def test_it_should_find_changed_images(previous: artefact.Manifest) -> None:
+    current = artefact.Manifest.parse_dict(previous.to_dict())
+    del current.applications["docs"]
+    current.applications["front"] = artefact.Application(
+        images=[
+            create_image("registry/front", "edge", ["linux/arm64"]),
+            create_image("registry/front", "1.1.0", ["linux/amd64"]),
+        ]
+    )
+    retagged = create_image("registry/back", "1")
+    retagged.image = "registry/back:1-alpine"
+    current.applications["back"] = artefact.Application(images=[retagged])
+    current.applications["worker"] = artefact.Application(
+        images=[create_image("registry/worker", "edge")]
+    )
+    diff = ManifestDiffer(previous, current).execute()
+    assert diff.added_images == [
+        ImageDiff("front", "registry/front", "1.1.0", "registry/front:1.1.0"),
+        ImageDiff("worker", "registry/worker", "edge", "registry/worker:edge"),
+    ]
+    assert diff.removed_images == [
+        ImageDiff("front", "registry/front", "1.0.0", "registry/front:1.0.0"),
+        ImageDiff("docs", "registry/docs", "1", "registry/docs:1"),
+    ]
+    assert diff.retagged_images == [
+        ImageDiff(
+            "back", "registry/back", "1", "registry/back:1-alpine", "registry/back:1"
+        )
+    ]
+    assert diff.added_platform_images == [
+        PlatformImageDiff(
+            "front",
+            "registry/front",
+            "edge",
+            "linux/arm64",
+            "registry/front:edge-arm64",
+        ),
+        PlatformImageDiff(
+            "front",
+            "registry/front",
+            "1.1.0",
+            "linux/amd64",
+            "registry/front:1.1.0-amd64",
+        ),
+    ]
+    assert [(item.tag, item.platform) for item in diff.removed_platform_images] == [
+        ("1.0.0", "linux/amd64"),
+        ("edge", "linux/amd64"),
+    ]
+    assert diff.retagged_platform_images == []
+    assert diff.skipped_applications == 0
+    assert diff.to_dict()["retagged_images"] == [
+        {
+            "application": "back",
+            "repository": "registry/back",
+            "tag": "1",
+            "image": "registry/back:1-alpine",
+            "previous_image": "registry/back:1",
+        }
+    ]
+
+
+def test_it_should_find_retagged_platform_images(previous: artefact.Manifest) -> None:
+    current = artefact.Manifest.parse_dict(previous.to_dict())
+    image = current.applications["front"].images[0]
+    image.platforms["linux/amd64"] = artefact.PlatformImage(
+        image="registry/front:edge-x86_64", tag="edge-x86_64"
+    )
+    current.applications["front"] = artefact.Application(
+        images=list(current.applications["front"].images)
+    )
+    diff = ManifestDiffer(previous, current).execute()
+    assert diff.retagged_platform_images == [
+        PlatformImageDiff(
+            "front",
+            "registry/front",
+            "edge",
+            "linux/amd64",
+            "registry/front:edge-x86_64",
+            "registry/front:edge-amd64",
+        )
+    ]
+    assert diff.added_images == diff.removed_images == diff.retagged_images == []
+    assert diff.skipped_applications == 2
+
+
+def test_it_should_not_decode_applications_with_recorded_hashes(
+    previous: artefact.Manifest,
+) -> None:
+    recorded = {
+        name: application.content_hash
+        for name, application in previous.applications.items()
+    }
+    current = artefact.Manifest(applications={}, content_hashes=recorded)
+    current.applications = _FailingApplications(previous.applications)
+    diff = ManifestDiffer(previous, current).execute()
+    assert diff.is_empty()
+
+
+class _FailingApplications(dict):  # type: ignore[type-arg]
+    """Applications which cannot be accessed, only listed."""
+
+    def __getitem__(self, name: str) -> artefact.Application:
+        raise AssertionError(f"application {name} was decoded")
+
+
+def generate_manifest(
+    sha: str, previous: artefact.Manifest | None = None
+) -> artefact.Manifest:
+    """Generate a manifest tagging images with `latest` and the SHA of HEAD."""
+    git_reader = GitReaderStub()
+    git_reader.set_sha(sha)
+    git_reader.set_branch("main")
+    git_reader.set_history(["feat: new feature"])
+    git_reader.set_changed_files(["front/main.py"])
+    strategy_reader = StrategyReaderStub()
+    strategy_reader.set_strategy(
+        strategy.ReleaseStrategy(
+            applications={
+                "front": strategy.Application(
+                    images=[
+                        strategy.Image(
+                            "registry/front", context="front", platforms=["linux/amd64"]
+                        )
+                    ],
+                    on=[
+                        strategy.Rule(
+                            commit_msg=[
+                                strategy.CommitMsgMatchPolicy(
+                                    match=["feat"],
+                                    tags=[
+                                        strategy.LiteralTag(value="latest"),
+                                        strategy.GitCommitShaTag(size=7),
+                                    ],
+                                )
+                            ]
+                        )
+                    ],
+                ),
+                "back": strategy.Application(
+                    images=[strategy.Image("registry/back", context="back")],
+                    on=[
+                        strategy.Rule(
+                            commit_msg=[
+                                strategy.CommitMsgMatchPolicy(
+                                    match=["*"],
+                                    tags=[strategy.LiteralTag(value="latest")],
+                                )
+                            ]
+                        )
+                    ],
+                ),
+            }
+        )
+    )
+    writer = JsonWriterStub()
+    ManifestGenerator(
+        git_reader=git_reader,
+        manifest_writer=writer,
+        strategy_reader=strategy_reader,
+        version_reader=VersionReaderStub(),
+        previous=previous,
+    ).execute()
+    manifest = writer.read_manifest()
+    assert manifest is not None
+    return manifest
+
+
+def test_it_should_find_tags_moved_between_revisions() -> None:
+    previous = generate_manifest("1111111111", artefact.Manifest(applications={}))
+    current = generate_manifest("2222222222", previous)
+    diff = ManifestDiffer(previous, current).execute()
+    assert diff.added_images == [
+        ImageDiff("front", "registry/front", "2222222", "registry/front:2222222")
+    ]
+    assert diff.removed_images == [
+        ImageDiff("front", "registry/front", "1111111", "registry/front:1111111")
+    ]
+    # back is reused from the previous manifest, so its tag did not move
+    assert diff.retagged_images == [
+        ImageDiff(
+            "front",
+            "registry/front",
+            "latest",
+            "registry/front:latest",
+            "registry/front:latest",
+            "1111111111",
+            "2222222222",
+        )
+    ]
+    assert diff.retagged_platform_images == [
+        PlatformImageDiff(
+            "front",
+            "registry/front",
+            "latest",
+            "linux/amd64",
+            "registry/front:latest-amd64",
+            "registry/front:latest-amd64",
+            "1111111111",
+            "2222222222",
+        )
+    ]
+    assert diff.skipped_applications == 1
+    assert ManifestDiffer(current, current).execute().is_empty()
+
+
+def test_it_should_find_tags_moved_with_same_images() -> None:
+    previous = generate_manifest("1111111111", artefact.Manifest(applications={}))
+    # back is evaluated again, its images being the same but its inputs not
+    previous.fingerprints["back"] = "outdated"
+    current = generate_manifest("2222222222", previous)
+    assert current.applications["back"] == previous.applications["back"]
+    diff = ManifestDiffer(previous, current).execute()
+    assert [
+        (image.application, image.tag, image.revision) for image in diff.retagged_images
+    ] == [("front", "latest", "2222222222"), ("back", "latest", "2222222222")]
@@ -3,9 +3,16 @@ from __future__ import annotations
 import pytest
 
 from releaser.hexagon.entities import artefact, strategy
+from releaser.hexagon.errors import DirtyWorkingTreeError
 from releaser.hexagon.services.manifest_generator import ManifestGenerator
 
-from ..stubs import GitReaderStub, JsonWriterStub, StrategyReaderStub, VersionReaderStub
+from ..stubs import (
+    AsyncGitReaderStub,
+    GitReaderStub,
+    JsonWriterStub,
+    StrategyReaderStub,
+    VersionReaderStub,
+)
 
 
 class ManifestGeneratorSetup:
@@ -21,6 +28,8 @@ class ManifestGeneratorSetup:
         self.json_writer = json_writer
         self.strategy_reader = strategy_reader
         self.version_reader = version_reader
+        # The revision of HEAD is recorded in every manifest
+        self.git_reader.set_sha("0123456789")
         self.service = ManifestGenerator(
             git_reader=git_reader,
             manifest_writer=json_writer,
@@ -155,7 +164,8 @@ class TestManifestGeneratorWithSingleApplication(ManifestGeneratorSetup):
         # Assert
         manifest = self.json_writer.read_manifest()
         assert manifest is not None
-        assert manifest == output
+        assert manifest.applications == output.applications
+        assert manifest.revision == "0123456789"
 
     @pytest.mark.parametrize(
         "last_commit", ["the first pattern is ...", "the second pattern is ..."]
@@ -708,3 +718,463 @@ class TestManifestGeneratorWithSingleApplicationInheritingStrategy(
                 ]
             )
         }
+
+
+class TestManifestGeneratorWithChangeDetection(ManifestGeneratorSetup):
+    @pytest.fixture(autouse=True)
+    def setup_strategy(self):
+        self.git_reader.set_is_dirty(False)
+        self.git_reader.set_history(["latest commit"])
+        self.service.changed_since = "origin/main"
+        on = [
+            strategy.Rule(
+                commit_msg=[
+                    strategy.CommitMsgMatchPolicy(
+                        match=["*"], tags=[strategy.LiteralTag(value="head")]
+                    )
+                ]
+            )
+        ]
+        self.strategy_reader.set_strategy(
+            strategy.ReleaseStrategy(
+                applications={
+                    "api": strategy.Application(
+                        on=on,
+                        images=[strategy.Image("api", context="apps/api")],
+                        paths=["libs/common"],
+                    ),
+                    "web": strategy.Application(
+                        on=on,
+                        images=[
+                            strategy.Image(
+                                "web", context="apps/web", dockerfile="../Dockerfile"
+                            )
+                        ],
+                    ),
+                    "root": strategy.Application(
+                        on=on, images=[strategy.Image("root")]
+                    ),
+                }
+            )
+        )
+
+    @pytest.mark.parametrize(
+        "changed_files,applications",
+        [
+            ([], []),
+            (["apps/api/main.py"], ["api", "root"]),
+            (["apps/api"], ["api", "root"]),
+            (["apps/apix/main.py"], ["root"]),
+            (["libs/common/utils.py"], ["api", "root"]),
+            (["apps/Dockerfile"], ["web", "root"]),
+            (["apps/web/index.html", "libs/common/utils.py"], ["api", "web", "root"]),
+        ],
+    )
+    def test_it_should_only_release_changed_applications(
+        self, changed_files: list[str], applications: list[str]
+    ):
+        # Arrange
+        self.git_reader.set_changed_files(changed_files)
+        # Act
+        self.service.execute()
+        # Assert
+        manifest = self.json_writer.read_manifest()
+        assert manifest is not None
+        assert list(manifest.applications) == applications
+
+    @pytest.mark.parametrize("dirty", [False, True])
+    def test_it_should_check_files_of_released_applications(self, dirty: bool):
+        # Arrange
+        self.git_reader.set_changed_files(["apps/web/index.html"])
+        self.git_reader.set_is_dirty(dirty)
+        self.service.require_clean = True
+        # Act
+        if dirty:
+            with pytest.raises(DirtyWorkingTreeError):
+                self.service.execute()
+        else:
+            self.service.execute()
+        # Assert
+        assert self.git_reader.dirty_paths == [
+            ".",
+            "Dockerfile",
+            "apps/Dockerfile",
+            "apps/web",
+        ]
+        assert (self.json_writer.read_manifest() is None) == dirty
+
+    @pytest.mark.asyncio
+    async def test_it_should_check_files_asynchronously(self):
+        # Arrange
+        self.git_reader.set_changed_files(["libs/common/utils.py"])
+        self.git_reader.set_is_dirty(True)
+        self.service.require_clean = True
+        self.service.async_git_reader = AsyncGitReaderStub(self.git_reader)
+        # Act
+        with pytest.raises(DirtyWorkingTreeError) as exc_info:
+            await self.service.execute_async()
+        # Assert
+        assert "apps/api" in exc_info.value.paths
+        assert "apps/web" not in exc_info.value.paths
+
+
+class TestManifestGeneratorAsync(ManifestGeneratorSetup):
+    @pytest.fixture(autouse=True)
+    def setup_async(self):
+        self.service.async_git_reader = AsyncGitReaderStub(self.git_reader)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("changed_since", [None, "origin/main"])
+    async def test_it_should_generate_same_manifest_as_sync_execution(
+        self, changed_since: str | None
+    ):
+        # Arrange
+        self.service.changed_since = changed_since
+        self.git_reader.set_is_dirty(False)
+        self.git_reader.set_sha("1234567890")
+        self.git_reader.set_branch("next")
+        self.git_reader.set_changed_files(["apps/web/index.html"])
+        self.git_reader.set_history(["feat: new feature", "fix: bug"])
+        self.strategy_reader.set_strategy(
+            strategy.ReleaseStrategy(
+                applications={
+                    name: strategy.Application(
+                        images=[
+                            strategy.Image(
+                                name,
+                                context=f"apps/{name}",
+                                platforms=["linux/amd64", "linux/arm64"],
+                            )
+                        ],
+                    )
+                    for name in ["api", "web", "worker"]
+                },
+                on=[
+                    strategy.Rule(
+                        branches=["next"],
+                        commit_msg=[
+                            strategy.CommitMsgMatchPolicy(
+                                match=["feat"],
+                                tags=[
+                                    strategy.LiteralTag(value="edge"),
+                                    strategy.GitCommitShaTag(size=7),
+                                ],
+                            ),
+                            strategy.CommitMsgMatchPolicy(
+                                match=["fix"],
+                                filter="fix",
+                                tags=[strategy.LiteralTag(value="fix")],
+                            ),
+                        ],
+                    ),
+                    strategy.Rule(
+                        branches=["main"],
+                        commit_msg=[
+                            strategy.CommitMsgMatchPolicy(
+                                match=["*"], tags=[strategy.LiteralTag(value="main")]
+                            )
+                        ],
+                    ),
+                ],
+            )
+        )
+        self.service.execute()
+        expected = self.json_writer.read_manifest()
+        self.json_writer.reset()
+        # Act
+        await self.service.execute_async()
+        # Assert
+        manifest = self.json_writer.read_manifest()
+        assert manifest is not None
+        assert manifest == expected
+        assert manifest.applications
+
+    @pytest.mark.asyncio
+    async def test_it_should_require_an_async_git_reader(self):
+        self.service.async_git_reader = None
+        with pytest.raises(ValueError):
+            await self.service.execute_async()
+
+
+class TestManifestGeneratorWithSharedRules(ManifestGeneratorSetup):
+    @pytest.fixture(autouse=True)
+    def setup_strategy(self, monkeypatch: pytest.MonkeyPatch):
+        self.git_reader.set_is_dirty(False)
+        self.git_reader.set_sha("1234567890")
+        self.git_reader.set_branch("next")
+        self.git_reader.set_history(["feat: new feature"])
+        self.version_reader.set_version("1.2.3")
+        self.service.async_git_reader = AsyncGitReaderStub(self.git_reader)
+        self.history_reads: list[int] = []
+        read_history = self.git_reader.read_commit_message_history
+
+        def spy(depth: int) -> list[str]:
+            self.history_reads.append(depth)
+            return read_history(depth)
+
+        monkeypatch.setattr(self.git_reader, "read_commit_message_history", spy)
+        applications = {
+            f"app-{idx}": strategy.Application(images=[strategy.Image(f"app-{idx}")])
+            for idx in range(5)
+        }
+        applications["custom"] = strategy.Application(
+            images=[strategy.Image("custom")],
+            on=[
+                strategy.Rule(
+                    commit_msg=[
+                        strategy.CommitMsgMatchPolicy(
+                            match=["*"], tags=[strategy.LiteralTag(value="custom")]
+                        )
+                    ]
+                )
+            ],
+        )
+        self.strategy_reader.set_strategy(
+            strategy.ReleaseStrategy(
+                applications=applications,
+                on=[
+                    strategy.Rule(
+                        branches=["next"],
+                        commit_msg=[
+                            strategy.CommitMsgMatchPolicy(
+                                match=["feat"],
+                                tags=[
+                                    strategy.VersionTag(),
+                                    strategy.GitCommitShaTag(size=7),
+                                ],
+                            ),
+                            strategy.CommitMsgMatchPolicy(
+                                match=["*"], tags=[strategy.LiteralTag(value="edge")]
+                            ),
+                        ],
+                    )
+                ],
+            )
+        )
+
+    def assert_rules_evaluated_once(self) -> None:
+        manifest = self.json_writer.read_manifest()
+        assert manifest is not None
+        assert list(manifest.applications) == [
+            *(f"app-{idx}" for idx in range(5)),
+            "custom",
+        ]
+        for idx in range(5):
+            assert [
+                image.tag for image in manifest.applications[f"app-{idx}"].images
+            ] == ["1.2.3", "1234567", "edge"]
+        assert [image.tag for image in manifest.applications["custom"].images] == [
+            "custom"
+        ]
+        # Two policies for the global rules and one policy for the custom rules
+        assert len(self.history_reads) == 3
+        assert len(self.version_reader._version_files_read) == 1
+
+    def test_it_should_evaluate_shared_rules_once(self):
+        self.service.execute()
+        self.assert_rules_evaluated_once()
+
+    def test_it_should_evaluate_shared_rules_once_with_jobs(self):
+        self.service.jobs = 4
+        self.service.execute()
+        self.assert_rules_evaluated_once()
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_it_should_not_write_manifest_when_generation_fails(self, jobs: int):
+        self.service.jobs = jobs
+        self.version_reader.version = None
+        with pytest.raises(ValueError, match="Version not found"):
+            self.service.execute()
+        assert self.json_writer.read_manifest() is None
+        # The writer can be used again once the manifest is aborted
+        self.version_reader.set_version("1.2.3")
+        self.service.execute()
+        manifest = self.json_writer.read_manifest()
+        assert manifest is not None
+        assert len(manifest.applications) == 6
+
+    @pytest.mark.asyncio
+    async def test_it_should_evaluate_shared_rules_once_asynchronously(self):
+        await self.service.execute_async()
+        self.assert_rules_evaluated_once()
+
+
+class TestManifestGeneratorWithPrevious(ManifestGeneratorSetup):
+    @pytest.fixture(autouse=True)
+    def setup_strategy(self, monkeypatch: pytest.MonkeyPatch):
+        self.git_reader.set_is_dirty(False)
+        self.git_reader.set_sha("1234567890")
+        self.git_reader.set_branch("next")
+        self.git_reader.set_history(["feat: new feature"])
+        self.git_reader.set_changed_files([])
+        self.version_reader.set_version("1.2.3")
+        self.service.async_git_reader = AsyncGitReaderStub(self.git_reader)
+        self.history_reads: list[int] = []
+        read_history = self.git_reader.read_commit_message_history
+
+        def spy(depth: int) -> list[str]:
+            self.history_reads.append(depth)
+            return read_history(depth)
+
+        monkeypatch.setattr(self.git_reader, "read_commit_message_history", spy)
+        # Version tags are only read when rules are evaluated
+        self.evaluations = 0
+        read_version_tag = self.version_reader.read_version_tag
+
+        def spy_version_tag(tag: strategy.VersionTag) -> str | None:
+            self.evaluations += 1
+            return read_version_tag(tag)
+
+        monkeypatch.setattr(self.version_reader, "read_version_tag", spy_version_tag)
+        self.strategy_reader.set_strategy(
+            strategy.ReleaseStrategy(
+                applications={
+                    name: strategy.Application(
+                        images=[strategy.Image(name, context=name)]
+                    )
+                    for name in ["front", "back"]
+                },
+                on=[
+                    strategy.Rule(
+                        commit_msg=[
+                            strategy.CommitMsgMatchPolicy(
+                                match=["feat"],
+                                tags=[
+                                    strategy.VersionTag(),
+                                    strategy.GitCommitShaTag(size=7),
+                                ],
+                            )
+                        ],
+                    )
+                ],
+            )
+        )
+
+    def generate(self, previous: artefact.Manifest) -> artefact.Manifest:
+        self.json_writer.reset()
+        self.history_reads.clear()
+        self.evaluations = 0
+        self.service.previous = previous
+        self.service.execute()
+        manifest = self.json_writer.read_manifest()
+        assert manifest is not None
+        return manifest
+
+    def get_tags(self, manifest: artefact.Manifest, name: str) -> list[str]:
+        return [image.tag for image in manifest.applications[name].images]
+
+    def test_it_should_record_fingerprints(self):
+        manifest = self.generate(artefact.Manifest(applications={}))
+        assert manifest.revision == "1234567890"
+        assert list(manifest.fingerprints) == ["front", "back"]
+        # Fingerprints do not depend on git history
+        assert manifest.fingerprints["front"] != manifest.fingerprints["back"]
+        assert self.generate(manifest).fingerprints == manifest.fingerprints
+
+    @pytest.mark.parametrize(
+        "history, sha",
+        [
+            (["feat: other feature"], "1234567890"),
+            (["feat: new feature"], "abcdefghij"),
+        ],
+    )
+    def test_fingerprints_should_depend_on_git_inputs(
+        self, history: list[str], sha: str
+    ):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.git_reader.set_history(history)
+        self.git_reader.set_sha(sha)
+        manifest = self.generate(previous)
+        assert manifest.fingerprints.keys() == previous.fingerprints.keys()
+        for name, fingerprint in manifest.fingerprints.items():
+            assert fingerprint != previous.fingerprints[name]
+
+    def test_it_should_evaluate_applications_with_changed_history(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.git_reader.set_history(["fix: something"])
+        manifest = self.generate(previous)
+        # The last commit no longer matches the policy
+        assert manifest.applications == {}
+
+    def test_it_should_not_record_fingerprints_by_default(self):
+        self.service.execute()
+        manifest = self.json_writer.read_manifest()
+        assert manifest is not None
+        assert manifest.revision == "1234567890"
+        assert manifest.fingerprints == {}
+
+    def test_it_should_reuse_unchanged_applications(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        # History is read once, both to fingerprint and to evaluate rules
+        assert len(self.history_reads) == 1
+        assert self.evaluations == 1
+        manifest = self.generate(previous)
+        assert len(self.history_reads) == 1
+        assert self.evaluations == 0
+        assert manifest == previous
+
+    def test_it_should_evaluate_applications_with_new_head(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.git_reader.set_sha("abcdefghij")
+        manifest = self.generate(previous)
+        assert manifest.revision == "abcdefghij"
+        assert self.get_tags(manifest, "front") == ["1.2.3", "abcdefg"]
+        assert self.get_tags(manifest, "back") == ["1.2.3", "abcdefg"]
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_it_should_evaluate_applications_with_changed_files(self, jobs: int):
+        self.service.jobs = jobs
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.git_reader.set_changed_files(["back/main.py"])
+        manifest = self.generate(previous)
+        assert self.evaluations == 1
+        assert manifest == previous
+
+    def test_it_should_evaluate_applications_with_changed_version(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.version_reader.set_version("1.3.0")
+        manifest = self.generate(previous)
+        assert manifest.fingerprints != previous.fingerprints
+        assert self.get_tags(manifest, "front") == ["1.3.0", "1234567"]
+
+    def test_it_should_evaluate_applications_without_previous_revision(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        previous.revision = None
+        self.generate(previous)
+        assert self.evaluations == 1
+
+    def test_it_should_evaluate_applications_with_unknown_previous_revision(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.git_reader.set_unknown_revision("1234567890")
+        with pytest.warns(UserWarning, match="Unknown revision: 1234567890"):
+            manifest = self.generate(previous)
+        assert self.evaluations == 1
+        assert manifest == previous
+
+    @pytest.mark.asyncio
+    async def test_it_should_evaluate_applications_with_unknown_previous_revision_asynchronously(
+        self,
+    ):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.json_writer.reset()
+        self.history_reads.clear()
+        self.evaluations = 0
+        self.git_reader.set_unknown_revision("1234567890")
+        self.service.previous = previous
+        with pytest.warns(UserWarning, match="Unknown revision: 1234567890"):
+            await self.service.execute_async()
+        assert self.json_writer.read_manifest() == previous
+        assert self.evaluations == 1
+
+    @pytest.mark.asyncio
+    async def test_it_should_reuse_unchanged_applications_asynchronously(self):
+        previous = self.generate(artefact.Manifest(applications={}))
+        self.json_writer.reset()
+        self.history_reads.clear()
+        self.evaluations = 0
+        self.git_reader.set_changed_files(["front/main.py"])
+        self.service.previous = previous
+        await self.service.execute_async()
+        manifest = self.json_writer.read_manifest()
+        assert manifest == previous
+        assert self.evaluations == 1
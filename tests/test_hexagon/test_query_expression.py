@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+
+import pytest
+
+from releaser.hexagon.entities import artefact
+from releaser.hexagon.errors import InvalidQueryError
+from releaser.hexagon.services.query_expression import (
+    And,
+    Comparison,
+    Not,
+    Or,
+    parse_expression,
+)
+
+from .test_manifest_analyzer import random_manifest
+
+
+def test_it_should_parse_expressions_with_precedence() -> None:
+    assert parse_expression(
+        'repo~"registry/*" and platform=linux/arm64 or not app = docs'
+    ) == Or(
+        (
+            And(
+                (
+                    Comparison("repository", "~", "registry/*"),
+                    Comparison("platform", "=", "linux/arm64"),
+                )
+            ),
+            Not(Comparison("application", "=", "docs")),
+        )
+    )
+
+
+def test_it_should_parse_parentheses_and_quoted_values() -> None:
+    assert parse_expression('NOT (tag="and" OR image!~"a b*")') == Not(
+        Or((Comparison("tag", "=", "and"), Comparison("image", "!~", "a b*")))
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "app",
+        "app=",
+        "app=front and",
+        "(app=front",
+        "app=front)",
+        "name=front",
+        "app==front",
+        'app="front',
+        "app=front tag=edge",
+    ],
+)
+def test_it_should_reject_invalid_expressions(text: str) -> None:
+    with pytest.raises(InvalidQueryError):
+        parse_expression(text)
+
+
+EXPRESSIONS = [
+    "app=app-1",
+    "app~app-[0-3] and not platform=linux/arm64",
+    "repo=repo-1 or repo=repo-2",
+    "repo!~*-0 and (tag=edge or tag=1)",
+    "platform=linux/amd64 and platform!=linux/arm/v7",
+    'image~"*:1*"',
+    "not (app=app-2 or app=unknown)",
+]
+
+
+def matches(text: str, app_name: str, image: artefact.Image) -> bool:
+    """Evaluate an expression for a single image, without using an index."""
+
+    def evaluate(expression: object) -> bool:
+        if isinstance(expression, And):
+            return all(evaluate(item) for item in expression.expressions)
+        if isinstance(expression, Or):
+            return any(evaluate(item) for item in expression.expressions)
+        if isinstance(expression, Not):
+            return not evaluate(expression.expression)
+        assert isinstance(expression, Comparison)
+        if expression.field == "application":
+            values = [app_name]
+        elif expression.field == "platform":
+            values = list(image.platforms)
+        else:
+            values = [getattr(image, expression.field)]
+        if expression.operator.endswith("~"):
+            found = any(fnmatchcase(value, expression.value) for value in values)
+        else:
+            found = expression.value in values
+        return not found if expression.operator.startswith("!") else found
+
+    return evaluate(parse_expression(text))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_it_should_select_images_like_a_full_scan(seed: int, text: str) -> None:
+    manifest = random_manifest(seed)
+    index = artefact.ManifestIndex(manifest)
+    expected = {
+        image_id
+        for image_id, image in enumerate(index.images)
+        if matches(text, index.image_applications[image_id], image)
+    }
+    images = index.find_images()
+    assert parse_expression(text).select(index, images) == expected